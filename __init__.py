@@ -1,16 +1,36 @@
 from basic_operations import BasicOperations
 from image_operations import ImageOperations
 from container_operations import ContainerOperations
+from async_manager import AsyncDockerManager
+from fleet import DockerFleet
+from inventory import Inventory
+from image_graph import ImageGraph
+from cache import ResponseCache
+from instrumentation import Instrumentation
+from policy import CircuitOpenError, RequestPolicy
+from registry import RegistryClient
+from build_context import BuildContext
 
 
 class DockerManager(BasicOperations, ImageOperations, ContainerOperations):
     """
 
-    :param str host: Docker host url to connect to deamon.
+    :param str host: Docker host url to connect to deamon, or unix:///var/run/docker.sock for the local socket.
     :param bool tls_verify: TLS configiration(Default is False).
     :param pem cert: Certificate file cert(Default is None).
     :param pem key: Certificate file key(Default is None).
     :param pem ca: Certificate file to verify(Default is None).
+    :param int pool_size: Keep-alive connections kept open to the host(Default is 10).
+    :param float timeout: Default timeout in seconds for every request(Default is 5).
+    :param cache: ResponseCache of inspect/info/image detail reads, True for the default TTLs(Default is None, no cache).
+    :param bool coalesce: Share one request between concurrent identical GETs(Default is False).
+    :param bool typed: Return compact typed results (Container, Image, ContainerDetail, Process, StatsSample)
+                       from list_container, list_image, inspect_container, list_container_process and
+                       sample_container_stats instead of dicts(Default is False).
+    :param instrumentation: Instrumentation recording the latency, status codes and bytes of every request(Default is None).
+    :param policy: RequestPolicy of timeout classes, adaptive timeouts, hedged reads, retries and circuit
+                   breaking, True for a default policy closed with the manager. The end points without
+                   a timeout class keep the default timeout(Default is None).
 
     By instantiating a DockerManager object, you can able to communicate with Docker deamon.
  
@@ -19,10 +39,24 @@ class DockerManager(BasicOperations, ImageOperations, ContainerOperations):
         from docker_manager import DockerManager
         docker = DockerManager(host='docker.marlabs.com:2376', tls_verify=True,cert='/cert/cert.pem', key='/cert/key.pem',ca='/cert/ca.pem')
         docker.ping()
+
+    Connections are pooled and kept alive for the lifetime of the manager. Close them
+    with :meth:`close` or use the manager as a context manager.
+
+    .. code-block:: python
+
+        with DockerManager(host='docker.marlabs.com:2376', pool_size=20) as docker:
+            docker.ping()
+            docker.pool_stats()
+
+        local = DockerManager(host='unix:///var/run/docker.sock')
+        local.ping()
     
     """
 
-    def __init__(self, host, tls_verify=False, cert=None, key=None, ca=False):
+    def __init__(self, host, tls_verify=False, cert=None, key=None, ca=False, pool_size=10, timeout=5, cache=None, coalesce=False, typed=False, instrumentation=None, policy=None):
     
-        super(DockerManager, self).__init__(host, tls_verify, cert, key, ca)
+        super(DockerManager, self).__init__(host, tls_verify, cert, key, ca, pool_size=pool_size, timeout=timeout, cache=cache, coalesce=coalesce, typed=typed, instrumentation=instrumentation, policy=policy)
+
 
+DockerFleet.manager_class = DockerManager
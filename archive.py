@@ -0,0 +1,145 @@
+import os
+import stat
+import tarfile
+import time
+
+from utils import _file_chunks_helper
+
+
+class TarStream(object):
+    """Generate a tar archive of local paths as a stream of chunks.
+
+    The archive is built while it is read: headers are written by tarfile, the file
+    contents are read ``chunk_size`` bytes at a time, so the memory used does not
+    depend on the size of the files and no temporary file is written.
+
+    .. code-block:: python
+
+        stream = TarStream(['/srv/app/config.yml', '/srv/app/static'])
+        for chunk in stream:
+            upload(chunk)
+        stream.stats()
+
+    Every path is added under its base name, the content of directories recursively.
+    A ``(path, arcname)`` pair is added under arcname alone, without the content of a
+    directory, for callers choosing the members themselves, eg: a build context.
+    """
+
+    def __init__(self, paths, chunk_size=65536):
+        self.paths = [paths] if isinstance(paths, str) else list(paths)
+        self.chunk_size = chunk_size
+        self.bytes = 0
+        self.files = 0
+        self.start = None
+        self.end = None
+
+    def __iter__(self):
+        self.bytes = 0
+        self.files = 0
+        self.start = time.time()
+        for path in self.paths:
+            if isinstance(path, tuple):
+                entries = self._add(path[0], path[1], recursive=False)
+            else:
+                entries = self._add(path, os.path.basename(os.path.normpath(path)))
+            for chunk in entries:
+                self.bytes += len(chunk)
+                yield chunk
+        # End of archive, two empty blocks.
+        end = tarfile.NUL * tarfile.BLOCKSIZE * 2
+        self.bytes += len(end)
+        yield end
+        self.end = time.time()
+
+    def _add(self, path, arcname, recursive=True):
+        info = tarfile.TarInfo(arcname)
+        st = os.lstat(path)
+        info.mode = stat.S_IMODE(st.st_mode)
+        info.mtime = int(st.st_mtime)
+        info.uid, info.gid = st.st_uid, st.st_gid
+        if stat.S_ISLNK(st.st_mode):
+            info.type = tarfile.SYMTYPE
+            info.linkname = os.readlink(path)
+        elif stat.S_ISDIR(st.st_mode):
+            info.type = tarfile.DIRTYPE
+        elif stat.S_ISREG(st.st_mode):
+            info.size = st.st_size
+        else:
+            # Devices, sockets and fifos are not copied.
+            return
+        yield info.tobuf(tarfile.PAX_FORMAT, 'utf-8', 'surrogateescape')
+        self.files += 1
+        if info.isreg():
+            size = 0
+            with open(path, 'rb') as f:
+                for chunk in _file_chunks_helper(f, self.chunk_size):
+                    # The header is written already, the file must not grow past its size.
+                    chunk = chunk[:info.size - size]
+                    size += len(chunk)
+                    yield chunk
+                    if size == info.size:
+                        break
+            if size < info.size:
+                raise IOError('{0} was truncated while it was archived'.format(path))
+            remainder = size % tarfile.BLOCKSIZE
+            if remainder:
+                yield tarfile.NUL * (tarfile.BLOCKSIZE - remainder)
+        elif info.isdir() and recursive:
+            for name in sorted(os.listdir(path)):
+                for chunk in self._add(os.path.join(path, name), arcname + '/' + name):
+                    yield chunk
+
+    def stats(self):
+        return _transfer_stats(self.bytes, self.start, self.end, self.files)
+
+
+class _ChunkReader(object):
+    """Read-only file object over an iterator of chunks, for tarfile stream mode."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = bytearray()
+        self.bytes = 0
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+            self.bytes += len(chunk)
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+def _untar_stream_helper(chunks, destination):
+    """Extract a tar archive from a stream of chunks into a directory, member by
+    member as the chunks arrive. Return the transfer statistics."""
+    start = time.time()
+    reader = _ChunkReader(chunks)
+    files = 0
+    # Members are checked like the tarfile 'data' filter does, when it is available.
+    extract_args = {'filter': 'data'} if hasattr(tarfile, 'data_filter') else {}
+    with tarfile.open(fileobj=reader, mode='r|') as tar:
+        for member in tar:
+            if not extract_args and (member.name.startswith('/') or '..' in member.name.split('/')):
+                raise tarfile.TarError('Unsafe path in the archive: {0}'.format(member.name))
+            tar.extract(member, destination, **extract_args)
+            files += 1
+    # Drain the padding after the end of archive blocks.
+    while reader.read(65536):
+        pass
+    return _transfer_stats(reader.bytes, start, time.time(), files)
+
+
+def _transfer_stats(size, start, end, files):
+    elapsed = (end or time.time()) - start if start else 0.0
+    return {
+        'bytes': size,
+        'files': files,
+        'elapsed': elapsed,
+        'throughput': size / elapsed if elapsed else 0.0
+    }
@@ -0,0 +1,95 @@
+from constants import WebResponseStatusCode
+from async_transport import AsyncHttpTransport
+from docker_server import DEFAULT_TIMEOUT
+from utils import AsyncSingleFlight
+
+
+class AsyncDockerServer(object):
+
+    def __init__(self, host, tls_verify=False, cert=None, key=None, ca=False, pool_size=100, timeout=DEFAULT_TIMEOUT, coalesce=False):
+        self.host = host
+        self.tls_verify = tls_verify
+        self.cert = cert
+        self.key = key
+        self.ca = ca
+        self.timeout = timeout
+        self.transport = AsyncHttpTransport(host, tls_verify, (cert, key), ca, pool_size)
+        self.single_flight = AsyncSingleFlight() if coalesce else None
+
+    def _prepare_timeout(self, timeout):
+        if timeout is False:
+            return self.timeout
+        return timeout
+
+    async def _get(self, end_point, params=None, headers=None, stream=False, timeout=False):
+        if self.single_flight is not None and not stream:
+            key = (end_point, repr(params), repr(headers))
+            return dict(await self.single_flight.do(key, lambda: self._fetch(end_point, params, headers, timeout)))
+        return await self._fetch(end_point, params, headers, timeout, stream)
+
+    async def _fetch(self, end_point, params=None, headers=None, timeout=False, stream=False):
+        response = await self.transport.request(
+            'GET',
+            end_point,
+            params=params,
+            headers=headers,
+            stream=stream,
+            timeout=self._prepare_timeout(timeout)
+        )
+        return await self._prepare_response_content(response, stream=stream)
+
+    async def _post(self, end_point, data=None, headers=None, timeout=False):
+        response = await self.transport.request(
+            'POST',
+            end_point,
+            data=data,
+            headers=headers,
+            timeout=self._prepare_timeout(timeout)
+        )
+        return await self._prepare_response_content(response)
+
+    async def _delete(self, end_point, data=None, timeout=False, params=None):
+        response = await self.transport.request(
+            'DELETE',
+            end_point,
+            params=params,
+            data=data,
+            timeout=self._prepare_timeout(timeout)
+        )
+        return await self._prepare_response_content(response)
+
+    async def _prepare_response_content(self, response, stream=False):
+        if response.status_code in WebResponseStatusCode.SUCCESS_LIST:
+            try:
+                if stream:
+                    content = response.iter_lines()
+                elif 'application/json' in response.headers.get('content-type', ''):
+                    content = response.json()
+                else:
+                    content = await response.read()
+            except:
+                content = await response.read()
+            response_content = {
+                'status': True,
+                'content': content
+            }
+        else:
+            response_content = {
+                'status': False,
+                'content': await response.read()
+            }
+        return response_content
+
+    def pool_stats(self):
+        """Connection pool statistics of this manager."""
+        return self.transport.stats()
+
+    async def close(self):
+        """Close every pooled connection to the docker deamon."""
+        await self.transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
@@ -0,0 +1,243 @@
+import asyncio
+import threading
+
+from async_docker_server import AsyncDockerServer
+from container_operations import ContainerOperations
+from image_operations import ImageOperations
+from constants import DockerEndPoint, ContainerOperation, WebResponseStatusCode
+from stats import StatsDecoder
+from utils import MultiplexedStreamDecoder
+
+
+class AsyncDockerManager(AsyncDockerServer):
+    """
+
+    :param str host: Docker host url to connect to deamon, or unix:///var/run/docker.sock for the local socket.
+    :param bool tls_verify: TLS configiration(Default is False).
+    :param pem cert: Certificate file cert(Default is None).
+    :param pem key: Certificate file key(Default is None).
+    :param pem ca: Certificate file to verify(Default is None).
+    :param int pool_size: Maximum number of connections open to the host(Default is 100).
+    :param float timeout: Default timeout in seconds for every request(Default is 5).
+    :param bool coalesce: Share one request between concurrent identical GETs(Default is False).
+
+    Asyncio counterpart of :class:`DockerManager`. Every operation is a coroutine returning
+    the same ``{'status': ..., 'content': ...}`` response, and all of them share one
+    connection pool, so a single event loop can keep thousands of calls in flight.
+
+    .. code-block:: python
+
+        async with AsyncDockerManager(host='docker.marlabs.com:2376') as docker:
+            await docker.ping()
+            infos = await asyncio.gather(*[docker.inspect_container(c) for c in ids])
+
+    """
+
+    def __init__(self, host, tls_verify=False, cert=None, key=None, ca=False, pool_size=100, timeout=5, coalesce=False):
+        super(AsyncDockerManager, self).__init__(host, tls_verify, cert, key, ca, pool_size=pool_size, timeout=timeout, coalesce=coalesce)
+        self._registries = {}
+        self._registries_lock = threading.Lock()
+
+    # Basic
+
+    async def ping(self):
+        """Ping the docker deamon, see :meth:`BasicOperations.ping`."""
+        return await self._get(DockerEndPoint.PING)
+
+    async def get_info(self):
+        """Get the basic docker info, see :meth:`BasicOperations.get_info`."""
+        return await self._get(DockerEndPoint.INFO)
+
+    async def get_version(self):
+        """Get Docker version, see :meth:`BasicOperations.get_version`."""
+        return await self._get(DockerEndPoint.VERSION)
+
+    # Images
+
+    async def list_image(self, query_param=None):
+        return await self._get(DockerEndPoint.LIST_IMAGES, query_param)
+
+    async def delete_image(self, image_id, force_delete=False, no_prune=False):
+        query_param = {
+            'force': force_delete,
+            'noprune': no_prune
+        }
+        return await self._delete(DockerEndPoint.REMOVE_IMAGE.format(image_id), params=query_param)
+
+    async def get_image_detail(self, image_id):
+        return await self._get(DockerEndPoint.INSPECT_IMAGE.format(image_id))
+
+    async def get_image_history(self, image_id):
+        return await self._get(DockerEndPoint.IMAGE_HISTORY.format(image_id))
+
+    async def search_image(self, search_name):
+        return await self._get(DockerEndPoint.SEARCH_IMAGE.format(search_name))
+
+    async def get_image_tags(self, image_name):
+        # The tags live on the registry, not on the deamon this pool is connected to.
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, ImageOperations.get_image_tags, self, image_name)
+
+    _split_registry = staticmethod(ImageOperations._split_registry)
+    _close_registries = ImageOperations._close_registries
+
+    async def close(self):
+        """Close every pooled connection to the docker deamon and to the registries."""
+        self._close_registries()
+        await super(AsyncDockerManager, self).close()
+
+    async def download_image(self, image_name, tag=None, source=None, repo=None, registry=None):
+        data = {
+            'fromImage': image_name,
+            'tag': tag,
+            'fromSrc': source,
+            'repo': repo,
+            'registry': registry
+        }
+        return await self._post(DockerEndPoint.CREATE_IMAGE, data, timeout=None)
+
+    async def push_image(self, repo_name, headers, tag=None):
+        data = {
+            'tag': tag
+        }
+        return await self._post(DockerEndPoint.PUSH_IMAGE, headers=headers, data=data, timeout=None)
+
+    # Containers
+
+    async def list_container(self, all=False, limit=None, since=None, before=None, size=False, filters=None):
+        """List all the containers in docker host, see :meth:`ContainerOperations.list_container`."""
+        query_param = {
+            'all': all,
+            'limit': limit,
+            'since': since,
+            'before': before,
+            'size': size,
+            'filters': filters
+        }
+        return await self._get(DockerEndPoint.LIST_CONTAINER, query_param)
+
+    async def inspect_container(self, container_id, raw_json=False):
+        """Return low-level information on the container id, see :meth:`ContainerOperations.inspect_container`."""
+        response = await self._get(DockerEndPoint.INSPECT_CONTAINER.format(container_id))
+        if raw_json and response['status']:
+            return self._prepare_container_info_json(response['content'])
+        return response
+
+    async def create_container_from_config(self, configuration, name=None):
+        headers = {'content-type': 'application/json'}
+        return await self._post(''.join([DockerEndPoint.CREATE_CONTAINER, '?name=' + name if name else '']), configuration, headers)
+
+    async def start_container(self, container_id):
+        return await self._post(DockerEndPoint.CONTAINER_OPERATION.format(container_id, ContainerOperation.START))
+
+    async def stop_container(self, container_id):
+        return await self._post(DockerEndPoint.CONTAINER_OPERATION.format(container_id, ContainerOperation.STOP))
+
+    async def restart_container(self, container_id):
+        return await self._post(DockerEndPoint.CONTAINER_OPERATION.format(container_id, ContainerOperation.RESTART))
+
+    async def pause_container(self, container_id):
+        return await self._post(DockerEndPoint.CONTAINER_OPERATION.format(container_id, ContainerOperation.PAUSE))
+
+    async def unpause_container(self, container_id):
+        return await self._post(DockerEndPoint.CONTAINER_OPERATION.format(container_id, ContainerOperation.UNPAUSE))
+
+    async def rename_container(self, container_id, name):
+        return await self._post(DockerEndPoint.CONTAINER_OPERATION.format(container_id, ContainerOperation.RENAME), {'name': name})
+
+    async def remove_container(self, container_id, force=False, volume=False):
+        params = {
+            'force': force,
+            'v': volume
+        }
+        return await self._delete(DockerEndPoint.REMOVE_CONTAINER.format(container_id), params=params)
+
+    async def commit_container(self, container_id, image_name=None, tag=None, comment=None, author=None):
+        query_param = "?container=" + container_id
+        if image_name:
+            query_param = query_param + "&repo=" + image_name
+        if tag:
+            query_param = query_param + "&tag=" + tag
+        if comment:
+            query_param = query_param + "&comment=" + comment
+        if author:
+            query_param = query_param + "&author=" + author
+        return await self._post(DockerEndPoint.COMMIT_CONTAINER.format(query_param))
+
+    async def get_container_statics(self, container_id, stream=True):
+        """Get container statitics of running container.
+
+        The content is an async iterator over the raw JSON stats lines, or a single
+        decoded sample with stream=False.
+
+        .. code-block:: python
+
+            r = await docker.get_container_statics('cb8c119188c9')
+            async for line in r['content']:
+                print(line)
+
+        """
+        if not stream:
+            return await self._get(DockerEndPoint.CONTAINER_STATS.format(container_id), {'stream': False})
+        return await self._get(DockerEndPoint.CONTAINER_STATS.format(container_id), stream=True)
+
+    async def sample_container_stats(self, container_id, stream=True):
+        """Get decoded container statistics, see :meth:`ContainerOperations.sample_container_stats`.
+
+        With stream=True the content is an async iterator of StatsSample.
+        """
+        response = await self.get_container_statics(container_id, stream)
+        if response['status']:
+            if stream:
+                response['content'] = self._iter_stats_records(response['content'])
+            else:
+                response['content'] = StatsDecoder().decode(response['content'])
+        return response
+
+    async def _iter_stats_records(self, lines):
+        decoder = StatsDecoder()
+        async for line in lines:
+            if line:
+                yield decoder.decode(line)
+
+    async def get_container_logs(self, container_id, std_out=True, std_err=True, date_time=0, time_stamp=False, count='all', stream=False, split_streams=False):
+        """Get container logs, see :meth:`ContainerOperations.get_container_logs`.
+
+        With stream=True the content is an async iterator over the log lines.
+
+        .. code-block:: python
+
+            r = await docker.get_container_logs('0bd62601d47c', stream=True, split_streams=True)
+            async for stream_id, line in r['content']:
+                print(stream_id, line)
+
+        """
+        params = {'stdout': std_out, 'stderr': std_err, 'since': date_time, 'timestamps': time_stamp, 'tail': count}
+        end_url = DockerEndPoint.CONTAINER_LOGS.format(container_id)
+        response = await self.transport.request('GET', end_url, params=params, stream=True, timeout=self.timeout)
+        if response.status_code not in WebResponseStatusCode.SUCCESS_LIST:
+            return await self._prepare_response_content(response)
+        if stream or split_streams:
+            lines = self._iter_log_lines(response, split_streams)
+            if stream:
+                return {'status': True, 'content': lines}
+            return {'status': True, 'content': [line async for line in lines]}
+        decoder = MultiplexedStreamDecoder()
+        content = [payload async for chunk in response.iter_chunks() for _, payload in decoder.feed(chunk)]
+        return {'status': True, 'content': b''.join(content)}
+
+    async def _iter_log_lines(self, response, split_streams):
+        decoder = MultiplexedStreamDecoder()
+        async for chunk in response.iter_chunks():
+            for stream_id, line in decoder.feed_lines(chunk):
+                yield (stream_id, line) if split_streams else line
+        for stream_id, line in decoder.flush():
+            yield (stream_id, line) if split_streams else line
+
+    async def list_container_process(self, container_id, ps_args=None):
+        end_url = DockerEndPoint.CONTAINER_PROCESS_LIST.format(container_id)
+        if ps_args:
+            end_url = end_url + '?ps_args=' + ps_args
+        return await self._get(end_url)
+
+    _prepare_container_info_json = ContainerOperations._prepare_container_info_json
@@ -0,0 +1,296 @@
+import asyncio
+import collections
+import json
+import ssl
+
+from urllib.parse import urlencode
+
+from constants import WebConnectionType
+
+
+class AsyncResponse(object):
+    """HTTP response read from a pooled asyncio connection.
+
+    The body is read lazily, once it is fully consumed the connection goes
+    back to the pool for reuse.
+    """
+
+    def __init__(self, pool, connection, status_code, headers, timeout):
+        self.pool = pool
+        self.connection = connection
+        self.status_code = status_code
+        self.headers = headers
+        self.timeout = timeout
+        self._chunked = 'chunked' in headers.get('transfer-encoding', '').lower()
+        self._remaining = None if self._chunked else self._content_length()
+        self._done = self._remaining == 0
+        self._content = None
+        if self._done:
+            self._release()
+
+    def _content_length(self):
+        length = self.headers.get('content-length')
+        if length is not None:
+            return int(length)
+        if self.status_code in (204, 304):
+            return 0
+        return None
+
+    async def _read(self, coroutine):
+        return await asyncio.wait_for(coroutine, self.timeout)
+
+    async def _next_chunk(self, chunk_size):
+        reader = self.connection[0]
+        if self._chunked:
+            if not self._remaining:
+                size_line = await self._read(reader.readline())
+                size = int(size_line.split(b';')[0].strip() or b'0', 16)
+                if size == 0:
+                    await self._read(reader.readline())
+                    return b''
+                self._remaining = size
+            data = await self._read(reader.read(min(self._remaining, chunk_size)))
+            if not data:
+                raise ConnectionError('Connection closed by docker deamon')
+            self._remaining -= len(data)
+            if not self._remaining:
+                await self._read(reader.readexactly(2))
+            return data
+        if self._remaining is None:
+            return await self._read(reader.read(chunk_size))
+        if not self._remaining:
+            return b''
+        data = await self._read(reader.read(min(self._remaining, chunk_size)))
+        if not data:
+            raise ConnectionError('Connection closed by docker deamon')
+        self._remaining -= len(data)
+        return data
+
+    async def iter_chunks(self, chunk_size=65536):
+        try:
+            while not self._done:
+                data = await self._next_chunk(chunk_size)
+                if not data:
+                    # Bodies delimited by the connection closing can not be reused.
+                    self._finish(reuse=self._remaining is not None)
+                    break
+                if self._remaining == 0 and not self._chunked:
+                    self._finish()
+                yield data
+        finally:
+            if not self._done:
+                self.close()
+
+    async def iter_lines(self, chunk_size=65536):
+        pending = b''
+        async for data in self.iter_chunks(chunk_size):
+            lines = (pending + data).split(b'\n')
+            pending = lines.pop()
+            for line in lines:
+                yield line.rstrip(b'\r')
+        if pending:
+            yield pending
+
+    async def read(self):
+        if self._content is None:
+            self._content = b''.join([data async for data in self.iter_chunks()])
+        return self._content
+
+    def json(self):
+        return json.loads(self._content.decode('utf-8'))
+
+    def _finish(self, reuse=True):
+        self._done = True
+        self._release(reuse)
+
+    def _release(self, reuse=True):
+        if self.connection is not None:
+            self.pool.release(self.connection, reuse=reuse)
+            self.connection = None
+
+    def close(self):
+        self._done = True
+        self._release(reuse=False)
+
+
+class AsyncConnectionPool(object):
+    """Keep-alive pool of asyncio stream connections to one docker deamon.
+
+    :param str host: Host name, ignored for unix sockets.
+    :param int port: Port, ignored for unix sockets.
+    :param ssl.SSLContext ssl_context: TLS context(Default is None).
+    :param str socket_path: Unix socket path(Default is None).
+    :param int pool_size: Maximum number of open connections(Default is 100).
+    """
+
+    def __init__(self, host=None, port=None, ssl_context=None, socket_path=None, pool_size=100):
+        self.host = host
+        self.port = port
+        self.ssl_context = ssl_context
+        self.socket_path = socket_path
+        self.pool_size = pool_size
+        self._idle = collections.deque()
+        self._semaphore = None
+        self._opened = 0
+        self._reused = 0
+        self._in_flight = 0
+
+    async def acquire(self, timeout=None):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.pool_size)
+        await self._semaphore.acquire()
+        self._in_flight += 1
+        try:
+            while self._idle:
+                connection = self._idle.pop()
+                if not connection[0].at_eof() and not connection[1].is_closing():
+                    self._reused += 1
+                    return connection, True
+                connection[1].close()
+            connection = await asyncio.wait_for(self._open(), timeout)
+            self._opened += 1
+            return connection, False
+        except BaseException:
+            self._in_flight -= 1
+            self._semaphore.release()
+            raise
+
+    def _open(self):
+        if self.socket_path:
+            return asyncio.open_unix_connection(self.socket_path)
+        return asyncio.open_connection(self.host, self.port, ssl=self.ssl_context)
+
+    def release(self, connection, reuse=True):
+        if reuse:
+            self._idle.append(connection)
+        else:
+            connection[1].close()
+        self._in_flight -= 1
+        self._semaphore.release()
+
+    def stats(self):
+        return {
+            'requests': self._opened + self._reused,
+            'connections_opened': self._opened,
+            'connections_reused': self._reused,
+            'in_flight': self._in_flight,
+            'idle': len(self._idle),
+            'pool_size': self.pool_size
+        }
+
+    async def close(self):
+        while self._idle:
+            writer = self._idle.pop()[1]
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+
+class AsyncHttpTransport(object):
+    """HTTP/1.1 client on top of :class:`AsyncConnectionPool`.
+
+    :param str host: host:port of the deamon, or unix:///path/to/docker.sock
+    :param bool tls_verify: Use TLS(Default is False).
+    :param tuple cert: Client certificate and key pair(Default is None).
+    :param ca: CA file to verify the server certificate(Default is False).
+    :param int pool_size: Maximum number of open connections(Default is 100).
+    """
+
+    def __init__(self, host, tls_verify=False, cert=None, ca=False, pool_size=100):
+        if host.startswith(WebConnectionType.UNIX):
+            self.host_header = 'localhost'
+            self.pool = AsyncConnectionPool(socket_path=host[len(WebConnectionType.UNIX):], pool_size=pool_size)
+            return
+        name, _, port = host.rpartition(':')
+        if not name:
+            name, port = port, None
+        ssl_context = self._prepare_ssl_context(cert, ca) if tls_verify else None
+        self.host_header = host
+        self.pool = AsyncConnectionPool(name, int(port) if port else (443 if tls_verify else 80), ssl_context, pool_size=pool_size)
+
+    def _prepare_ssl_context(self, cert, ca):
+        if ca:
+            context = ssl.create_default_context(cafile=ca)
+        else:
+            context = ssl.create_default_context()
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        if cert and cert[0]:
+            context.load_cert_chain(cert[0], cert[1])
+        return context
+
+    def _prepare_body(self, data, headers):
+        if data is None:
+            return b''
+        if isinstance(data, bytes):
+            return data
+        if isinstance(data, str):
+            return data.encode('utf-8')
+        headers.setdefault('Content-Type', 'application/x-www-form-urlencoded')
+        return self._encode_params(data).encode('utf-8')
+
+    def _encode_params(self, params):
+        if isinstance(params, str):
+            return params
+        items = params.items() if hasattr(params, 'items') else params
+        return urlencode([(key, str(value)) for key, value in items if value is not None])
+
+    def _prepare_request(self, method, end_point, params, data, headers):
+        headers = dict(headers or {})
+        body = self._prepare_body(data, headers)
+        if params:
+            query = self._encode_params(params)
+            if query:
+                end_point = end_point + ('&' if '?' in end_point else '?') + query
+        lines = ['{0} {1} HTTP/1.1'.format(method, end_point), 'Host: ' + self.host_header]
+        headers.setdefault('Content-Length', str(len(body)))
+        for key, value in headers.items():
+            lines.append('{0}: {1}'.format(key, value))
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+    async def _read_head(self, reader):
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError('Connection closed by docker deamon')
+        status_code = int(status_line.split(None, 2)[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            headers[key.strip().lower()] = value.strip()
+        return status_code, headers
+
+    async def request(self, method, end_point, params=None, data=None, headers=None, timeout=None, stream=False):
+        payload = self._prepare_request(method, end_point, params, data, headers)
+        for attempt in (0, 1):
+            connection, reused = await self.pool.acquire(timeout)
+            try:
+                connection[1].write(payload)
+                await asyncio.wait_for(connection[1].drain(), timeout)
+                status_code, headers = await asyncio.wait_for(self._read_head(connection[0]), timeout)
+                break
+            except asyncio.TimeoutError:
+                self.pool.release(connection, reuse=False)
+                raise
+            except (OSError, asyncio.IncompleteReadError):
+                self.pool.release(connection, reuse=False)
+                # A kept-alive connection may have been closed by the deamon, retry once on a new one.
+                if attempt or not reused:
+                    raise
+            except BaseException:
+                self.pool.release(connection, reuse=False)
+                raise
+        response = AsyncResponse(self.pool, connection, status_code, headers, timeout)
+        if not stream:
+            await response.read()
+        return response
+
+    def stats(self):
+        return self.pool.stats()
+
+    async def close(self):
+        await self.pool.close()
@@ -1,11 +1,13 @@
+import json
+
 from docker_server import DockerServer
 from constants import DockerEndPoint
 
 
 class BasicOperations(DockerServer):
 
-    def __init__(self, host, tls_verify=False, cert=None, key=None, ca=False):
-        super(BasicOperations, self).__init__(host, tls_verify, cert, key, ca)
+    def __init__(self, host, tls_verify=False, cert=None, key=None, ca=False, **kwargs):
+        super(BasicOperations, self).__init__(host, tls_verify, cert, key, ca, **kwargs)
         
     def ping(self):
         """Ping the docker deamon.
@@ -44,4 +46,43 @@ class BasicOperations(DockerServer):
             docker.get_version()
 
         """
-        return self._get(DockerEndPoint.VERSION)
\ No newline at end of file
+        return self._get(DockerEndPoint.VERSION)
+
+    def get_events(self, since=None, until=None, filters=None, decode=True):
+        """
+        :param int since: UNIX timestamp to replay events from(Default is None, only new events)
+        :param int until: UNIX timestamp to stop the stream at(Default is None, never)
+        :param dict filters: Event filters, eg: {'type': ['container'], 'event': ['start', 'die']}(Default is None)
+        :param bool decode: Yield decoded dicts instead of raw JSON lines(Default is True)
+
+        Stream the real time events of the docker deamon.
+
+        .. code-block:: python
+
+            r = docker.get_events(filters={'type': ['container']})
+            for event in r['content']:
+                print(event['Action'], event['Actor']['ID'])
+
+        Output
+
+        .. code-block:: json
+
+            {u'Action': u'start',
+             u'Actor': {u'Attributes': {u'image': u'pidgin:latest', u'name': u'pidgin'},
+                        u'ID': u'a7da5a495448085ce1fc57deae89b444ffb56d35c1b727750c988c6ca226e771'},
+             u'Type': u'container',
+             u'id': u'a7da5a495448085ce1fc57deae89b444ffb56d35c1b727750c988c6ca226e771',
+             u'status': u'start',
+             u'time': 1454476022,
+             u'timeNano': 1454476022283155198}
+
+        """
+        params = {
+            'since': since,
+            'until': until,
+            'filters': json.dumps(filters) if isinstance(filters, dict) else filters
+        }
+        response = self._get(DockerEndPoint.EVENTS, params, stream=True, timeout=None)
+        if response['status'] and decode:
+            response['content'] = (json.loads(line) for line in response['content'] if line)
+        return response
@@ -0,0 +1,331 @@
+"""In-process fake of the Docker Engine API, for the benchmarks.
+
+Requests are routed with DockerEndPoint.resolve, so every end point of
+constants.DockerEndPoint gets a canned response. The payloads are built once when
+the daemon is created, the time spent serving a request is mostly the time spent
+writing it.
+
+.. code-block:: python
+
+    with FakeDaemon(containers=2000, log_bytes=1 << 20) as daemon:
+        docker = DockerManager(host=daemon.host)
+        docker.list_container(all=True)
+
+    with FakeDaemon(unix_socket='/tmp/fake-docker.sock', latency=0.05, failure_rate=0.1) as daemon:
+        docker = DockerManager(host=daemon.host)
+
+"""
+import io
+import json
+import os
+import random
+import socketserver
+import struct
+import sys
+import tarfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from constants import DockerEndPoint
+
+
+def _container(index):
+    return {
+        'Id': '{0:064x}'.format(index),
+        'Names': ['/container-{0}'.format(index)],
+        'Image': 'app:{0}'.format(index % 10),
+        'ImageID': 'sha256:{0:064x}'.format(index % 10),
+        'Command': '/bin/sh -c "exec app --port 8080"',
+        'Created': 1455008494,
+        'State': 'running',
+        'Status': 'Up 2 hours',
+        'Ports': [{'IP': '0.0.0.0', 'PrivatePort': 8080, 'PublicPort': 30000 + index % 1000, 'Type': 'tcp'}],
+        'Labels': {'com.example.app': 'app-{0}'.format(index % 10), 'com.example.team': 'platform'},
+        'SizeRw': 12288,
+        'HostConfig': {'NetworkMode': 'default'},
+        'NetworkSettings': {'Networks': {'bridge': {'IPAddress': '172.17.0.{0}'.format(index % 250 + 2)}}}
+    }
+
+
+def _container_detail(index):
+    return {
+        'Id': '{0:064x}'.format(index),
+        'Name': '/container-{0}'.format(index),
+        'Image': 'sha256:{0:064x}'.format(index % 10),
+        'Created': '2016-02-09T09:01:34.283155Z',
+        'State': {'Running': True, 'Paused': False, 'Restarting': False, 'ExitCode': 0, 'Pid': 4242,
+                  'StartedAt': '2016-02-09T09:01:34.283155Z'},
+        'Config': {'Image': 'app:{0}'.format(index % 10), 'Cmd': ['app', '--port', '8080'], 'Entrypoint': None,
+                   'Env': ['PATH=/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin', 'APP_ENV=production'],
+                   'Labels': {'com.example.app': 'app-{0}'.format(index % 10)}},
+        'HostConfig': {'PortBindings': {'8080/tcp': [{'HostIp': '', 'HostPort': str(30000 + index % 1000)}]},
+                       'Memory': 536870912},
+        'NetworkSettings': {'IPAddress': '172.17.0.{0}'.format(index % 250 + 2)}
+    }
+
+
+def _image(index):
+    return {
+        'Id': 'sha256:{0:064x}'.format(index),
+        'ParentId': 'sha256:{0:064x}'.format(index - 1) if index else '',
+        'RepoTags': ['app:{0}'.format(index)],
+        'RepoDigests': [],
+        'Created': 1455008494,
+        'Size': 100000000 + index * 1000000,
+        'VirtualSize': 100000000 + index * 1000000,
+        'Labels': {}
+    }
+
+
+def _stats(index):
+    return {
+        'read': '2016-02-09T09:01:{0:02d}.283155Z'.format(index % 60),
+        'cpu_stats': {'cpu_usage': {'total_usage': 1000000000 + index * 50000000, 'percpu_usage': [1, 1, 1, 1]},
+                      'system_cpu_usage': 100000000000 + index * 1000000000, 'online_cpus': 4},
+        'precpu_stats': {'cpu_usage': {'total_usage': 1000000000 + (index - 1) * 50000000},
+                         'system_cpu_usage': 100000000000 + (index - 1) * 1000000000},
+        'memory_stats': {'usage': 104857600, 'limit': 536870912, 'stats': {'cache': 10485760}},
+        'blkio_stats': {'io_service_bytes_recursive': [{'op': 'Read', 'value': 4096}, {'op': 'Write', 'value': 8192}]},
+        'networks': {'eth0': {'rx_bytes': 1000 * index, 'tx_bytes': 500 * index}}
+    }
+
+
+def _multiplexed(payload, frame_size=4096):
+    frames = []
+    for offset in range(0, len(payload), frame_size):
+        stream_id = 2 if (offset // frame_size) % 10 == 9 else 1
+        chunk = payload[offset:offset + frame_size]
+        frames.append(struct.pack('>BxxxL', stream_id, len(chunk)) + chunk)
+    return b''.join(frames)
+
+
+def _tar(files):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode='w') as tar:
+        for name, data in files:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are separate writes, Nagle would hold the body back over TCP.
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def address_string(self):
+        return 'fake'
+
+    def handle_request(self):
+        daemon = self.server.fake
+        self._read_body()
+        if daemon.latency:
+            time.sleep(daemon.latency)
+        if daemon.failure_rate and random.random() < daemon.failure_rate:
+            return self._send(500, {'message': 'fake daemon failure'})
+        path, _, query = self.path.partition('?')
+        key, args = DockerEndPoint.resolve(path)
+        route = daemon.routes.get((self.command, key))
+        if route is None:
+            return self._send(404, {'message': 'page not found'})
+        route(self, args, query)
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = handle_request
+
+    def _read_body(self):
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            while True:
+                size = int(self.rfile.readline().split(b';')[0].strip() or b'0', 16)
+                if not size:
+                    self.rfile.readline()
+                    return
+                self.rfile.read(size)
+                self.rfile.readline()
+        length = int(self.headers.get('Content-Length') or 0)
+        while length > 0:
+            length -= len(self.rfile.read(min(length, 65536)))
+
+    def _send(self, status, body, content_type='application/json'):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _send_empty(self, status=204):
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def _send_chunked(self, chunks, content_type='application/json'):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for chunk in chunks:
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+        self.wfile.write(b'0\r\n\r\n')
+
+
+class _UnixHandler(_Handler):
+
+    disable_nagle_algorithm = False
+
+
+class _QuietErrors(object):
+
+    def handle_error(self, request, client_address):
+        # A client closing a stream it stopped reading, eg: followed events, is not an error.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super(_QuietErrors, self).handle_error(request, client_address)
+
+
+class _TCPHTTPServer(_QuietErrors, ThreadingHTTPServer):
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class _UnixHTTPServer(_QuietErrors, socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def get_request(self):
+        request, _ = super(_UnixHTTPServer, self).get_request()
+        return request, ('fake', 0)
+
+
+class FakeDaemon(object):
+    """
+
+    :param str unix_socket: Path of the unix socket to listen on(Default is None, a TCP port of 127.0.0.1)
+    :param int containers: Number of containers listed by list_container(Default is 1000)
+    :param int images: Number of images listed by list_image(Default is 100)
+    :param int log_bytes: Size of the multiplexed log body(Default is 1MB)
+    :param int stats_samples: Number of documents of a stats stream(Default is 100)
+    :param float latency: Seconds every request waits before it is answered(Default is 0)
+    :param float failure_rate: Fraction of the requests answered with a 500(Default is 0)
+
+    Fake Docker Engine API serving canned responses, in a background thread.
+    """
+
+    def __init__(self, unix_socket=None, containers=1000, images=100, log_bytes=1 << 20, stats_samples=100, latency=0, failure_rate=0):
+        self.unix_socket = unix_socket
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.stats_samples = stats_samples
+        self._container_list = json.dumps([_container(index) for index in range(containers)]).encode('utf-8')
+        self._image_list = json.dumps([_image(index) for index in range(images)]).encode('utf-8')
+        self._container_detail = json.dumps(_container_detail(1)).encode('utf-8')
+        self._stats = [json.dumps(_stats(index)).encode('utf-8') + b'\n' for index in range(stats_samples)]
+        line = b'2016-02-09T09:01:34.283155Z GET /healthz HTTP/1.1 200 0.3ms\n'
+        self._logs = _multiplexed((line * (log_bytes // len(line) + 1))[:log_bytes])
+        self._exec_output = _multiplexed(b'/var/run/postgresql:5432 - accepting connections\n')
+        self._archive = _tar([('config.yml', b'port: 8080\n' * 100), ('static/app.js', b'x' * 65536)])
+        self._image_tar = _tar([('layer.tar', os.urandom(1 << 20)), ('manifest.json', b'[]')])
+        self._progress = [json.dumps(event).encode('utf-8') + b'\r\n' for event in [
+            {'status': 'Pulling from library/app', 'id': 'latest'},
+            {'status': 'Downloading', 'id': 'a3ed95caeb02', 'progressDetail': {'current': 32768, 'total': 65536}},
+            {'status': 'Pull complete', 'id': 'a3ed95caeb02', 'progressDetail': {}},
+            {'status': 'Status: Downloaded newer image for app:latest'}
+        ]]
+        self._build_output = [json.dumps(event).encode('utf-8') + b'\r\n' for event in [
+            {'stream': 'Step 1/2 : FROM app:latest\n'},
+            {'stream': 'Step 2/2 : COPY . /srv/app\n'},
+            {'aux': {'ID': 'sha256:{0:064x}'.format(3)}},
+            {'stream': 'Successfully built {0:012x}\n'.format(3)}
+        ]]
+        self.routes = self._prepare_routes()
+        self.server = None
+
+    def _prepare_routes(self):
+        top = {'Titles': ['UID', 'PID', 'PPID', 'C', 'STIME', 'TTY', 'TIME', 'CMD'],
+               'Processes': [['root', str(pid), '1', '0', '09:01', '?', '00:00:01', 'app --worker']
+                             for pid in range(100, 132)]}
+        events = [json.dumps({'Type': 'container', 'Action': 'start', 'Actor': {'ID': '{0:064x}'.format(index),
+                                                                                 'Attributes': {'name': 'container-{0}'.format(index)}},
+                              'time': 1455008494 + index}).encode('utf-8') + b'\n' for index in range(100)]
+        return {
+            ('GET', 'PING'): lambda h, args, query: h._send(200, b'OK', 'text/plain'),
+            ('HEAD', 'PING'): lambda h, args, query: h._send(200, b'OK', 'text/plain'),
+            ('GET', 'INFO'): lambda h, args, query: h._send(200, {'Containers': 1000, 'Images': 100, 'NCPU': 4,
+                                                                 'MemTotal': 8370089984, 'ServerVersion': '1.10.0'}),
+            ('GET', 'VERSION'): lambda h, args, query: h._send(200, {'Version': '1.10.0', 'ApiVersion': '1.22',
+                                                                    'Os': 'linux', 'Arch': 'amd64'}),
+            ('GET', 'EVENTS'): lambda h, args, query: h._send_chunked(events),
+            ('GET', 'LIST_CONTAINER'): lambda h, args, query: h._send(200, self._container_list),
+            ('GET', 'INSPECT_CONTAINER'): lambda h, args, query: h._send(200, self._container_detail),
+            ('POST', 'CREATE_CONTAINER'): lambda h, args, query: h._send(201, {'Id': '{0:064x}'.format(1), 'Warnings': None}),
+            ('POST', 'CONTAINER_OPERATION'): lambda h, args, query: h._send_empty(),
+            ('DELETE', 'REMOVE_CONTAINER'): lambda h, args, query: h._send_empty(),
+            ('POST', 'COMMIT_CONTAINER'): lambda h, args, query: h._send(201, {'Id': 'sha256:{0:064x}'.format(1)}),
+            ('GET', 'CONTAINER_STATS'): self._send_stats,
+            ('GET', 'CONTAINER_LOGS'): lambda h, args, query: h._send(200, self._logs, 'application/vnd.docker.raw-stream'),
+            ('GET', 'CONTAINER_PROCESS_LIST'): lambda h, args, query: h._send(200, top),
+            ('GET', 'CONTAINER_ARCHIVE'): lambda h, args, query: h._send(200, self._archive, 'application/x-tar'),
+            ('PUT', 'CONTAINER_ARCHIVE'): lambda h, args, query: h._send_empty(200),
+            ('POST', 'CREATE_EXEC'): lambda h, args, query: h._send(201, {'Id': '{0:064x}'.format(2)}),
+            ('POST', 'START_EXEC'): lambda h, args, query: h._send(200, self._exec_output, 'application/vnd.docker.raw-stream'),
+            ('GET', 'INSPECT_EXEC'): lambda h, args, query: h._send(200, {'ID': args[0], 'Running': False, 'ExitCode': 0}),
+            ('GET', 'LIST_IMAGES'): lambda h, args, query: h._send(200, self._image_list),
+            ('DELETE', 'REMOVE_IMAGE'): lambda h, args, query: h._send(200, [{'Untagged': args[0]}]),
+            ('GET', 'INSPECT_IMAGE'): lambda h, args, query: h._send(200, _image(1)),
+            ('GET', 'IMAGE_HISTORY'): lambda h, args, query: h._send(200, [{'Id': _image(index)['Id'], 'Size': 1000000,
+                                                                           'CreatedBy': '/bin/sh -c #(nop) ADD file'}
+                                                                          for index in range(10)]),
+            ('GET', 'SEARCH_IMAGE'): lambda h, args, query: h._send(200, [{'name': 'app', 'star_count': 42,
+                                                                          'is_official': False}] * 25),
+            ('POST', 'CREATE_IMAGE'): lambda h, args, query: h._send_chunked(self._progress),
+            ('POST', 'PUSH_IMAGE'): lambda h, args, query: h._send_chunked(self._progress),
+            ('GET', 'SAVE_IMAGE'): lambda h, args, query: h._send(200, self._image_tar, 'application/x-tar'),
+            ('GET', 'SAVE_IMAGES'): lambda h, args, query: h._send(200, self._image_tar, 'application/x-tar'),
+            ('POST', 'LOAD_IMAGE'): lambda h, args, query: h._send(200, b'{"stream":"Loaded image: app:latest\\n"}\r\n'),
+            ('POST', 'BUILD_IMAGE'): lambda h, args, query: h._send_chunked(self._build_output)
+        }
+
+    def _send_stats(self, handler, args, query):
+        if 'stream=False' in query or 'stream=0' in query:
+            return handler._send(200, self._stats[-1])
+        handler._send_chunked(self._stats)
+
+    @property
+    def host(self):
+        """Host to give DockerManager."""
+        if self.unix_socket:
+            return 'unix://' + self.unix_socket
+        return '127.0.0.1:{0}'.format(self.server.server_address[1])
+
+    def start(self):
+        if self.unix_socket:
+            if os.path.exists(self.unix_socket):
+                os.unlink(self.unix_socket)
+            self.server = _UnixHTTPServer(self.unix_socket, _UnixHandler)
+        else:
+            self.server = _TCPHTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.fake = self
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self.unix_socket and os.path.exists(self.unix_socket):
+            os.unlink(self.unix_socket)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
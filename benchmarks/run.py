@@ -0,0 +1,218 @@
+"""Benchmarks of the DockerManager operations against the in-process fake daemon.
+
+Every operation is run at every concurrency level, over TCP and over a unix socket,
+and reported with its throughput, p50/p99 latency and the peak memory allocated
+while it ran (measured in a separate pass, tracemalloc slows the calls down).
+
+.. code-block:: bash
+
+    python benchmarks/run.py
+    python benchmarks/run.py --operations list_container get_container_logs --concurrency 1 16 --requests 500
+    python benchmarks/run.py --latency 0.02 --failure-rate 0.05 --json > before.json
+
+The peak memory includes what the fake daemon allocates to answer, its payloads are
+built before the measures start.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fake_daemon import FakeDaemon  # noqa: E402
+from utils import _json_array_helper, _multiplexed_buffer_helper  # noqa: E402
+
+CONTAINER_ID = '{0:064x}'.format(1)
+
+
+def _load_manager_class():
+    spec = importlib.util.spec_from_file_location('docker_manager', os.path.join(ROOT, '__init__.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.DockerManager
+
+
+def _consume(response):
+    content = response['content']
+    if not isinstance(content, (bytes, str, dict, list)) and hasattr(content, '__iter__'):
+        for _ in content:
+            pass
+    return response
+
+
+def _to_devnull(transfer, *args):
+    with open(os.devnull, 'wb') as devnull:
+        return transfer(*(args + (devnull,)))
+
+
+# name -> call(docker), every call makes the requests of one operation.
+OPERATIONS = {
+    'ping': lambda docker: docker.ping(),
+    'get_info': lambda docker: docker.get_info(),
+    'get_version': lambda docker: docker.get_version(),
+    'get_events': lambda docker: _consume(docker.get_events()),
+    'list_container': lambda docker: docker.list_container(all=True),
+    'list_container_stream': lambda docker: _consume(docker.list_container(all=True, stream=True)),
+    'inspect_container': lambda docker: docker.inspect_container(CONTAINER_ID),
+    'inspect_container_summary': lambda docker: docker.inspect_container(CONTAINER_ID, raw_json=True),
+    'list_container_process': lambda docker: docker.list_container_process(CONTAINER_ID),
+    'get_container_logs': lambda docker: docker.get_container_logs(CONTAINER_ID),
+    'get_container_logs_stream': lambda docker: _consume(docker.get_container_logs(CONTAINER_ID, stream=True)),
+    'get_container_statics': lambda docker: docker.get_container_statics(CONTAINER_ID, stream=False),
+    'sample_container_stats': lambda docker: _consume(docker.sample_container_stats(CONTAINER_ID)),
+    'start_container': lambda docker: docker.start_container(CONTAINER_ID),
+    'exec_run': lambda docker: docker.exec_run(CONTAINER_ID, ['pg_isready']),
+    'list_image': lambda docker: docker.list_image(),
+    'get_image_history': lambda docker: docker.get_image_history('app:1'),
+    'pull_image': lambda docker: docker.pull_image('app:latest')['content'].wait(),
+    'save_image': lambda docker: _to_devnull(docker.save_image, 'app:1'),
+    'get_archive': lambda docker: _to_devnull(docker.get_archive, CONTAINER_ID, '/etc/app')
+}
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(percent / 100.0 * (len(values) - 1))))]
+
+
+def _run(call, docker, requests, concurrency):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def timed(_):
+        start = time.perf_counter()
+        try:
+            ok = call(docker)['status']
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                errors[0] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(timed, range(requests)))
+    return time.perf_counter() - start, latencies, errors[0]
+
+
+def _peak_memory(call, docker, requests, concurrency):
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        _run(call, docker, requests, concurrency)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_operation(manager_class, host, name, requests, concurrency):
+    docker = manager_class(host=host, pool_size=max(10, concurrency), timeout=30)
+    try:
+        call = OPERATIONS[name]
+        # Warm up the connections and the lazily built state, eg: the end point patterns.
+        _run(call, docker, concurrency, concurrency)
+        wall, latencies, errors = _run(call, docker, requests, concurrency)
+        peak = _peak_memory(call, docker, max(concurrency, requests // 10), concurrency)
+    finally:
+        docker.close()
+    return {
+        'operation': name,
+        'concurrency': concurrency,
+        'requests': requests,
+        'errors': errors,
+        'throughput': requests / wall if wall else 0.0,
+        'p50_ms': _percentile(latencies, 50) * 1000,
+        'p99_ms': _percentile(latencies, 99) * 1000,
+        'peak_kb': peak / 1024.0
+    }
+
+
+def benchmark_codecs(fake, repeat):
+    """Time the response decoders alone, without the transport."""
+    results = []
+    list_chunks = [fake._container_list[offset:offset + 65536] for offset in range(0, len(fake._container_list), 65536)]
+    codecs = [
+        ('_multiplexed_buffer_helper', lambda: sum(len(payload) for payload in _multiplexed_buffer_helper(fake._logs))),
+        ('_json_array_helper', lambda: sum(1 for _ in _json_array_helper(list_chunks))),
+        ('json.loads', lambda: len(json.loads(fake._container_list)))
+    ]
+    for name, codec in codecs:
+        latencies = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            codec()
+            latencies.append(time.perf_counter() - start)
+        tracemalloc.start()
+        codec()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results.append({
+            'operation': name,
+            'concurrency': 1,
+            'requests': repeat,
+            'errors': 0,
+            'throughput': repeat / sum(latencies),
+            'p50_ms': _percentile(latencies, 50) * 1000,
+            'p99_ms': _percentile(latencies, 99) * 1000,
+            'peak_kb': peak / 1024.0
+        })
+    return results
+
+
+def _print_table(transport, results):
+    print('\n{0}'.format(transport))
+    print('{0:<28} {1:>5} {2:>7} {3:>10} {4:>9} {5:>9} {6:>10}'.format(
+        'operation', 'conc', 'errors', 'ops/s', 'p50 ms', 'p99 ms', 'peak KB'))
+    for result in results:
+        print('{operation:<28} {concurrency:>5} {errors:>7} {throughput:>10.1f} {p50_ms:>9.2f} {p99_ms:>9.2f} {peak_kb:>10.1f}'.format(**result))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--operations', nargs='+', choices=sorted(OPERATIONS), default=sorted(OPERATIONS))
+    parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 8, 32])
+    parser.add_argument('--requests', type=int, default=200, help='Calls of every operation at every concurrency level')
+    parser.add_argument('--transports', nargs='+', choices=['tcp', 'unix'], default=['tcp', 'unix'])
+    parser.add_argument('--containers', type=int, default=1000, help='Containers listed by list_container')
+    parser.add_argument('--log-bytes', type=int, default=1 << 20, help='Size of the container log')
+    parser.add_argument('--latency', type=float, default=0, help='Seconds the fake daemon waits before every answer')
+    parser.add_argument('--failure-rate', type=float, default=0, help='Fraction of the requests failing with a 500')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+    args = parser.parse_args(argv)
+
+    manager_class = _load_manager_class()
+    report = {}
+    for transport in args.transports:
+        unix_socket = os.path.join(tempfile.mkdtemp(), 'docker.sock') if transport == 'unix' else None
+        with FakeDaemon(unix_socket, containers=args.containers, log_bytes=args.log_bytes,
+                        latency=args.latency, failure_rate=args.failure_rate) as fake:
+            results = []
+            for name in args.operations:
+                for concurrency in args.concurrency:
+                    results.append(benchmark_operation(manager_class, fake.host, name, args.requests, concurrency))
+            report[transport] = results
+            if 'codecs' not in report:
+                report['codecs'] = benchmark_codecs(fake, 20)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print('')
+        return
+    for transport, results in report.items():
+        _print_table(transport, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+import posixpath
+import re
+import stat
+
+from utils import _file_chunks_helper
+
+
+def _pattern_regex(pattern):
+    """Compile a .dockerignore pattern, the syntax of Go filepath.Match plus ``**``.
+
+    A pattern matching a directory also matches everything below it.
+    """
+    regex = ''
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == '*':
+            if pattern[i:i + 2] == '**':
+                i += 2
+                if pattern[i:i + 1] == '/':
+                    # '**/' matches any number of directories, none included.
+                    regex += '(?:.*/)?'
+                    i += 1
+                else:
+                    regex += '.*'
+                continue
+            regex += '[^/]*'
+        elif c == '?':
+            regex += '[^/]'
+        elif c == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                regex += re.escape(c)
+            else:
+                chars = pattern[i + 1:end].replace('\\', '\\\\')
+                if chars.startswith('^') or chars.startswith('!'):
+                    chars = '^' + chars[1:]
+                regex += '[' + chars + ']'
+                i = end
+        elif c == '\\' and i + 1 < len(pattern):
+            i += 1
+            regex += re.escape(pattern[i])
+        else:
+            regex += re.escape(c)
+        i += 1
+    return re.compile('^' + regex + '(?:/.*)?$', re.DOTALL)
+
+
+class BuildContext(object):
+    """
+    :param str path: Directory of the build context
+    :param str dockerfile: Path of the Dockerfile in the context(Default is Dockerfile)
+    :param dict digests: Content digests of the files, kept between contexts to hash
+                         only the files changed since(Default is None)
+
+    Members of a build context, selected like the docker CLI does: the patterns of the
+    .dockerignore file exclude paths, the ``!`` patterns include them again, the last
+    matching pattern wins. The Dockerfile and the .dockerignore are always sent.
+
+    .. code-block:: python
+
+        context = BuildContext('/srv/monorepo', 'services/api/Dockerfile')
+        context.digest()
+        for chunk in TarStream(context.members):
+            upload(chunk)
+
+    An excluded directory is not walked unless an ``!`` pattern or the Dockerfile may
+    be below it, so ignoring eg: node_modules or .git also saves reading them.
+    """
+
+    def __init__(self, path, dockerfile='Dockerfile', digests=None):
+        self.path = os.path.abspath(path)
+        self.dockerfile = posixpath.normpath(dockerfile.replace(os.sep, '/')).lstrip('/')
+        self._digests = {} if digests is None else digests
+        self.patterns = self._read_dockerignore()
+        self._exceptions = any(exception for _, exception in self.patterns)
+        self._members = None
+
+    def _read_dockerignore(self):
+        try:
+            with open(os.path.join(self.path, '.dockerignore'), encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        except (IOError, OSError):
+            return []
+        patterns = []
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            exception = line.startswith('!')
+            if exception:
+                line = line[1:].strip()
+            line = posixpath.normpath(line.replace(os.sep, '/')).lstrip('/')
+            if line in ('', '.'):
+                continue
+            patterns.append((_pattern_regex(line), exception))
+        return patterns
+
+    def excluded(self, name):
+        """Whether the path, relative to the context, is left out of it."""
+        if name in (self.dockerfile, '.dockerignore'):
+            return False
+        excluded = False
+        for regex, exception in self.patterns:
+            if excluded == exception and regex.match(name):
+                excluded = not exception
+        return excluded
+
+    @property
+    def members(self):
+        """(path, arcname) of the files, links and directories of the context,
+        directories before their content, in name order."""
+        if self._members is None:
+            self._members = list(self._walk(''))
+        return self._members
+
+    def _walk(self, relative):
+        directory = os.path.join(self.path, relative) if relative else self.path
+        for name in sorted(os.listdir(directory)):
+            arcname = relative + '/' + name if relative else name
+            path = os.path.join(directory, name)
+            is_dir = os.path.isdir(path) and not os.path.islink(path)
+            if self.excluded(arcname):
+                if is_dir and (self._exceptions or self.dockerfile.startswith(arcname + '/')):
+                    for member in self._walk(arcname):
+                        yield member
+                continue
+            yield path, arcname
+            if is_dir:
+                for member in self._walk(arcname):
+                    yield member
+
+    def digest(self, extra=None):
+        """Content hash of the context: names, modes, link targets and file contents,
+        and of ``extra``, eg: the build arguments. Modification times are left out, a
+        checkout touching every file keeps the digest."""
+        digest = hashlib.sha256()
+        for path, arcname in self.members:
+            st = os.lstat(path)
+            if stat.S_ISREG(st.st_mode):
+                content = self._file_digest(path, st)
+            elif stat.S_ISLNK(st.st_mode):
+                content = os.readlink(path).encode('utf-8', 'surrogateescape')
+            elif stat.S_ISDIR(st.st_mode):
+                content = b''
+            else:
+                # Devices, sockets and fifos are not sent.
+                continue
+            digest.update(arcname.encode('utf-8', 'surrogateescape') + b'\0')
+            digest.update('{0:o}\0'.format(st.st_mode).encode('ascii'))
+            digest.update(content + b'\0')
+        if extra:
+            digest.update(json.dumps(extra, sort_keys=True).encode('utf-8'))
+        return 'sha256:' + digest.hexdigest()
+
+    def _file_digest(self, path, st):
+        key = (st.st_size, st.st_mtime_ns, st.st_ino)
+        known = self._digests.get(path)
+        if known is not None and known[0] == key:
+            return known[1]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in _file_chunks_helper(f, 1 << 20):
+                digest.update(chunk)
+        value = digest.digest()
+        self._digests[path] = (key, value)
+        return value
@@ -0,0 +1,196 @@
+import collections
+import copy
+import threading
+import time
+
+from constants import DockerEndPoint
+
+
+class ResponseCache(object):
+    """
+
+    :param dict ttls: Seconds responses are cached per DockerEndPoint key, only the end points
+                      listed are cached(Default is DEFAULT_TTLS)
+    :param int max_entries: Maximum number of cached responses, the least recently used
+                            response is evicted first(Default is 1024)
+
+    Opt-in read cache of a DockerManager. Cached responses are invalidated when they expire,
+    when a call through the same manager changes the container or image they describe,
+    and optionally by the deamon events.
+
+    .. code-block:: python
+
+        docker = DockerManager(host='docker.marlabs.com:2376', cache=ResponseCache({'INSPECT_CONTAINER': 5}))
+        docker.inspect_container('a7da5a495448')
+        docker.inspect_container('a7da5a495448')    # served from the cache
+        docker.restart_container('a7da5a495448')    # invalidates it
+        docker.cache.stats()
+
+        Inventory(docker).start().subscribe(docker.cache.apply_event)
+
+    """
+
+    DEFAULT_TTLS = {
+        'INSPECT_CONTAINER': 2,
+        'INSPECT_IMAGE': 30,
+        'IMAGE_HISTORY': 300,
+        'INFO': 2,
+        'VERSION': 300
+    }
+
+    # End points whose cached responses are dropped by any change of their kind of
+    # resource when the changed resource is not known, eg: a pull.
+    FAMILIES = {
+        'container': ('INSPECT_CONTAINER', 'INFO'),
+        'image': ('INSPECT_IMAGE', 'IMAGE_HISTORY', 'INFO')
+    }
+
+    # Kind of resource changed by the mutating end points.
+    MUTATIONS = {
+        'CREATE_CONTAINER': 'container',
+        'CONTAINER_OPERATION': 'container',
+        'REMOVE_CONTAINER': 'container',
+        'COMMIT_CONTAINER': 'image',
+        'CREATE_IMAGE': 'image',
+        'REMOVE_IMAGE': 'image',
+        'LOAD_IMAGE': 'image',
+        'BUILD_IMAGE': 'image'
+    }
+
+    def __init__(self, ttls=None, max_entries=1024):
+        self.ttls = dict(self.DEFAULT_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._tags = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def lookup(self, end_point, params=None):
+        """Return the cache key of a GET and its cached response, (None, None) when the
+        end point is not cached."""
+        end_point_key, args = DockerEndPoint.resolve(end_point)
+        if end_point_key not in self.ttls:
+            return None, None
+        key = (end_point_key, args, end_point, repr(sorted(params.items()) if isinstance(params, dict) else params))
+        return key, self.get(key)
+
+    def store(self, key, response):
+        self.put(key, key[0], response, key[1])
+
+    def invalidate_end_point(self, end_point):
+        """Drop the cached responses a mutating call to the end point makes stale."""
+        end_point_key, args = DockerEndPoint.resolve(end_point)
+        family = self.MUTATIONS.get(end_point_key)
+        if family is not None:
+            self.invalidate_family(family, args[0] if args else None)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                response = entry[1]
+            else:
+                if entry is not None:
+                    self._discard(key)
+                self.misses += 1
+                return None
+        # Every caller gets its own copy, changing it does not change the cached response.
+        return copy.deepcopy(response)
+
+    def put(self, key, end_point_key, response, resource_ids=()):
+        response = copy.deepcopy(response)
+        tags = set(self._resource_tags(resource_ids))
+        tags.update(self._content_tags(response['content']))
+        tags.add(end_point_key)
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (time.time() + self.ttls[end_point_key], response, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _resource_tags(self, resource_ids):
+        for resource_id in resource_ids:
+            if not resource_id:
+                continue
+            yield resource_id
+            if ':' not in resource_id.split('/')[-1]:
+                yield resource_id + ':latest'
+            # Short ids, so a call using 'a7da5a495448' finds the entry tagged with the full id.
+            short_id = resource_id.replace('sha256:', '')[:12]
+            if len(short_id) == 12:
+                yield short_id
+
+    def _content_tags(self, content):
+        if not isinstance(content, dict):
+            return []
+        tags = [(content.get('Name') or '').lstrip('/')]
+        tags.extend(content.get('RepoTags') or [])
+        return list(self._resource_tags([content.get('Id')])) + [tag for tag in tags if tag]
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def invalidate(self, resource_ids=(), end_point_keys=()):
+        """Drop the cached responses of the resources and end point keys."""
+        tags = list(self._resource_tags(resource_ids)) + list(end_point_keys)
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._discard(key)
+                    self.invalidations += 1
+
+    def invalidate_family(self, family, resource_id=None):
+        """Drop what a change of a container or image may have made stale."""
+        if resource_id:
+            self.invalidate([resource_id], ['INFO'])
+        else:
+            self.invalidate(end_point_keys=self.FAMILIES[family])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def apply_event(self, event):
+        """Invalidate the responses made stale by a deamon event, as yielded by get_events."""
+        event_type = event.get('Type', 'container')
+        if event_type not in self.FAMILIES:
+            return
+        actor = event.get('Actor') or {}
+        resource_ids = [actor.get('ID') or event.get('id'), (actor.get('Attributes') or {}).get('name')]
+        self.invalidate(resource_ids, ['INFO'])
+
+    def stats(self):
+        """Cache counters.
+
+        .. code-block:: json
+
+            {'entries': 12, 'evictions': 0, 'hit_ratio': 0.93, 'hits': 160, 'invalidations': 4, 'misses': 12}
+
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': float(self.hits) / total if total else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries)
+            }
@@ -1,3 +1,5 @@
+import re
+
 from utils import BaseEnum
 
 
@@ -9,6 +11,7 @@ class DockerEndPointEnum(BaseEnum):
         self.PING = '/_ping'
         self.INFO = '/info'
         self.VERSION = '/version'
+        self.EVENTS = '/events'
 
         # Containers
         self.LIST_CONTAINER = '/containers/json'
@@ -20,6 +23,10 @@ class DockerEndPointEnum(BaseEnum):
         self.CONTAINER_STATS = '/containers/{0}/stats'
         self.CONTAINER_LOGS = '/containers/{0}/logs'        
         self.CONTAINER_PROCESS_LIST = '/containers/{0}/top'
+        self.CONTAINER_ARCHIVE = '/containers/{0}/archive'
+        self.CREATE_EXEC = '/containers/{0}/exec'
+        self.START_EXEC = '/exec/{0}/start'
+        self.INSPECT_EXEC = '/exec/{0}/json'
 
         # Images
         self.LIST_IMAGES = '/images/json'
@@ -29,15 +36,47 @@ class DockerEndPointEnum(BaseEnum):
         self.SEARCH_IMAGE = '/images/search?term={0}'
         self.CREATE_IMAGE = '/images/create'
         self.PUSH_IMAGE = '/images/{0}/push{1}'
-
-        # docker registry
-        self.DOCKER_REGISTRY = 'https://registry.hub.docker.com/v1/repositories/'
-        self.IMAGE_TAGS = self.DOCKER_REGISTRY + '{0}/tags'
+        self.SAVE_IMAGE = '/images/{0}/get'
+        self.SAVE_IMAGES = '/images/get'
+        self.LOAD_IMAGE = '/images/load'
+        self.BUILD_IMAGE = '/build'
+
+    def resolve(self, end_point):
+        """Return the (key, arguments) of the end point template a formatted end point
+        was built from, eg: '/containers/a7da5a495448/json' -> ('INSPECT_CONTAINER', ('a7da5a495448',)).
+        """
+        patterns = type(self).__dict__.get('_patterns')
+        if patterns is None:
+            patterns = []
+            for key, template in self.as_dict().items():
+                if not template.startswith('/'):
+                    continue
+                parts = re.split(r'\{\d\}', template.split('?')[0])
+                regex = re.compile('^' + '(.*)'.join([re.escape(part) for part in parts]) + '$')
+                # The most specific template, with the longest literal part, wins.
+                patterns.append((-len(''.join(parts)), len(parts), key, regex))
+            patterns.sort()
+            type(self)._patterns = patterns
+        path = end_point.split('?')[0]
+        for _, _, key, regex in patterns:
+            match = regex.match(path)
+            if match:
+                return key, match.groups()
+        return None, ()
 
 
 DockerEndPoint = DockerEndPointEnum()
 
 
+class RegistryEndPointEnum(BaseEnum):
+
+    def __init__(self):
+        self.TAGS = '/v2/{0}/tags/list'
+        self.MANIFEST = '/v2/{0}/manifests/{1}'
+
+RegistryEndPoint = RegistryEndPointEnum()
+
+
 # class ContainerTranformTypeEnum(BaseEnum):
 
 #     def __init__(self):
@@ -52,6 +91,7 @@ class WebConnectionTypeEnum(BaseEnum):
     def __init__(self):
         self.SECURE = 'https://'
         self.INSECURE = 'http://'
+        self.UNIX = 'unix://'
 
 WebConnectionType = WebConnectionTypeEnum()
 
@@ -76,3 +116,24 @@ class ContainerOperationEnum(BaseEnum):
         self.RENAME = 'rename'
 
 ContainerOperation = ContainerOperationEnum()
+
+
+class StreamTypeEnum(BaseEnum):
+
+    def __init__(self):
+        self.STDIN = 0
+        self.STDOUT = 1
+        self.STDERR = 2
+
+StreamType = StreamTypeEnum()
+
+
+class TimeoutClassEnum(BaseEnum):
+
+    def __init__(self):
+        self.FAST = 'fast'
+        self.READ = 'read'
+        self.WRITE = 'write'
+        self.LONG = 'long'
+
+TimeoutClass = TimeoutClassEnum()
@@ -1,14 +1,23 @@
-from docker_server import DockerServer
-from constants import DockerEndPoint, ContainerOperation
-from utils import _multiplexed_buffer_helper
+import json
+import shlex
+import time
+
+from docker_server import DockerServer, STREAM_CHUNK_SIZE
+from constants import DockerEndPoint, ContainerOperation, StreamType
+from archive import TarStream, _transfer_stats, _untar_stream_helper
+from log_follower import LogFollower
+from models import Container, ContainerDetail, Process, Result
+from stats import StatsDecoder, _stats_record_helper
+from transport import ResponseStream
+from utils import MultiplexedStreamDecoder, _file_chunks_helper, _json_array_helper, _multiplexed_stream_helper, _rechunk_helper, _run_concurrently
 
 
 class ContainerOperations(DockerServer):
 
-    def __init__(self, host, tls_verify=False, cert=None, key=None, ca=False):
-        super(ContainerOperations, self).__init__(host, tls_verify, cert, key, ca)
+    def __init__(self, host, tls_verify=False, cert=None, key=None, ca=False, **kwargs):
+        super(ContainerOperations, self).__init__(host, tls_verify, cert, key, ca, **kwargs)
 
-    def list_container(self, all=False, limit=None, since=None, before=None, size=False, filters=None):
+    def list_container(self, all=False, limit=None, since=None, before=None, size=False, filters=None, stream=False, fields=None):
         """
         :param bool all: List all the containers in a host.(Default False) 
         :param int limit: Show 'limit' last created containers, include non-running ones(Default is None)
@@ -19,6 +28,9 @@ class ContainerOperations(DockerServer):
                                 1. exited=<int>; -- containers with exit code of <int> 
                                 2. status=(restarting|running|paused|exited)
                                 3. label=key or label="key=value" of a container label
+        :param bool stream: Parse the response incrementally and yield one container at a time(Default is False)
+        :param list fields: Keys kept in every streamed container, eg: ['Id', 'Names', 'State'](Default is None, all keys),
+                            not supported by typed managers, whose Container models have fixed attributes.
 
         List all the containers in docker host.
 
@@ -42,6 +54,14 @@ class ContainerOperations(DockerServer):
                u'Status': u'Restarting (1) 30 hours ago'}],
              'status': True}
 
+        On hosts with many containers, stream the list instead of decoding it at once.
+
+        .. code-block:: python
+
+            r = docker.list_container(all=True, size=True, stream=True, fields=['Id', 'SizeRw'])
+            for container in r['content']:
+                print(container['Id'], container['SizeRw'])
+
         """
 
         query_param = {
@@ -52,6 +72,19 @@ class ContainerOperations(DockerServer):
             'size': size,
             'filters': filters
         }
+        if self.typed:
+            if fields:
+                raise ValueError('fields is not supported by typed managers, read the Container attributes instead')
+            response = self._get(DockerEndPoint.LIST_CONTAINER, query_param, stream=True, raw=True)
+            if not response['status']:
+                return Result(False, response['content'])
+            containers = (Container(raw) for raw in _json_array_helper(response['content'], raw=True))
+            return Result(True, containers if stream else list(containers))
+        if stream:
+            response = self._get(DockerEndPoint.LIST_CONTAINER, query_param, stream=True, raw=True)
+            if response['status']:
+                response['content'] = _json_array_helper(response['content'], fields)
+            return response
         return self._get(DockerEndPoint.LIST_CONTAINER, query_param)
 
     def inspect_container(self, container_id, raw_json=False):
@@ -96,6 +129,8 @@ class ContainerOperations(DockerServer):
         response = self._get(DockerEndPoint.INSPECT_CONTAINER.format(container_id))
         if raw_json and response['status']:
             return self._prepare_container_info_json(response['content'])
+        if self.typed:
+            return Result(response['status'], ContainerDetail(response['content']) if response['status'] else response['content'])
         return response
 
     def create_container_from_config(self, configuration, name=None):
@@ -249,7 +284,7 @@ class ContainerOperations(DockerServer):
             'force': force,
             'v': volume
         }
-        return self._delete(DockerEndPoint.REMOVE_CONTAINER.format(container_id), params)
+        return self._delete(DockerEndPoint.REMOVE_CONTAINER.format(container_id), params=params)
 
     def commit_container(self, container_id, image_name=None, tag=None, comment=None, author=None):
         """
@@ -284,9 +319,10 @@ class ContainerOperations(DockerServer):
             query_param = query_param + "&author=" + author
         return self._post(DockerEndPoint.COMMIT_CONTAINER.format(query_param))
 
-    def get_container_statics(self, container_id):
+    def get_container_statics(self, container_id, stream=True):
         """
         :param str container_id: Container Id to commit.
+        :param bool stream: Stream the statistics every second, else return a single decoded sample(Default is True)
         
         Get container statitics of running container.
 
@@ -302,9 +338,43 @@ class ContainerOperations(DockerServer):
             '{"read":"2016-02-09T14:31:34.283155198+05:30","precpu_stats":{"cpu_usage":{"total_usage":0,"percpu_usage":null,"usage_in_kernelmode":0,"usage_in_usermode":0},"system_cpu_usage":0,"throttling_data":{"periods":0,"throttled_periods":0,"throttled_time":0}},"cpu_stats":{"cpu_usage":{"total_usage":39187676,"percpu_usage":[3032123,12531305,4135257,19488991],"usage_in_kernelmode":0,"usage_in_usermode":20000000},"system_cpu_usage":1317876330000000,"throttling_data":{"periods":0,"throttled_periods":0,"throttled_time":0}},"memory_stats":{"usage":1024000,"max_usage":6897664,"stats":{"active_anon":266240,"active_file":233472,"cache":524288,"hierarchical_memory_limit":18446744073709551615,"inactive_anon":270336,"inactive_file":253952,"mapped_file":45056,"pgfault":3216,"pgmajfault":8,"pgpgin":2322,"pgpgout":2072,"rss":499712,"rss_huge":0,"total_active_anon":266240,"total_active_file":233472,"total_cache":524288,"total_inactive_anon":270336,"total_inactive_file":253952,"total_mapped_file":45056,"total_pgfault":3216,"total_pgmajfault":8,"total_pgpgin":2322,"total_pgpgout":2072,"total_rss":499712,"total_rss_huge":0,"total_unevictable":0,"total_writeback":0,"unevictable":0,"writeback":0},"failcnt":0,"limit":8187768832},"blkio_stats":{"io_service_bytes_recursive":[{"major":8,"minor":0,"op":"Read","value":487424},{"major":8,"minor":0,"op":"Write","value":0},{"major":8,"minor":0,"op":"Sync","value":0},{"major":8,"minor":0,"op":"Async","value":487424},{"major":8,"minor":0,"op":"Total","value":487424}],"io_serviced_recursive":[{"major":8,"minor":0,"op":"Read","value":19},{"major":8,"minor":0,"op":"Write","value":0},{"major":8,"minor":0,"op":"Sync","value":0},{"major":8,"minor":0,"op":"Async","value":19},{"major":8,"minor":0,"op":"Total","value":19}],"io_queue_recursive":[],"io_service_time_recursive":[],"io_wait_time_recursive":[],"io_merged_recursive":[],"io_time_recursive":[],"sectors_recursive":[]},"networks":{"eth0":{"rx_bytes":5380,"rx_packets":36,"rx_errors":0,"rx_dropped":0,"tx_bytes":648,"tx_packets":8,"tx_errors":0,"tx_dropped":0}}}'
 
         """
+        if not stream:
+            return self._get(DockerEndPoint.CONTAINER_STATS.format(container_id), {'stream': False})
         return self._get(DockerEndPoint.CONTAINER_STATS.format(container_id), stream=True)
 
-    def get_container_logs(self, container_id, std_out=True, std_err=True, date_time=0, time_stamp=False, count='all'):
+    def sample_container_stats(self, container_id, stream=True):
+        """
+        :param str container_id: Container Id.
+        :param bool stream: Yield a sample every second, else return one sample for cheap polling(Default is True)
+
+        Get decoded container statistics. Every sample is a compact StatsSample with the
+        CPU percentage, memory usage/limit, block I/O bytes and network bytes and rates,
+        typed managers return the same samples in a Result.
+
+        .. code-block:: python
+
+            r = docker.sample_container_stats('cb8c119188c9')
+            for record in r['content']:
+                print(record.cpu_percent, record.memory_usage, record.rx_rate)
+
+        Output
+
+        .. code-block:: json
+
+            StatsSample(timestamp=1455008494.283155, cpu_percent=0.42, memory_usage=499712)
+
+        """
+        response = self.get_container_statics(container_id, stream)
+        if response['status']:
+            if stream:
+                response['content'] = _stats_record_helper(response['content'])
+            else:
+                response['content'] = StatsDecoder().decode(response['content'])
+        if self.typed:
+            return Result(response['status'], response['content'])
+        return response
+
+    def get_container_logs(self, container_id, std_out=True, std_err=True, date_time=0, time_stamp=False, count='all', stream=False, split_streams=False, follow=False):
         """
 
         :param str container_id: Container Id
@@ -313,6 +383,9 @@ class ContainerOperations(DockerServer):
         :param int date_time: UNIX timestamp to filter logs.(Default 0)
         :param bool time_stamp: print timestamp for every log line.(Default is False)
         :param int count: Specified number of lines at the end of logs(Default is all)
+        :param bool stream: Return an iterator yielding the log lines as they are read(Default is False)
+        :param bool split_streams: Yield (stream_id, line) tuples, see StreamType(Default is False)
+        :param bool follow: Keep the stream open and yield new lines as they are logged, implies stream(Default is False)
 
         Get container logs.
 
@@ -326,15 +399,66 @@ class ContainerOperations(DockerServer):
 
             {'content': 'error: missing MYSQL_PORT_3306_TCP environment variable. Did you forget to --link some_mysql_container:mysql ?', 'status': True}
 
-        """
-        d = {'stdout': std_out, 'stderr': std_err, 'since': date_time, 'timestamps': time_stamp, 'tail': count}
-        params = '&'.join(['{}={}'.format(k, v) for k, v in d.iteritems()])
-        end_url = '?'.join([DockerEndPoint.CONTAINER_LOGS.format(container_id), params])
-        response = self._get(end_url)
+        The log is demultiplexed while it is downloaded, with stream=True the lines are
+        yielded incrementally instead of being kept in memory.
 
-        response['content'] = ''.join([x for x in _multiplexed_buffer_helper(response['content'])])
+        .. code-block:: python
+
+            r = docker.get_container_logs('0bd62601d47c', stream=True, split_streams=True)
+            for stream_id, line in r['content']:
+                if stream_id == StreamType.STDERR:
+                    print(line)
+
+        """
+        params = {'stdout': std_out, 'stderr': std_err, 'since': date_time, 'timestamps': time_stamp, 'tail': count}
+        timeout = False
+        if follow:
+            params['follow'] = stream = True
+            timeout = None
+        response = self._get(DockerEndPoint.CONTAINER_LOGS.format(container_id), params, stream=True, timeout=timeout, raw=True)
+        if not response['status']:
+            return response
+        if stream or split_streams:
+            lines = _multiplexed_stream_helper(response['content'], split_streams)
+            # Still closable, eg: to stop following the logs from another thread.
+            response['content'] = ResponseStream(lines, response['content'].response) if stream else list(lines)
+        else:
+            decoder = MultiplexedStreamDecoder()
+            response['content'] = b''.join([payload for chunk in response['content'] for _, payload in decoder.feed(chunk)])
         return response
 
+    def follow_container_logs(self, container_ids, std_out=True, std_err=True, date_time=0, count='all', buffer_size=1000, reorder_window=0.5):
+        """
+        :param list container_ids: Container Ids to follow.
+        :param bool std_out: Follow stdout logs(Default is True)
+        :param bool std_err: Follow std_err logs(Default is True)
+        :param int date_time: UNIX timestamp to start from(Default 0)
+        :param int count: Number of existing lines to start with(Default is all)
+        :param int buffer_size: Lines buffered per container before reading from the deamon is paused(Default is 1000)
+        :param float reorder_window: Seconds a line waits for earlier lines of the other containers(Default is 0.5)
+
+        Follow the logs of many containers as one time ordered stream.
+
+        .. code-block:: python
+
+            r = docker.follow_container_logs(['0bd62601d47c', 'cb8c119188c9'], count=0)
+            for entry in r['content']:
+                print(entry.timestamp, entry.container_id, entry.stream_id, entry.line)
+            r['content'].close()
+
+        Output
+
+        .. code-block:: json
+
+            LogEntry(timestamp=1455008494.283155, container_id='0bd62601d47c', stream_id=1, line='GET / 200')
+
+        """
+        follower = LogFollower(self, container_ids, std_out, std_err, date_time, count, buffer_size, reorder_window)
+        return {
+            'status': True,
+            'content': follower.start()
+        }
+
     def list_container_process(self, container_id, ps_args=None):
         """
         :param str container_id: Container Id.
@@ -373,41 +497,479 @@ class ContainerOperations(DockerServer):
         end_url = DockerEndPoint.CONTAINER_PROCESS_LIST.format(container_id)
         if ps_args:
             end_url = end_url + '?ps_args=' + ps_args
-        return self._get(end_url)
-
-    def _prepare_container_info_json(self, content):
-        created_date = content['Created'].split('.')
-        created_date = created_date[0].split('T')
-        content_json = {
-            'Cont_Id': content['Id'],
-            'Name': content['Name'].split('/')[1],
-            'Image': content['Config']['Image'],
-            'Created_date': created_date[0],
-            'Created_time': created_date[1],
-            'State_running': content['State']['Running'],
-            'State_restarting': content['State']['Restarting'],
-            'State_paused': content['State']['Paused'],
-            'CpuShares': content['HostConfig']['CpuShares'],
-            'Cpuset': content['HostConfig']['CpusetCpus'],
-            'Links': content['HostConfig']['Links'],
-            'Env': content['Config']['Env'],
-            'VolumesFrom': content['HostConfig']['VolumesFrom'],
-            'Volume': content['Config']['Volumes'],
-            'Cmd': content['Config']['Cmd'],
-            'Entry_point': content['Config']['Entrypoint'],
-            'Memory': content['HostConfig']['Memory'],
-            'Memory_swap': content['HostConfig']['MemorySwap'],
-            'IP': content.get('NetworkSettings')['IPAddress']
+        response = self._get(end_url)
+        if self.typed:
+            if not response['status']:
+                return Result(False, response['content'])
+            titles = response['content']['Titles']
+            return Result(True, [Process(titles, row) for row in response['content']['Processes'] or []])
+        return response
+
+    def bulk_container_operation(self, operation, container_ids=None, filters=None, concurrency=10, wave_size=None, timeout=None, **kwargs):
+        """
+        :param str operation: One of start, stop, restart, pause, unpause or remove.
+        :param list container_ids: Container Ids/names to operate on(Default is None)
+        :param filters: list_container filters selecting the containers when no ids are given(Default is None)
+        :param int concurrency: Number of containers operated on at the same time(Default is 10)
+        :param int wave_size: Operate on the containers in successive waves of this size, the
+                              next wave starts when the previous one is done(Default is None, one wave)
+        :param float timeout: Deadline in seconds for every container(Default is None)
+        :param kwargs: Extra arguments of the single container operation, eg: force for remove.
+
+        Run a lifecycle operation on many containers concurrently.
+
+        .. code-block:: python
+
+            docker.bulk_container_operation('restart', ['0bd62601d47c', 'cb8c119188c9'], concurrency=20, wave_size=50)
+
+        Output
+
+        .. code-block:: json
+
+            {'content': {'0bd62601d47c': {'content': '', 'elapsed': 0.41, 'status': True},
+                         'cb8c119188c9': {'content': '{"message":"No such container: cb8c119188c9"}', 'elapsed': 0.01, 'status': False}},
+             'status': False}
+
+        """
+        operations = {
+            ContainerOperation.START: self.start_container,
+            ContainerOperation.STOP: self.stop_container,
+            ContainerOperation.RESTART: self.restart_container,
+            ContainerOperation.PAUSE: self.pause_container,
+            ContainerOperation.UNPAUSE: self.unpause_container,
+            'remove': self.remove_container
+        }
+        if operation not in operations:
+            raise ValueError('Unsupported bulk operation: {0}'.format(operation))
+        if container_ids is None:
+            response = self._list_container_ids(filters)
+            if not response['status']:
+                return response
+            container_ids = response['content']
+
+        def call(container_id):
+            return operations[operation](container_id, **kwargs)
+
+        container_ids = list(container_ids)
+        wave_size = wave_size or len(container_ids) or 1
+        results = {}
+        for index in range(0, len(container_ids), wave_size):
+            results.update(_run_concurrently(call, container_ids[index:index + wave_size], concurrency, timeout))
+        return {
+            'status': all(result['status'] for result in results.values()),
+            'content': results
+        }
+
+    def start_containers(self, container_ids=None, filters=None, concurrency=10, wave_size=None, timeout=None):
+        """Start many containers concurrently, see :meth:`bulk_container_operation`."""
+        return self.bulk_container_operation(ContainerOperation.START, container_ids, filters, concurrency, wave_size, timeout)
+
+    def stop_containers(self, container_ids=None, filters=None, concurrency=10, wave_size=None, timeout=None):
+        """Stop many containers concurrently, see :meth:`bulk_container_operation`."""
+        return self.bulk_container_operation(ContainerOperation.STOP, container_ids, filters, concurrency, wave_size, timeout)
+
+    def restart_containers(self, container_ids=None, filters=None, concurrency=10, wave_size=None, timeout=None):
+        """Restart many containers concurrently, see :meth:`bulk_container_operation`."""
+        return self.bulk_container_operation(ContainerOperation.RESTART, container_ids, filters, concurrency, wave_size, timeout)
+
+    def pause_containers(self, container_ids=None, filters=None, concurrency=10, wave_size=None, timeout=None):
+        """Pause many containers concurrently, see :meth:`bulk_container_operation`."""
+        return self.bulk_container_operation(ContainerOperation.PAUSE, container_ids, filters, concurrency, wave_size, timeout)
+
+    def unpause_containers(self, container_ids=None, filters=None, concurrency=10, wave_size=None, timeout=None):
+        """Unpause many containers concurrently, see :meth:`bulk_container_operation`."""
+        return self.bulk_container_operation(ContainerOperation.UNPAUSE, container_ids, filters, concurrency, wave_size, timeout)
+
+    def remove_containers(self, container_ids=None, filters=None, concurrency=10, wave_size=None, timeout=None, force=False, volume=False):
+        """Remove many containers concurrently, see :meth:`bulk_container_operation`."""
+        return self.bulk_container_operation('remove', container_ids, filters, concurrency, wave_size, timeout, force=force, volume=volume)
+
+    def inspect_containers(self, container_ids=None, filters=None, fields=None, concurrency=10, timeout=None):
+        """
+        :param list container_ids: Container Ids/names to inspect(Default is None)
+        :param filters: list_container filters selecting the containers when no ids are given(Default is None, all containers)
+        :param list fields: Summary fields to build, eg: ['Name', 'Image', 'State_running'](Default is None, all fields)
+        :param int concurrency: Number of containers inspected at the same time(Default is 10)
+        :param float timeout: Deadline in seconds for every container(Default is None)
+
+        Inspect many containers concurrently and return their summaries, as built by
+        inspect_container(raw_json=True), keyed by container id. An unknown field raises
+        ValueError before any container is inspected.
+
+        .. code-block:: python
+
+            docker.inspect_containers(fields=['Name', 'Image', 'State_running', 'port_map'])
+
+        Output
+
+        .. code-block:: json
+
+            {'content': {u'a7da5a495448...': {'content': {'Image': u'pidgin:latest', 'Name': u'pidgin',
+                                                          'State_running': True, 'port_map': [u'80/tcp:8080']},
+                                              'elapsed': 0.012,
+                                              'status': True}},
+             'status': True}
+
+        """
+        unknown = [field for field in fields or () if field not in _CONTAINER_SUMMARY_FIELDS]
+        if unknown:
+            raise ValueError('Unknown summary fields: {0}, expected some of: {1}'.format(
+                ', '.join(unknown), ', '.join(sorted(_CONTAINER_SUMMARY_FIELDS))))
+        if container_ids is None:
+            response = self._list_container_ids(filters)
+            if not response['status']:
+                return response
+            container_ids = response['content']
+
+        def call(container_id):
+            response = self._get(DockerEndPoint.INSPECT_CONTAINER.format(container_id))
+            if not response['status']:
+                return response
+            return self._prepare_container_info_json(response['content'], fields)
+
+        results = _run_concurrently(call, container_ids, concurrency, timeout)
+        return {
+            'status': all(result['status'] for result in results.values()),
+            'content': results
+        }
+
+    def _list_container_ids(self, filters=None):
+        # Read untyped, list_container returns Container models on typed managers.
+        query_param = {
+            'all': True,
+            'filters': json.dumps(filters) if isinstance(filters, dict) else filters
+        }
+        response = self._get(DockerEndPoint.LIST_CONTAINER, query_param)
+        if response['status']:
+            response = {'status': True, 'content': [container['Id'] for container in response['content']]}
+        return response
+
+    def put_archive(self, container_id, path, source, no_overwrite_dir_non_dir=False, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        :param str container_id: Container Id.
+        :param str path: Directory of the container to extract the files in, eg: /etc/app
+        :param source: Local file/directory path, or list of paths, or a readable tar file-like object.
+        :param bool no_overwrite_dir_non_dir: Fail if a directory would replace a file or the opposite(Default is False)
+        :param int chunk_size: Bytes read and uploaded at a time(Default is 65536)
+
+        Copy local files into a container. The tar archive of the paths is generated
+        while it is uploaded, every path is added under its base name.
+
+        .. code-block:: python
+
+            docker.put_archive('0bd62601d47c', '/etc/nginx', ['nginx.conf', 'conf.d'])
+
+        Output
+
+        .. code-block:: json
+
+            {'content': {'bytes': 24576, 'elapsed': 0.02, 'files': 5, 'throughput': 1228800.0}, 'status': True}
+
+        """
+        stream = None
+        if hasattr(source, 'read'):
+            chunks = _file_chunks_helper(source, chunk_size)
+        else:
+            stream = TarStream(source, chunk_size)
+            chunks = iter(stream)
+        params = {
+            'path': path,
+            'noOverwriteDirNonDir': no_overwrite_dir_non_dir
+        }
+        response = self._put(
+            DockerEndPoint.CONTAINER_ARCHIVE.format(container_id),
+            chunks,
+            headers={'Content-Type': 'application/x-tar'},
+            params=params,
+            timeout=None
+        )
+        if not response['status'] or stream is None:
+            return response
+        return {'status': True, 'content': stream.stats()}
+
+    def put_archives(self, container_ids, path, source, concurrency=10, timeout=None, no_overwrite_dir_non_dir=False):
+        """
+        :param list container_ids: Container Ids/names to copy the files into.
+        :param str path: Directory of the containers to extract the files in.
+        :param source: Local file/directory path, or list of paths.
+        :param int concurrency: Number of containers copied to at the same time(Default is 10)
+        :param float timeout: Deadline in seconds for every container(Default is None)
+        :param bool no_overwrite_dir_non_dir: See :meth:`put_archive`(Default is False)
+
+        Copy the same local files into many containers concurrently, see :meth:`put_archive`.
+        Every upload generates its own archive stream from the paths.
+        """
+        results = _run_concurrently(
+            lambda container_id: self.put_archive(container_id, path, source, no_overwrite_dir_non_dir),
+            container_ids,
+            concurrency,
+            timeout
+        )
+        return {
+            'status': all(result['status'] for result in results.values()),
+            'content': results
         }
-        exposed_port = content['HostConfig']['PortBindings'].keys()
-        port_binding = content['HostConfig']['PortBindings'].values()
-        port_map = []
-        for index in range(0, len(port_binding)):
-            port = exposed_port[index] + ':' + port_binding[index][0]['HostPort']
-            port_map.append(port)
-        content_json['port_map'] = port_map
+
+    def get_archive(self, container_id, path, destination, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        :param str container_id: Container Id.
+        :param str path: File or directory of the container to copy.
+        :param destination: Local directory to extract the files in, or a writable file-like object
+                            the tar archive is written to.
+        :param int chunk_size: Bytes written at a time to a file-like destination(Default is 65536)
+
+        Copy files out of a container. The tar archive is extracted, or written, member by
+        member as it is downloaded.
+
+        .. code-block:: python
+
+            docker.get_archive('0bd62601d47c', '/var/log/nginx', '/tmp/logs')
+
+        Output
+
+        .. code-block:: json
+
+            {'content': {'bytes': 1058816, 'elapsed': 0.05, 'files': 3, 'throughput': 21176320.0}, 'status': True}
+
+        """
+        start = time.time()
+        response = self._get(
+            DockerEndPoint.CONTAINER_ARCHIVE.format(container_id),
+            {'path': path},
+            stream=True,
+            timeout=None,
+            raw=True
+        )
+        if not response['status']:
+            return response
+        try:
+            if not hasattr(destination, 'write'):
+                return {'status': True, 'content': _untar_stream_helper(response['content'], destination)}
+            size = 0
+            for chunk in _rechunk_helper(response['content'], chunk_size):
+                destination.write(chunk)
+                size += len(chunk)
+        finally:
+            response['content'].close()
+        return {'status': True, 'content': _transfer_stats(size, start, time.time(), None)}
+
+    def create_exec(self, container_id, cmd, std_out=True, std_err=True, tty=False, env=None, user=None, working_dir=None, privileged=False):
+        """
+        :param str container_id: Container Id.
+        :param cmd: Command to run, eg: ['cat', '/etc/hosts'] or 'cat /etc/hosts'
+        :param bool std_out: Attach stdout(Default is True)
+        :param bool std_err: Attach stderr(Default is True)
+        :param bool tty: Allocate a pseudo-TTY, the output is not multiplexed then(Default is False)
+        :param list env: Environment variables, eg: ['DEBUG=1'](Default is None)
+        :param str user: User to run the command as(Default is None, the container user)
+        :param str working_dir: Directory to run the command in(Default is None)
+        :param bool privileged: Run the command with extended privileges(Default is False)
+
+        Create an exec instance running a command in a running container.
+
+        .. code-block:: python
+
+            docker.create_exec('0bd62601d47c', ['cat', '/etc/hosts'])
+
+        Output
+
+        .. code-block:: json
+
+            {'content': {u'Id': u'f90e34656806...'}, 'status': True}
+
+        """
+        configuration = {
+            'Cmd': shlex.split(cmd) if isinstance(cmd, str) else list(cmd),
+            'AttachStdout': std_out,
+            'AttachStderr': std_err,
+            'Tty': tty,
+            'Privileged': privileged
+        }
+        if env is not None:
+            configuration['Env'] = env
+        if user is not None:
+            configuration['User'] = user
+        if working_dir is not None:
+            configuration['WorkingDir'] = working_dir
+        headers = {'content-type': 'application/json'}
+        return self._post(DockerEndPoint.CREATE_EXEC.format(container_id), json.dumps(configuration), headers)
+
+    def start_exec(self, exec_id, stream=False, split_streams=False, tty=False, timeout=None):
+        """
+        :param str exec_id: Exec instance Id, as returned by create_exec.
+        :param bool stream: Return an iterator yielding the output lines as they are read(Default is False)
+        :param bool split_streams: Yield (stream_id, line) tuples, see StreamType(Default is False)
+        :param bool tty: The exec instance was created with a TTY(Default is False)
+        :param float timeout: Seconds to wait for output from the command(Default is None, no limit)
+
+        Start an exec instance and read its output. The output is demultiplexed while it
+        is read, like get_container_logs. A streamed output is a ResponseStream, closing it
+        releases the connection before the command exits.
+
+        .. code-block:: python
+
+            exec_id = docker.create_exec('0bd62601d47c', 'ls /')['content']['Id']
+            for stream_id, line in docker.start_exec(exec_id, stream=True, split_streams=True)['content']:
+                print(stream_id, line)
+
+        """
+        response = self._start_exec_chunks(exec_id, tty, timeout)
+        if not response['status']:
+            return response
+        if tty:
+            response['content'] = response['content'] if stream else b''.join(response['content'])
+        elif stream or split_streams:
+            chunks = response['content']
+            lines = _multiplexed_stream_helper(chunks, split_streams)
+            response['content'] = ResponseStream(lines, chunks.response, chunks.close) if stream else list(lines)
+        else:
+            decoder = MultiplexedStreamDecoder()
+            response['content'] = b''.join([payload for chunk in response['content'] for _, payload in decoder.feed(chunk)])
+        return response
+
+    def _start_exec_chunks(self, exec_id, tty, timeout):
+        headers = {'content-type': 'application/json'}
+        return self._post(
+            DockerEndPoint.START_EXEC.format(exec_id),
+            json.dumps({'Detach': False, 'Tty': tty}),
+            headers,
+            timeout=timeout,
+            stream=True,
+            raw=True
+        )
+
+    def inspect_exec(self, exec_id):
+        """
+        :param str exec_id: Exec instance Id.
+
+        Get the state of an exec instance.
+
+        .. code-block:: json
+
+            {'content': {u'ExitCode': 0, u'ID': u'f90e34656806...', u'Running': False, u'Pid': 42000, ...},
+             'status': True}
+
+        """
+        return self._get(DockerEndPoint.INSPECT_EXEC.format(exec_id))
+
+    def exec_run(self, container_id, cmd, timeout=None, **kwargs):
+        """
+        :param str container_id: Container Id.
+        :param cmd: Command to run, eg: ['pg_isready', '-q']
+        :param float timeout: Seconds to wait for output from the command(Default is None, no limit)
+        :param kwargs: Extra arguments of create_exec, eg: user, env.
+
+        Run a command in a container and wait for it to exit, the stdout and stderr
+        output are kept apart.
+
+        .. code-block:: python
+
+            docker.exec_run('0bd62601d47c', ['pg_isready', '-q'], timeout=5)
+
+        Output
+
+        .. code-block:: json
+
+            {'content': {'exit_code': 0, 'stderr': '', 'stdout': '/var/run/postgresql:5432 - accepting connections\\n'},
+             'status': True}
+
+        """
+        response = self.create_exec(container_id, cmd, **kwargs)
+        if not response['status']:
+            return response
+        exec_id = response['content']['Id']
+        tty = kwargs.get('tty', False)
+        response = self._start_exec_chunks(exec_id, tty, timeout)
+        if not response['status']:
+            return response
+        output = {StreamType.STDOUT: bytearray(), StreamType.STDERR: bytearray()}
+        if tty:
+            for chunk in response['content']:
+                output[StreamType.STDOUT] += chunk
+        else:
+            decoder = MultiplexedStreamDecoder()
+            for chunk in response['content']:
+                for stream_id, payload in decoder.feed(chunk):
+                    output.setdefault(stream_id, bytearray()).extend(payload)
+        response = self.inspect_exec(exec_id)
+        if not response['status']:
+            return response
+        return {
+            'status': True,
+            'content': {
+                'exit_code': response['content'].get('ExitCode'),
+                'stdout': bytes(output[StreamType.STDOUT]),
+                'stderr': bytes(output[StreamType.STDERR])
+            }
+        }
+
+    def exec_containers(self, container_ids, cmd, concurrency=10, timeout=None, **kwargs):
+        """
+        :param list container_ids: Container Ids/names to run the command in.
+        :param cmd: Command to run.
+        :param int concurrency: Number of containers the command runs in at the same time(Default is 10)
+        :param float timeout: Deadline in seconds for every container(Default is None)
+        :param kwargs: Extra arguments of create_exec, eg: user, env.
+
+        Run the same command in many containers concurrently, see :meth:`exec_run`.
+
+        .. code-block:: python
+
+            r = docker.exec_containers(['0bd62601d47c', 'cb8c119188c9'], ['pg_isready', '-q'], timeout=5)
+            unhealthy = [container_id for container_id, result in r['content'].items()
+                         if not result['status'] or result['content']['exit_code'] != 0]
+
+        """
+        results = _run_concurrently(
+            lambda container_id: self.exec_run(container_id, cmd, timeout=timeout, **kwargs),
+            container_ids,
+            concurrency,
+            timeout
+        )
+        return {
+            'status': all(result['status'] for result in results.values()),
+            'content': results
+        }
+
+    def _prepare_container_info_json(self, content, fields=None):
+        config = content.get('Config') or {}
+        host_config = content.get('HostConfig') or {}
+        state = content.get('State') or {}
+        content_json = {}
+        for field in fields or _CONTAINER_SUMMARY_FIELDS:
+            content_json[field] = _CONTAINER_SUMMARY_FIELDS[field](content, config, host_config, state)
         content = {
             'status': True,
             'content': content_json
         }
         return content
+
+
+def _prepare_port_map(host_config):
+    return [port + ':' + bindings[0]['HostPort'] for port, bindings in (host_config.get('PortBindings') or {}).items() if bindings]
+
+
+# Builders of the inspect_container(raw_json=True) summary fields, from the inspect
+# content and its Config, HostConfig and State sections.
+_CONTAINER_SUMMARY_FIELDS = {
+    'Cont_Id': lambda content, config, host_config, state: content['Id'],
+    'Name': lambda content, config, host_config, state: content['Name'].lstrip('/'),
+    'Image': lambda content, config, host_config, state: config.get('Image'),
+    'Created_date': lambda content, config, host_config, state: content['Created'].split('.')[0].split('T')[0],
+    'Created_time': lambda content, config, host_config, state: content['Created'].split('.')[0].split('T')[1],
+    'State_running': lambda content, config, host_config, state: state.get('Running'),
+    'State_restarting': lambda content, config, host_config, state: state.get('Restarting'),
+    'State_paused': lambda content, config, host_config, state: state.get('Paused'),
+    'CpuShares': lambda content, config, host_config, state: host_config.get('CpuShares'),
+    'Cpuset': lambda content, config, host_config, state: host_config.get('CpusetCpus'),
+    'Links': lambda content, config, host_config, state: host_config.get('Links'),
+    'Env': lambda content, config, host_config, state: config.get('Env'),
+    'VolumesFrom': lambda content, config, host_config, state: host_config.get('VolumesFrom'),
+    'Volume': lambda content, config, host_config, state: config.get('Volumes'),
+    'Cmd': lambda content, config, host_config, state: config.get('Cmd'),
+    'Entry_point': lambda content, config, host_config, state: config.get('Entrypoint'),
+    'Memory': lambda content, config, host_config, state: host_config.get('Memory'),
+    'Memory_swap': lambda content, config, host_config, state: host_config.get('MemorySwap'),
+    'IP': lambda content, config, host_config, state: (content.get('NetworkSettings') or {}).get('IPAddress'),
+    'port_map': lambda content, config, host_config, state: _prepare_port_map(host_config)
+}
@@ -1,72 +1,140 @@
-import requests
 from constants import WebConnectionType, WebResponseStatusCode
+from transport import HttpTransport, ResponseStream, UnixSocketTransport
+from cache import ResponseCache
+from policy import RequestPolicy
+from utils import SingleFlight
+
+DEFAULT_TIMEOUT = 5
+STREAM_CHUNK_SIZE = 65536
 
 
 class DockerServer(object):
 
-    def __init__(self, host, tls_verify=False, cert=None, key=None, ca=False):
+    def __init__(self, host, tls_verify=False, cert=None, key=None, ca=False, pool_size=10, timeout=DEFAULT_TIMEOUT, cache=None, coalesce=False, typed=False, instrumentation=None, policy=None):
         self.host = host
         self.tls_verify = tls_verify
         self.cert = cert
         self.key = key
         self.ca = ca
+        self.timeout = timeout
+        self.transport = self._prepare_transport(pool_size)
+        self.cache = ResponseCache() if cache is True else cache or None
+        self.single_flight = SingleFlight() if coalesce else None
+        self.typed = typed
+        self.instrumentation = instrumentation
+        self.policy = RequestPolicy() if policy is True else policy or None
+        self._owns_policy = policy is True
+
+    def _prepare_transport(self, pool_size):
+        if self.host.startswith(WebConnectionType.UNIX):
+            return UnixSocketTransport(self.host[len(WebConnectionType.UNIX):], pool_size=pool_size)
+        return HttpTransport(
+            self._prepare_url(''),
+            cert=(self.cert, self.key),
+            verify=self.ca,
+            pool_size=pool_size
+        )
 
     def _prepare_url(self, end_point):
+        if self.host.startswith(WebConnectionType.UNIX):
+            return UnixSocketTransport.BASE_URL + end_point
         if self.tls_verify:
             return WebConnectionType.SECURE + self.host + end_point
         else:
             return WebConnectionType.INSECURE + self.host + end_point
 
-    def _get(self, end_point, params=None, headers=None, stream=False):
-        try:
-            url = self._prepare_url(end_point)
-            response = requests.get(
-                url=url,
-                params=params,
-                headers=headers,
-                stream=stream,
-                cert=(self.cert, self.key),
-                verify=self.ca,
-                timeout=5
-            )
-        except Exception as e:
-            raise
-        return self._prepare_response_content(response, stream=stream)
-
-    def _post(self, end_point, data=None, headers=None):
-        try:
-            url = self._prepare_url(end_point)
-            response = requests.post(
-                url=url,
-                data=data,
-                headers=headers,
-                cert=(self.cert, self.key),
-                verify=self.ca,
-                timeout=5
-            )
-        except Exception as e:
-            raise
+    def _prepare_timeout(self, timeout):
+        if timeout is False:
+            return self.timeout
+        return timeout
+
+    def _request(self, method, end_point, timeout=False, **kwargs):
+        if self.policy is not None:
+            return self.policy.request(self, method, end_point, timeout, **kwargs)
+        return self._send(method, end_point, self._prepare_timeout(timeout), **kwargs)
+
+    def _send(self, method, end_point, timeout, **kwargs):
+        if self.instrumentation is None:
+            return self.transport.request(method, end_point, timeout=timeout, **kwargs)
+        return self.instrumentation.request(self.transport, self.host, method, end_point, timeout, **kwargs)
+
+    def _get(self, end_point, params=None, headers=None, stream=False, timeout=False, raw=False):
+        cache_key = None
+        if self.cache is not None and not stream:
+            cache_key, cached = self.cache.lookup(end_point, params)
+            if cached is not None:
+                return cached
+        if self.single_flight is not None and not stream:
+            key = (end_point, repr(params), repr(headers))
+            response_content = dict(self.single_flight.do(key, lambda: self._fetch(end_point, params, headers, timeout)))
+        else:
+            response_content = self._fetch(end_point, params, headers, timeout, stream, raw)
+        if cache_key is not None and response_content['status']:
+            self.cache.store(cache_key, response_content)
+        return response_content
+
+    def _fetch(self, end_point, params=None, headers=None, timeout=False, stream=False, raw=False):
+        response = self._request(
+            'GET',
+            end_point,
+            timeout,
+            params=params,
+            headers=headers,
+            stream=stream
+        )
+        return self._prepare_response_content(response, stream=stream, raw=raw)
+
+    def _post(self, end_point, data=None, headers=None, timeout=False, params=None, stream=False, raw=False):
+        response = self._request(
+            'POST',
+            end_point,
+            timeout,
+            params=params,
+            data=data,
+            headers=headers,
+            stream=stream
+        )
+        on_close = None
+        if self.cache is not None:
+            self.cache.invalidate_end_point(end_point)
+            if stream:
+                # The deamon changes the resource until the end of the streamed response,
+                # eg: a pull, so what was cached meanwhile is dropped again at its end.
+                on_close = lambda: self.cache.invalidate_end_point(end_point)
+        return self._prepare_response_content(response, stream=stream, raw=raw, on_close=on_close)
+
+    def _put(self, end_point, data=None, headers=None, timeout=False, params=None):
+        response = self._request(
+            'PUT',
+            end_point,
+            timeout,
+            params=params,
+            data=data,
+            headers=headers
+        )
+        if self.cache is not None:
+            self.cache.invalidate_end_point(end_point)
         return self._prepare_response_content(response)
 
-    def _delete(self, end_point, data=None):
-        try:
-            url = self._prepare_url(end_point)
-            response = requests.delete(
-                url=url,
-                data=data,
-                cert=(self.cert, self.key),
-                verify=self.ca,
-                timeout=5
-            )
-        except Exception as e:
-            raise
+    def _delete(self, end_point, data=None, timeout=False, params=None):
+        response = self._request(
+            'DELETE',
+            end_point,
+            timeout,
+            params=params,
+            data=data
+        )
+        if self.cache is not None:
+            self.cache.invalidate_end_point(end_point)
         return self._prepare_response_content(response)
 
-    def _prepare_response_content(self, response, stream=False):
+    def _prepare_response_content(self, response, stream=False, raw=False, on_close=None):
         if response.status_code in WebResponseStatusCode.SUCCESS_LIST:
             try:
-                if stream:
-                    content = response.iter_lines()
+                if stream and raw:
+                    content = ResponseStream(response.iter_content(chunk_size=STREAM_CHUNK_SIZE), response, on_close)
+                elif stream:
+                    content = ResponseStream(response.iter_lines(), response, on_close)
                 elif 'application/json' in response.headers['content-type']:
                     content = response.json()
                 else:
@@ -83,3 +151,33 @@ class DockerServer(object):
                 'content': response.content
             }
         return response_content
+
+    def pool_stats(self):
+        """Connection pool statistics of this manager.
+
+        .. code-block:: python
+
+            docker.pool_stats()
+
+        Output
+
+        .. code-block:: json
+
+            {'connections_opened': 1, 'connections_reused': 41, 'idle': 1, 'in_flight': 0,
+             'pool_size': 10, 'requests': 42}
+
+        """
+        return self.transport.stats()
+
+    def close(self):
+        """Close every pooled connection to the docker deamon, and the policy created by
+        the manager."""
+        self.transport.close()
+        if self._owns_policy:
+            self.policy.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
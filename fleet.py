@@ -0,0 +1,122 @@
+from utils import _run_concurrently
+
+
+class DockerFleet(object):
+    """
+
+    :param list hosts: Docker hosts of the fleet. Every entry is a host url or a dict of
+                       :class:`DockerManager` arguments, eg: {'host': 'node1:2376', 'tls_verify': True,
+                       'cert': '/cert/cert.pem', 'key': '/cert/key.pem', 'ca': '/cert/ca.pem'}
+    :param int concurrency: Number of hosts called at the same time(Default is 20).
+    :param float timeout: Deadline in seconds for every host(Default is 10).
+    :param kwargs: Default :class:`DockerManager` arguments shared by every host.
+
+    Fan out any :class:`DockerManager` operation to many Docker hosts concurrently.
+
+    .. code-block:: python
+
+        fleet = DockerFleet(['node1:2376', {'host': 'node2:2376', 'tls_verify': True, 'ca': '/cert/ca.pem'}])
+        fleet.run('get_info')
+        fleet.merged('list_container', all=True)
+        fleet.latency
+
+    """
+
+    # Set to DockerManager by the package, kept here to avoid a circular import.
+    manager_class = None
+
+    def __init__(self, hosts, concurrency=20, timeout=10, **kwargs):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.managers = {}
+        self.latency = {}
+        for config in hosts:
+            if not isinstance(config, dict):
+                config = {'host': config}
+            options = dict(kwargs)
+            options.update(config)
+            options.setdefault('timeout', timeout)
+            self.managers[config['host']] = self.manager_class(**options)
+
+    def run(self, operation, *args, **kwargs):
+        """
+        :param str operation: Name of the :class:`DockerManager` method to call.
+        :param args: Positional arguments of the operation.
+        :param kwargs: Keyword arguments of the operation.
+
+        Call the operation on every host. A failing or slow host does not abort the call,
+        its response is reported with status False.
+
+        .. code-block:: python
+
+            fleet.run('ping')
+
+        Output
+
+        .. code-block:: json
+
+            {'content': {'node1:2376': {'content': 'OK', 'elapsed': 0.004, 'status': True},
+                         'node2:2376': {'content': 'Timed out after 10 seconds', 'elapsed': 10.0, 'status': False}},
+             'status': False}
+
+        """
+        def call(host):
+            return getattr(self.managers[host], operation)(*args, **kwargs)
+
+        results = _run_concurrently(call, list(self.managers), self.concurrency, self.timeout)
+        for host, result in results.items():
+            self.latency[host] = result['elapsed']
+        return {
+            'status': all(result['status'] for result in results.values()),
+            'content': results
+        }
+
+    def merged(self, operation, *args, **kwargs):
+        """
+        :param str operation: Name of the :class:`DockerManager` method to call.
+
+        Call the operation on every host and merge the responses in one list, every
+        entry is tagged with the 'Host' it comes from. Failed hosts are listed in 'errors'.
+
+        .. code-block:: python
+
+            fleet.merged('list_container', all=True)
+
+        Output
+
+        .. code-block:: json
+
+            {'content': [{u'Id': u'a7da5a495448...', u'Image': u'pidgin:latest', 'Host': 'node1:2376', ...}],
+             'errors': {'node2:2376': 'ConnectionError: ...'},
+             'status': False}
+
+        """
+        response = self.run(operation, *args, **kwargs)
+        content = []
+        errors = {}
+        for host, result in response['content'].items():
+            if not result['status']:
+                errors[host] = result['content']
+                continue
+            items = result['content'] if isinstance(result['content'], list) else [result['content']]
+            for item in items:
+                if isinstance(item, dict):
+                    item = dict(item, Host=host)
+                else:
+                    item = {'Host': host, 'content': item}
+                content.append(item)
+        return {
+            'status': not errors,
+            'content': content,
+            'errors': errors
+        }
+
+    def close(self):
+        for manager in self.managers.values():
+            manager.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,274 @@
+from constants import DockerEndPoint
+from utils import _run_concurrently
+
+
+class ImageGraph(object):
+    """
+
+    :param manager: DockerManager of the host to index the images of.
+
+    In-memory image dependency graph of a docker host, built from one list_image(all)
+    and one list_container(all) snapshot: parent and child images, tags and the
+    containers using every image. Reclaimable space and prune plans are computed from
+    the snapshot without calling the deamon, only executing a plan does.
+
+    .. code-block:: python
+
+        graph = ImageGraph(docker).seed()
+        graph.reclaimable('pidgin:latest')
+        plan = graph.plan(['pidgin:latest', 'redis:2.8'], remove_containers=True)
+        graph.execute(plan)
+
+    Image sizes are the sizes reported by the deamon, the bytes of an image are its
+    size less the size of its parent, ie: the layers it adds. An image without a known
+    parent, eg: pulled, counts the bytes of the layers no other image shares, from the
+    ``SharedSize`` of deamons of API 1.42 and later, older deamons report no shared size
+    and the whole image size is counted, an upper bound.
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.images = {}
+        self.containers = {}
+        self.children = {}
+        self.containers_by_image = {}
+        self._by_tag = {}
+
+    def seed(self):
+        """Load the image and container snapshot from the deamon."""
+        images = self.manager._get(DockerEndPoint.LIST_IMAGES, {'all': True, 'shared-size': True})
+        containers = self.manager._get(DockerEndPoint.LIST_CONTAINER, {'all': True})
+        if not images['status'] or not containers['status']:
+            raise RuntimeError('Unable to seed the image graph: {0}'.format(
+                images['content'] if not images['status'] else containers['content']))
+        self.images = dict((image['Id'], image) for image in images['content'])
+        self.containers = dict((container['Id'], container) for container in containers['content'])
+        self.children = dict((image_id, set()) for image_id in self.images)
+        self.containers_by_image = dict((image_id, set()) for image_id in self.images)
+        self._by_tag = {}
+        for image_id, image in self.images.items():
+            parent_id = image.get('ParentId')
+            if parent_id in self.children:
+                self.children[parent_id].add(image_id)
+            for tag in image.get('RepoTags') or []:
+                if tag != '<none>:<none>':
+                    self._by_tag[tag] = image_id
+        for container_id, container in self.containers.items():
+            image_id = container.get('ImageID') or self.resolve(container.get('Image'))
+            if image_id in self.containers_by_image:
+                self.containers_by_image[image_id].add(container_id)
+        return self
+
+    def resolve(self, image):
+        """Return the full id of an image id, short id or tag, None when it is unknown."""
+        if not image:
+            return None
+        if image in self.images:
+            return image
+        if image in self._by_tag:
+            return self._by_tag[image]
+        if ':' not in image.split('/')[-1] and image + ':latest' in self._by_tag:
+            return self._by_tag[image + ':latest']
+        short_id = image.replace('sha256:', '')
+        matches = [image_id for image_id in self.images if image_id.replace('sha256:', '').startswith(short_id)]
+        return matches[0] if len(matches) == 1 else None
+
+    def tags(self, image):
+        image_id = self.resolve(image)
+        return [tag for tag in self.images[image_id].get('RepoTags') or [] if tag != '<none>:<none>'] if image_id else []
+
+    def parent(self, image):
+        image_id = self.resolve(image)
+        parent_id = self.images[image_id].get('ParentId') if image_id else None
+        return parent_id if parent_id in self.images else None
+
+    def ancestors(self, image):
+        """Ids of the parent images of an image, nearest first."""
+        ancestors = []
+        parent_id = self.parent(image)
+        while parent_id is not None and parent_id not in ancestors:
+            ancestors.append(parent_id)
+            parent_id = self.parent(parent_id)
+        return ancestors
+
+    def descendants(self, image):
+        """Ids of the images built on top of an image."""
+        image_id = self.resolve(image)
+        descendants = []
+        pending = list(self.children.get(image_id, ()))
+        while pending:
+            child_id = pending.pop()
+            if child_id not in descendants:
+                descendants.append(child_id)
+                pending.extend(self.children.get(child_id, ()))
+        return descendants
+
+    def containers_using(self, image):
+        """Ids of the containers created from an image or from an image built on it."""
+        image_id = self.resolve(image)
+        if image_id is None:
+            return []
+        containers = set()
+        for used_id in [image_id] + self.descendants(image_id):
+            containers.update(self.containers_by_image.get(used_id, ()))
+        return sorted(containers)
+
+    def layer_size(self, image):
+        """Bytes an image adds on top of its parent, or without a known parent the bytes
+        of its layers shared with no other image."""
+        image_id = self.resolve(image)
+        if image_id is None:
+            return 0
+        size = self.images[image_id].get('Size') or 0
+        parent_id = self.parent(image_id)
+        if parent_id is not None:
+            size -= self.images[parent_id].get('Size') or 0
+        else:
+            # -1 when the deamon did not compute it.
+            shared_size = self.images[image_id].get('SharedSize')
+            if shared_size is not None and shared_size >= 0:
+                size -= shared_size
+        return max(size, 0)
+
+    def plan(self, images, remove_containers=False):
+        """
+        :param list images: Image ids, short ids or tags to prune.
+        :param bool remove_containers: Remove the containers using the images, otherwise an
+                                       image used by a container is kept(Default is False)
+
+        Plan the removal of images together with the images built on them, and of the
+        untagged parent images left unused, as the deamon does.
+
+        .. code-block:: python
+
+            graph.plan(['pidgin:latest'])
+
+        Output
+
+        .. code-block:: json
+
+            {'blocked': {'sha256:6cc0fc2a5ee3...': ['0bd62601d47c...']},
+             'containers': [],
+             'images': ['sha256:0d0a3b4fb6b1...', 'sha256:9c1bc8ab5b63...'],
+             'reclaimable': 187719338,
+             'unknown': []}
+
+        The images are listed in the order they can be removed in, children first.
+        """
+        removed = set()
+        unknown = []
+        for image in images:
+            image_id = self.resolve(image)
+            if image_id is None:
+                unknown.append(image)
+                continue
+            removed.add(image_id)
+            removed.update(self.descendants(image_id))
+        blocked = {}
+        if not remove_containers:
+            for image_id in list(removed):
+                if self.containers_by_image.get(image_id):
+                    blocked[image_id] = sorted(self.containers_by_image[image_id])
+            # An image can not be removed while an image built on it is kept.
+            for image_id in blocked:
+                removed.discard(image_id)
+                removed.difference_update(self.ancestors(image_id))
+        # Untagged parents without other children or containers are removed with their last child.
+        pending = list(removed)
+        while pending:
+            parent_id = self.parent(pending.pop())
+            if (parent_id is None or parent_id in removed or self.tags(parent_id) or
+                    self.containers_by_image.get(parent_id) or not self.children[parent_id] <= removed):
+                continue
+            removed.add(parent_id)
+            pending.append(parent_id)
+        containers = set()
+        for image_id in removed:
+            containers.update(self.containers_by_image.get(image_id, ()))
+        return {
+            'images': sorted(removed, key=lambda image_id: (self._height(image_id, removed), image_id)),
+            'containers': sorted(containers),
+            'blocked': blocked,
+            'unknown': unknown,
+            'reclaimable': sum(self.layer_size(image_id) for image_id in removed)
+        }
+
+    def reclaimable(self, images, remove_containers=False):
+        """Bytes freed by pruning the images, see :meth:`plan`."""
+        if isinstance(images, str):
+            images = [images]
+        return self.plan(images, remove_containers)['reclaimable']
+
+    def _height(self, image_id, images):
+        # Number of generations of images built on the image within ``images``.
+        children = [child_id for child_id in self.children.get(image_id, ()) if child_id in images]
+        return 1 + max(self._height(child_id, images) for child_id in children) if children else 0
+
+    def execute(self, plan, concurrency=10, timeout=None, force=False):
+        """
+        :param dict plan: Prune plan, as returned by :meth:`plan`.
+        :param int concurrency: Number of containers or images removed at the same time(Default is 10)
+        :param float timeout: Deadline in seconds for every removal(Default is None)
+        :param bool force: Forcefully remove running containers(Default is False)
+
+        Run a prune plan: the containers are removed first, then the images one
+        generation at a time, children first. An image whose child could not be removed
+        is skipped. Images are removed by tag, an untagged image by id, an image already
+        removed by the deamon along with its child counts as removed.
+
+        .. code-block:: json
+
+            {'content': {'containers': {'0bd62601d47c...': {'content': '', 'elapsed': 0.21, 'status': True}},
+                         'images': {'sha256:0d0a3b4fb6b1...': {'content': [...], 'elapsed': 0.43, 'status': True}}},
+             'status': True}
+
+        """
+        container_results = {}
+        if plan['containers']:
+            container_results = _run_concurrently(
+                lambda container_id: self.manager.remove_container(container_id, force=force),
+                plan['containers'],
+                concurrency,
+                timeout
+            )
+        image_results = {}
+        failed = set(container_id for container_id, result in container_results.items() if not result['status'])
+        images = set(plan['images'])
+        waves = {}
+        for image_id in plan['images']:
+            waves.setdefault(self._height(image_id, images), []).append(image_id)
+        for height in sorted(waves):
+            wave = []
+            for image_id in waves[height]:
+                blockers = [child_id for child_id in self.children.get(image_id, ()) if child_id in failed]
+                blockers.extend(container_id for container_id in self.containers_by_image.get(image_id, ()) if container_id in failed)
+                if blockers:
+                    failed.add(image_id)
+                    image_results[image_id] = {'status': False, 'content': 'Skipped, not removed: {0}'.format(', '.join(sorted(blockers)))}
+                else:
+                    wave.append(image_id)
+            results = _run_concurrently(self._remove_image, wave, concurrency, timeout)
+            for image_id, result in results.items():
+                if not result['status']:
+                    failed.add(image_id)
+            image_results.update(results)
+        return {
+            'status': not failed,
+            'content': {
+                'containers': container_results,
+                'images': dict((image_id, image_results[image_id]) for image_id in plan['images'])
+            }
+        }
+
+    def _remove_image(self, image_id):
+        response = None
+        for name in self.tags(image_id) or [image_id]:
+            response = self.manager.delete_image(name)
+            if not response['status'] and not self._is_not_found(response):
+                return response
+        return {'status': True, 'content': response['content']}
+
+    @staticmethod
+    def _is_not_found(response):
+        # The deamon removes untagged parents with their last child, they are gone already.
+        return b'No such image' in response['content'] if isinstance(response['content'], bytes) else False
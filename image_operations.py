@@ -1,20 +1,72 @@
-from docker_server import DockerServer
+import base64
+import json
+import re
+import threading
+import time
+
+from archive import TarStream, _transfer_stats
+from build_context import BuildContext
+from docker_server import DockerServer, STREAM_CHUNK_SIZE
 from constants import DockerEndPoint
+from image_pull import ImagePull
+from models import Image, Result
+from registry import DOCKER_HUB, RegistryClient
+from utils import _file_chunks_helper, _json_array_helper, _json_lines_helper, _rechunk_helper, _run_concurrently
+
+
+_BUILT_ID = re.compile(r'Successfully built ([0-9a-f]+)')
 
 
 class ImageOperations(DockerServer):
 
-    def __init__(self, host, tls_verify=False, cert=None, key=None, ca=False):
-        super(ImageOperations, self).__init__(host, tls_verify, cert, key, ca)
+    # Label of the built images holding the digest of their build context.
+    CONTEXT_DIGEST_LABEL = 'docker-manager.context-digest'
+
+    def __init__(self, host, tls_verify=False, cert=None, key=None, ca=False, **kwargs):
+        super(ImageOperations, self).__init__(host, tls_verify, cert, key, ca, **kwargs)
+        self._pulls = {}
+        self._pulls_lock = threading.Lock()
+        self._registries = {}
+        self._registries_lock = threading.Lock()
+        self._context_digests = {}
+
+    def list_image(self, query_param=None, stream=False, fields=None):
+        """
+        :param dict query_param: Query parameters, eg: {'all': True}(Default is None)
+        :param bool stream: Parse the response incrementally and yield one image at a time(Default is False)
+        :param list fields: Keys kept in every streamed image, eg: ['Id', 'RepoTags'](Default is None, all keys),
+                            not supported by typed managers, whose Image models have fixed attributes.
+
+        List the images of the docker host.
+
+        .. code-block:: python
+
+            r = docker.list_image({'all': True}, stream=True, fields=['Id', 'Size'])
+            for image in r['content']:
+                print(image['Id'], image['Size'])
 
-    def list_image(self, query_param=None):
+        """
+        if self.typed:
+            if fields:
+                raise ValueError('fields is not supported by typed managers, read the Image attributes instead')
+            response = self._get(DockerEndPoint.LIST_IMAGES, query_param, stream=True, raw=True)
+            if not response['status']:
+                return Result(False, response['content'])
+            images = (Image(raw) for raw in _json_array_helper(response['content'], raw=True))
+            return Result(True, images if stream else list(images))
+        if stream:
+            response = self._get(DockerEndPoint.LIST_IMAGES, query_param, stream=True, raw=True)
+            if response['status']:
+                response['content'] = _json_array_helper(response['content'], fields)
+            return response
         return self._get(DockerEndPoint.LIST_IMAGES, query_param)
 
-    def delete_image(self, image_id, force_delete=False):
+    def delete_image(self, image_id, force_delete=False, no_prune=False):
         query_param = {
-            'force': force_delete
+            'force': force_delete,
+            'noprune': no_prune
         }
-        return self._delete(DockerEndPoint.REMOVE_IMAGE.format(image_id), query_param)
+        return self._delete(DockerEndPoint.REMOVE_IMAGE.format(image_id), params=query_param)
 
     def get_image_detail(self, image_id):
         return self._get(DockerEndPoint.INSPECT_IMAGE.format(image_id))
@@ -26,8 +78,44 @@ class ImageOperations(DockerServer):
         return self._get(DockerEndPoint.SEARCH_IMAGE.format(search_name))
 
     def get_image_tags(self, image_name):
-        response = requests.get(DockerEndPoint.IMAGE_TAGS.format(image_name))
-        return self._prepare_response_content(response)
+        """
+        :param str image_name: Repository, eg: ubuntu or registry.example.com:5000/team/app
+
+        List the tags of a repository on its registry, the Docker Hub when the name has
+        no registry host. The registry clients are kept, see :class:`RegistryClient`.
+
+        .. code-block:: json
+
+            {'content': ['12.04', '14.04', '16.04', 'latest'], 'status': True}
+
+        """
+        registry, repository = self._split_registry(image_name)
+        with self._registries_lock:
+            client = self._registries.get(registry)
+            if client is None:
+                client = self._registries[registry] = RegistryClient(registry)
+        return client.list_tags(repository)
+
+    def _close_registries(self):
+        with self._registries_lock:
+            clients = list(self._registries.values())
+            self._registries.clear()
+        for client in clients:
+            client.close()
+
+    def close(self):
+        """Close every pooled connection to the docker deamon and to the registries."""
+        self._close_registries()
+        super(ImageOperations, self).close()
+
+    @staticmethod
+    def _split_registry(image_name):
+        # The first path component is a registry host when it has a '.' or a ':', or is localhost.
+        host, _, repository = image_name.partition('/')
+        if not repository or not ('.' in host or ':' in host or host == 'localhost'):
+            return DOCKER_HUB, image_name
+        scheme = 'http://' if host.split(':')[0] in ('localhost', '127.0.0.1') else 'https://'
+        return scheme + host, repository
 
     def download_image(self, image_name, tag=None, source=None, repo=None, registry=None):
         data = {
@@ -37,10 +125,302 @@ class ImageOperations(DockerServer):
             'repo': repo,
             'registry': registry
         }
-        return self._post(DockerEndPoint.CREATE_IMAGE, data)
+        return self._post(DockerEndPoint.CREATE_IMAGE, data, timeout=None)
+
+    def pull_image(self, image_name, tag=None, auth=None):
+        """
+        :param str image_name: Image to pull, eg: ubuntu, ubuntu:14.04 or registry.example.com:5000/team/app:1.2
+        :param str tag: Tag to pull, overrides the tag of image_name(Default is None, latest)
+        :param dict auth: Registry credentials, eg: {'username': 'jon', 'password': 'secret'}(Default is None)
+
+        Pull an image in the background and stream the progress of the deamon. A pull of
+        an image:tag already in progress through this manager is shared instead of being
+        started again, the content is the same ImagePull for every caller.
+
+        .. code-block:: python
+
+            pull = docker.pull_image('ubuntu:14.04')['content']
+            for event in pull:
+                print(event.get('id'), event['status'])
+            print(pull.layers)
+            pull.wait()
+
+        """
+        image_name, name_tag = self._split_image_tag(image_name)
+        tag = tag or name_tag or 'latest'
+        key = '{0}:{1}'.format(image_name, tag)
+        headers = None
+        if auth is not None:
+            headers = {'X-Registry-Auth': base64.urlsafe_b64encode(json.dumps(auth).encode('utf-8')).decode('ascii')}
+        with self._pulls_lock:
+            pull = self._pulls.get(key)
+            if pull is None:
+                pull = self._pulls[key] = ImagePull(self, image_name, tag, headers)
+                pull.add_done_callback(self._pull_done)
+                pull.start()
+        return {'status': True, 'content': pull}
+
+    def _pull_done(self, pull):
+        with self._pulls_lock:
+            if self._pulls.get(pull.name) is pull:
+                del self._pulls[pull.name]
+        if self.cache is not None:
+            self.cache.invalidate_family('image')
+
+    @staticmethod
+    def _split_image_tag(image_name):
+        # The tag follows the last ':' of the last path component, a ':' before it is a registry port.
+        repository, _, last = image_name.rpartition('/')
+        if '@' in last or ':' not in last:
+            return image_name, None
+        last, tag = last.rsplit(':', 1)
+        return (repository + '/' + last if repository else last), tag
+
+    def pull_images(self, image_names, concurrency=4, timeout=None, auth=None):
+        """
+        :param list image_names: Images to pull, eg: ['ubuntu:14.04', 'redis']
+        :param int concurrency: Maximum number of images pulled at once(Default is 4)
+        :param float timeout: Seconds to wait for every pull(Default is None, no limit)
+        :param dict auth: Registry credentials(Default is None)
+
+        Pull many images concurrently, duplicated names are pulled once.
+
+        .. code-block:: python
+
+            docker.pull_images(['ubuntu:14.04', 'redis'])
+
+        Output
+
+        .. code-block:: json
+
+            {'content': {'redis': {'content': u'Status: Downloaded newer image for redis:latest',
+                                   'elapsed': 12.4, 'status': True},
+                         'ubuntu:14.04': {'content': u'Status: Image is up to date for ubuntu:14.04',
+                                          'elapsed': 0.8, 'status': True}},
+             'status': True}
+
+        """
+        results = _run_concurrently(
+            lambda image_name: self.pull_image(image_name, auth=auth)['content'].wait(),
+            list(dict.fromkeys(image_names)),
+            concurrency,
+            timeout
+        )
+        return {
+            'status': all(result['status'] for result in results.values()),
+            'content': results
+        }
 
     def push_image(self, repo_name, headers, tag=None):
         data = {
             'tag': tag
         }
-        return self._post(DockerEndPoint.PUSH_IMAGE, headers=headers, data=data)
+        return self._post(DockerEndPoint.PUSH_IMAGE, headers=headers, data=data, timeout=None)
+
+    def save_image(self, images, destination, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        :param images: Image name/Id, or list of image names/Ids, to export.
+        :param destination: Path of the tar file to write, or a writable file-like object.
+        :param int chunk_size: Bytes read from the deamon and written at a time(Default is 65536)
+
+        Export images as a tar archive. The archive is streamed to the destination one
+        chunk at a time, it is never held in memory.
+
+        .. code-block:: python
+
+            docker.save_image(['ubuntu:14.04', 'redis'], '/backup/images.tar')
+
+        Output
+
+        .. code-block:: json
+
+            {'content': {'bytes': 247386112, 'elapsed': 3.1, 'files': None, 'throughput': 79801971.6}, 'status': True}
+
+        """
+        if isinstance(images, str):
+            end_point, query_param = DockerEndPoint.SAVE_IMAGE.format(images), None
+        else:
+            end_point, query_param = DockerEndPoint.SAVE_IMAGES, {'names': list(images)}
+        start = time.time()
+        response = self._get(end_point, query_param, stream=True, timeout=None, raw=True)
+        if not response['status']:
+            return response
+        written = 0
+        f = None
+        try:
+            f = open(destination, 'wb') if isinstance(destination, str) else destination
+            for chunk in _rechunk_helper(response['content'], chunk_size):
+                f.write(chunk)
+                written += len(chunk)
+        finally:
+            # A failed write, eg: a full disk, leaves the body unread, the connection is closed.
+            response['content'].close()
+            if f is not None and f is not destination:
+                f.close()
+        return {'status': True, 'content': _transfer_stats(written, start, time.time(), None)}
+
+    def load_image(self, source, quiet=True, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        :param source: Path of an image tar file, or a readable file-like object.
+        :param bool quiet: Do not report the progress of the load(Default is True)
+        :param int chunk_size: Bytes uploaded at a time(Default is 65536)
+
+        Import images from a tar archive, as written by save_image. The archive is sent
+        with chunked transfer encoding, a file path is memory-mapped so only one chunk at
+        a time is copied in memory.
+
+        .. code-block:: python
+
+            docker.load_image('/backup/images.tar')
+
+        Output
+
+        .. code-block:: json
+
+            {'content': {'bytes': 247386112, 'elapsed': 4.2, 'files': None, 'throughput': 58901455.2,
+                         'messages': [{'stream': 'Loaded image: ubuntu:14.04\\n'}]},
+             'status': True}
+
+        """
+        sent = [0]
+
+        def chunks():
+            for chunk in _file_chunks_helper(source, chunk_size):
+                sent[0] += len(chunk)
+                yield chunk
+
+        start = time.time()
+        response = self._post(
+            DockerEndPoint.LOAD_IMAGE,
+            chunks(),
+            headers={'Content-Type': 'application/x-tar'},
+            params={'quiet': quiet},
+            stream=True,
+            timeout=None
+        )
+        if not response['status']:
+            return response
+        messages = list(_json_lines_helper(response['content']))
+        content = _transfer_stats(sent[0], start, time.time(), None)
+        content['messages'] = messages
+        errors = [message['error'] for message in messages if 'error' in message]
+        return {'status': not errors, 'content': content if not errors else errors[0]}
+
+    def build_image(self, path, tag=None, dockerfile='Dockerfile', build_args=None, labels=None, target=None,
+                    no_cache=False, pull=False, rm=True, stream=False, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        :param str path: Directory of the build context
+        :param str tag: Name and tag of the image, eg: team/app:1.2(Default is None)
+        :param str dockerfile: Path of the Dockerfile in the context(Default is Dockerfile)
+        :param dict build_args: Values of the ARG instructions(Default is None)
+        :param dict labels: Labels of the image(Default is None)
+        :param str target: Stage of a multi-stage Dockerfile to build(Default is None, the last one)
+        :param bool no_cache: Build every step and skip the context digest check(Default is False)
+        :param bool pull: Pull newer versions of the base images, skips the context digest check(Default is False)
+        :param bool rm: Remove the intermediate containers(Default is True)
+        :param bool stream: Yield the decoded build output as it comes(Default is False)
+        :param int chunk_size: Bytes of the files read and uploaded at a time(Default is 65536)
+
+        Build an image. The context tar archive is generated while it is uploaded, the
+        files are read chunk_size bytes at a time and no temporary archive is written.
+        The .dockerignore of the context is honored, see BuildContext.
+
+        The image is labelled with a digest of its context, Dockerfile and build options.
+        When the image already tagged ``tag`` has the digest of the context to build,
+        nothing is uploaded and that image is returned as cached. File contents are only
+        hashed again when their size, inode or modification time changed.
+
+        .. code-block:: python
+
+            docker.build_image('/srv/monorepo', 'team/api:1.2', 'services/api/Dockerfile',
+                               build_args={'VERSION': '1.2'})
+
+            for event in docker.build_image('.', 'team/api:dev', stream=True)['content']:
+                print(event.get('stream', ''), end='')
+
+        Output
+
+        .. code-block:: json
+
+            {'content': {'bytes': 3521105920, 'cached': False, 'digest': 'sha256:0f3a6c...',
+                         'elapsed': 41.2, 'events': [{'stream': 'Step 1/7 : FROM python:3.6\\n'}, ...],
+                         'files': 48211, 'image_id': 'sha256:9b1d2e...', 'throughput': 85463735.9},
+             'status': True}
+
+        """
+        context = BuildContext(path, dockerfile, self._context_digests)
+        options = {
+            'dockerfile': context.dockerfile,
+            'buildargs': build_args or {},
+            'labels': labels or {},
+            'target': target
+        }
+        digest = context.digest(options)
+        labels = dict(labels or {})
+        labels[self.CONTEXT_DIGEST_LABEL] = digest
+        if tag and not no_cache and not pull:
+            image_id = self._built_image(tag, digest)
+            if image_id is not None:
+                events = [
+                    {'stream': 'Build context of {0} unchanged, using {1}\n'.format(tag, image_id)},
+                    {'aux': {'ID': image_id}}
+                ]
+                if stream:
+                    return {'status': True, 'content': iter(events)}
+                return {
+                    'status': True,
+                    'content': {'image_id': image_id, 'cached': True, 'digest': digest, 'events': events,
+                                'bytes': 0, 'files': 0, 'elapsed': 0.0, 'throughput': 0.0}
+                }
+        query_param = {
+            't': tag,
+            'dockerfile': context.dockerfile,
+            'buildargs': json.dumps(build_args) if build_args else None,
+            'labels': json.dumps(labels),
+            'target': target,
+            'nocache': no_cache,
+            'pull': pull,
+            'rm': rm
+        }
+        archive = TarStream(context.members, chunk_size)
+        response = self._post(
+            DockerEndPoint.BUILD_IMAGE,
+            iter(archive),
+            headers={'Content-Type': 'application/x-tar'},
+            params=query_param,
+            stream=True,
+            timeout=None
+        )
+        if not response['status']:
+            return response
+        events = _json_lines_helper(response['content'])
+        if stream:
+            return {'status': True, 'content': events}
+        events = list(events)
+        errors = [event['error'] for event in events if 'error' in event]
+        if errors:
+            return {'status': False, 'content': errors[0]}
+        content = archive.stats()
+        content.update({'image_id': self._built_image_id(events), 'cached': False, 'digest': digest, 'events': events})
+        return {'status': True, 'content': content}
+
+    def _built_image(self, tag, digest):
+        """Id of the image tagged tag when it was built from the context digest."""
+        response = self._get(DockerEndPoint.INSPECT_IMAGE.format(tag))
+        if not response['status'] or not isinstance(response['content'], dict):
+            return None
+        labels = (response['content'].get('Config') or {}).get('Labels') or {}
+        return response['content'].get('Id') if labels.get(self.CONTEXT_DIGEST_LABEL) == digest else None
+
+    @staticmethod
+    def _built_image_id(events):
+        image_id = None
+        for event in events:
+            aux = event.get('aux')
+            if isinstance(aux, dict) and aux.get('ID'):
+                image_id = aux['ID']
+            elif image_id is None:
+                match = _BUILT_ID.search(event.get('stream', ''))
+                if match:
+                    image_id = match.group(1)
+        return image_id
@@ -0,0 +1,133 @@
+import bisect
+import threading
+
+from constants import DockerEndPoint
+from utils import _json_lines_helper
+
+
+class ImagePull(object):
+    """
+
+    :param manager: DockerManager pulling the image.
+    :param str image_name: Image repository, eg: ubuntu or registry.example.com:5000/team/app
+    :param str tag: Tag to pull.
+    :param dict headers: Extra request headers, eg: X-Registry-Auth(Default is None)
+
+    One pull of an image, run in a background thread. The progress events of the deamon
+    are decoded once and kept, so any number of callers can iterate over them: every
+    iterator replays the events already received, then follows the live ones. Only the
+    latest progress event of every layer is kept, with the status lines, so a long pull
+    holds a bounded number of events and a late iterator skips the stale progress.
+
+    .. code-block:: python
+
+        pull = docker.pull_image('ubuntu', '14.04')['content']
+        for event in pull:
+            print(event.get('id'), event['status'], event.get('progressDetail'))
+        pull.wait()
+
+    """
+
+    def __init__(self, manager, image_name, tag, headers=None):
+        self.manager = manager
+        self.image_name = image_name
+        self.tag = tag
+        self.headers = headers
+        self.events = []
+        self.layers = {}
+        # Sequence number of every kept event, increasing, and of the kept progress event of every layer.
+        self._sequences = []
+        self._progress = {}
+        self._sequence = 0
+        self.error = None
+        self.done = False
+        self._condition = threading.Condition()
+        self._callbacks = []
+
+    @property
+    def name(self):
+        return '{0}:{1}'.format(self.image_name, self.tag)
+
+    def start(self):
+        thread = threading.Thread(target=self._pull)
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def add_done_callback(self, callback):
+        with self._condition:
+            if not self.done:
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def _pull(self):
+        try:
+            response = self.manager._post(
+                DockerEndPoint.CREATE_IMAGE,
+                headers=self.headers,
+                params={'fromImage': self.image_name, 'tag': self.tag},
+                stream=True,
+                timeout=None
+            )
+            if not response['status']:
+                self.error = response['content']
+            else:
+                for event in _json_lines_helper(response['content']):
+                    self._add_event(event)
+        except Exception as e:
+            self.error = '{0}: {1}'.format(type(e).__name__, e)
+        with self._condition:
+            self.done = True
+            callbacks, self._callbacks = self._callbacks, []
+            self._condition.notify_all()
+        for callback in callbacks:
+            callback(self)
+
+    def _add_event(self, event):
+        with self._condition:
+            if 'error' in event:
+                self.error = event['error']
+            if 'id' in event:
+                layer = self.layers.setdefault(event['id'], {'status': None, 'current': None, 'total': None})
+                layer['status'] = event.get('status')
+                layer.update(event.get('progressDetail') or {})
+                sequence = self._progress.pop(event['id'], None)
+                if sequence is not None:
+                    index = bisect.bisect_left(self._sequences, sequence)
+                    del self._sequences[index]
+                    del self.events[index]
+                if event.get('progressDetail'):
+                    self._progress[event['id']] = self._sequence
+            self._sequences.append(self._sequence)
+            self.events.append(event)
+            self._sequence += 1
+            self._condition.notify_all()
+
+    def __iter__(self):
+        sequence = -1
+        while True:
+            with self._condition:
+                while sequence + 1 >= self._sequence and not self.done:
+                    self._condition.wait()
+                index = bisect.bisect_right(self._sequences, sequence)
+                if index >= len(self.events):
+                    return
+                sequence = self._sequences[index]
+                event = self.events[index]
+            yield event
+
+    def wait(self, timeout=None):
+        """Wait for the end of the pull.
+
+        .. code-block:: json
+
+            {'content': u'Status: Downloaded newer image for ubuntu:14.04', 'status': True}
+
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self.done, timeout):
+                return {'status': False, 'content': 'Timed out after {0} seconds'.format(timeout)}
+        if self.error is not None:
+            return {'status': False, 'content': self.error}
+        return {'status': True, 'content': self.events[-1].get('status') if self.events else ''}
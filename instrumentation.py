@@ -0,0 +1,240 @@
+import bisect
+import threading
+import time
+
+from constants import DockerEndPoint
+
+
+class _EndPointMetrics(object):
+
+    __slots__ = ('buckets', 'count', 'sum', 'statuses', 'errors', 'bytes_in', 'bytes_out', 'in_flight')
+
+    def __init__(self, bucket_count):
+        self.buckets = [0] * bucket_count
+        self.count = 0
+        self.sum = 0.0
+        self.statuses = {}
+        self.errors = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.in_flight = 0
+
+
+class Instrumentation(object):
+    """
+
+    :param tuple buckets: Upper bounds in seconds of the latency histogram buckets(Default is BUCKETS)
+
+    Opt-in request metrics of one or many DockerManagers: latency histograms, status
+    codes, bytes sent and received and requests in flight, per host, method and
+    DockerEndPoint key, so the number of series does not grow with the container ids.
+    Managers created without it pay nothing.
+
+    .. code-block:: python
+
+        metrics = Instrumentation()
+        docker = DockerManager(host='docker.marlabs.com:2376', instrumentation=metrics)
+        metrics.on_response(lambda record: record['elapsed'] > 1 and print('slow', record))
+        docker.inspect_container('a7da5a495448')
+        metrics.snapshot()
+        print(metrics.prometheus())
+
+    The latency of a streamed response is the time to its headers, its bytes received
+    are its Content-Length when the deamon sends one. The bytes sent of a chunked body,
+    eg: load_image or put_archive, are counted while it is uploaded.
+    """
+
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self, buckets=None):
+        self.buckets = tuple(sorted(buckets or self.BUCKETS))
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._request_hooks = []
+        self._response_hooks = []
+
+    def on_request(self, callback):
+        """Call ``callback(record)`` before every request, the record has the host,
+        method, end_point key and path."""
+        self._request_hooks.append(callback)
+
+    def on_response(self, callback):
+        """Call ``callback(record)`` after every request, the record also has the status
+        (None when the request failed), elapsed seconds, bytes_in, bytes_out and error."""
+        self._response_hooks.append(callback)
+
+    def _get_metrics(self, key):
+        metrics = self._metrics.get(key)
+        if metrics is None:
+            metrics = self._metrics.setdefault(key, _EndPointMetrics(len(self.buckets) + 1))
+        return metrics
+
+    def request(self, transport, host, method, path, timeout, **kwargs):
+        """Send a request through the transport and record it."""
+        end_point = DockerEndPoint.resolve(path)[0] or 'OTHER'
+        record = {'host': host, 'method': method, 'end_point': end_point, 'path': path}
+        for callback in self._request_hooks:
+            callback(record)
+        key = (host, method, end_point)
+        with self._lock:
+            metrics = self._get_metrics(key)
+            metrics.in_flight += 1
+        body = kwargs.get('data')
+        if _is_chunked(body):
+            body = kwargs['data'] = _CountedBody(body)
+        response = None
+        error = None
+        start = time.time()
+        try:
+            response = transport.request(method, path, timeout=timeout, **kwargs)
+            return response
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            elapsed = time.time() - start
+            bytes_in = bytes_out = 0
+            if response is not None:
+                bytes_in = _response_size(response, kwargs.get('stream'))
+                bytes_out = _request_size(response)
+            if isinstance(body, _CountedBody):
+                bytes_out = body.count
+            with self._lock:
+                metrics.in_flight -= 1
+                metrics.count += 1
+                metrics.sum += elapsed
+                metrics.buckets[bisect.bisect_left(self.buckets, elapsed)] += 1
+                metrics.bytes_in += bytes_in
+                metrics.bytes_out += bytes_out
+                if response is not None:
+                    metrics.statuses[response.status_code] = metrics.statuses.get(response.status_code, 0) + 1
+                else:
+                    metrics.errors += 1
+            if self._response_hooks:
+                record.update({
+                    'status': response.status_code if response is not None else None,
+                    'elapsed': elapsed,
+                    'bytes_in': bytes_in,
+                    'bytes_out': bytes_out,
+                    'error': error
+                })
+                for callback in self._response_hooks:
+                    callback(record)
+
+    def snapshot(self):
+        """Metrics of every host, method and end point.
+
+        .. code-block:: json
+
+            [{'buckets': {0.001: 0, 0.0025: 3, ..., 60.0: 12, 'inf': 12}, 'bytes_in': 48231, 'bytes_out': 0,
+              'count': 12, 'end_point': 'INSPECT_CONTAINER', 'errors': 0, 'host': 'docker.marlabs.com:2376',
+              'in_flight': 0, 'method': 'GET', 'statuses': {200: 11, 404: 1}, 'sum': 0.0423}]
+
+        The bucket counts are cumulative, as in Prometheus.
+        """
+        with self._lock:
+            items = sorted(self._metrics.items())
+            records = []
+            for (host, method, end_point), metrics in items:
+                cumulative = 0
+                buckets = {}
+                for bound, count in zip(self.buckets + ('inf',), metrics.buckets):
+                    cumulative += count
+                    buckets[bound] = cumulative
+                records.append({
+                    'host': host,
+                    'method': method,
+                    'end_point': end_point,
+                    'count': metrics.count,
+                    'sum': metrics.sum,
+                    'buckets': buckets,
+                    'statuses': dict(metrics.statuses),
+                    'errors': metrics.errors,
+                    'bytes_in': metrics.bytes_in,
+                    'bytes_out': metrics.bytes_out,
+                    'in_flight': metrics.in_flight
+                })
+        return records
+
+    def prometheus(self, prefix='docker_manager'):
+        """Metrics in the Prometheus text exposition format."""
+        records = self.snapshot()
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append('# HELP {0}_{1} {2}'.format(prefix, name, help_text))
+            lines.append('# TYPE {0}_{1} {2}'.format(prefix, name, kind))
+
+        def labels(record, **extra):
+            pairs = [('host', record['host']), ('method', record['method']), ('end_point', record['end_point'])]
+            pairs.extend(sorted(extra.items()))
+            return ','.join('{0}="{1}"'.format(name, _escape(value)) for name, value in pairs)
+
+        family('request_duration_seconds', 'histogram', 'Latency of the requests to the docker deamon.')
+        for record in records:
+            for bound, count in record['buckets'].items():
+                le = '+Inf' if bound == 'inf' else repr(float(bound))
+                lines.append('{0}_request_duration_seconds_bucket{{{1}}} {2}'.format(prefix, labels(record, le=le), count))
+            lines.append('{0}_request_duration_seconds_sum{{{1}}} {2!r}'.format(prefix, labels(record), record['sum']))
+            lines.append('{0}_request_duration_seconds_count{{{1}}} {2}'.format(prefix, labels(record), record['count']))
+        family('responses_total', 'counter', 'Responses of the docker deamon by status code.')
+        for record in records:
+            for status, count in sorted(record['statuses'].items()):
+                lines.append('{0}_responses_total{{{1}}} {2}'.format(prefix, labels(record, status=status), count))
+        family('request_errors_total', 'counter', 'Requests failed without a response.')
+        for record in records:
+            lines.append('{0}_request_errors_total{{{1}}} {2}'.format(prefix, labels(record), record['errors']))
+        family('received_bytes_total', 'counter', 'Bytes received from the docker deamon.')
+        for record in records:
+            lines.append('{0}_received_bytes_total{{{1}}} {2}'.format(prefix, labels(record), record['bytes_in']))
+        family('sent_bytes_total', 'counter', 'Bytes sent to the docker deamon.')
+        for record in records:
+            lines.append('{0}_sent_bytes_total{{{1}}} {2}'.format(prefix, labels(record), record['bytes_out']))
+        family('requests_in_flight', 'gauge', 'Requests waiting for the docker deamon.')
+        for record in records:
+            lines.append('{0}_requests_in_flight{{{1}}} {2}'.format(prefix, labels(record), record['in_flight']))
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        """Zero the counters, the requests in flight are kept."""
+        with self._lock:
+            for metrics in self._metrics.values():
+                in_flight = metrics.in_flight
+                metrics.__init__(len(self.buckets) + 1)
+                metrics.in_flight = in_flight
+
+
+def _response_size(response, stream):
+    if not stream:
+        return len(response.content)
+    length = response.headers.get('content-length')
+    return int(length) if length and length.isdigit() else 0
+
+
+def _request_size(response):
+    length = response.request.headers.get('Content-Length')
+    return int(length) if length and length.isdigit() else 0
+
+
+def _is_chunked(body):
+    # Iterables other than strings, containers and files are sent with chunked encoding.
+    return (body is not None and hasattr(body, '__iter__') and not hasattr(body, 'read') and
+            not isinstance(body, (bytes, str, dict, list, tuple)))
+
+
+class _CountedBody(object):
+
+    __slots__ = ('chunks', 'count')
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.count = 0
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            self.count += len(chunk)
+            yield chunk
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
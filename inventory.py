@@ -0,0 +1,289 @@
+import json
+import threading
+import time
+
+from constants import DockerEndPoint
+
+
+class Inventory(object):
+    """
+
+    :param manager: DockerManager of the host to keep an inventory of.
+    :param float retry_interval: Seconds between two attempts to follow the events again
+                                 after the stream failed(Default is 1)
+
+    In-memory container and image inventory of a docker host. It is seeded once from
+    list_container(all=True) and list_image(), then kept up to date from the deamon
+    events, so reads never hit the deamon.
+
+    .. code-block:: python
+
+        inventory = Inventory(docker).start()
+        inventory.get_container('pidgin')
+        inventory.containers_by_image('pidgin:latest')
+        inventory.containers_by_label('com.example.app', 'web')
+        inventory.get_image('pidgin:latest')
+        inventory.stop()
+
+    Containers are kept in the list_container format, images in the list_image format.
+
+    When the events stream fails, eg: the deamon restarts, the inventory is seeded again
+    and follows the events from the time of the last one applied. ``healthy`` is False
+    and ``last_error`` tells why until it follows the events again.
+    """
+
+    def __init__(self, manager, retry_interval=1):
+        self.manager = manager
+        self.retry_interval = retry_interval
+        self.healthy = False
+        self.last_error = None
+        self.containers = {}
+        self.images = {}
+        self._by_name = {}
+        self._by_image = {}
+        self._by_label = {}
+        self._by_tag = {}
+        self._listeners = []
+        self._lock = threading.RLock()
+        self._stream = None
+        self._thread = None
+        self._running = False
+        self._stopped = threading.Event()
+        self._since = None
+
+    def seed(self):
+        """Load the full container and image lists from the deamon."""
+        # Read untyped, the indexes are built from the JSON of the lists.
+        containers = self.manager._get(DockerEndPoint.LIST_CONTAINER, {'all': True})
+        images = self.manager._get(DockerEndPoint.LIST_IMAGES)
+        if not containers['status'] or not images['status']:
+            raise RuntimeError('Unable to seed the inventory: {0}'.format(
+                containers['content'] if not containers['status'] else images['content']))
+        with self._lock:
+            self.containers.clear()
+            self.images.clear()
+            for index in (self._by_name, self._by_image, self._by_label, self._by_tag):
+                index.clear()
+            for container in containers['content']:
+                self._add_container(container)
+            for image in images['content']:
+                self._add_image(image)
+        return self
+
+    def start(self):
+        """Seed the inventory and follow the deamon events in a background thread."""
+        self._running = True
+        self._stopped.clear()
+        self._since = int(time.time())
+        try:
+            self._connect()
+        except Exception:
+            self._running = False
+            raise
+        self._thread = threading.Thread(target=self._follow)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Stop following the events: close the events stream and wait for the thread."""
+        self._running = False
+        self._stopped.set()
+        stream = self._stream
+        if stream is not None:
+            stream.close()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self.healthy = False
+
+    def subscribe(self, callback):
+        """Call ``callback(event)`` after every event is applied."""
+        self._listeners.append(callback)
+
+    def _connect(self):
+        # Events are replayed from the last one applied, the ones missed while the
+        # stream was down are applied over the new seed.
+        self.seed()
+        response = self.manager.get_events(since=self._since, filters={'type': ['container', 'image']}, decode=False)
+        if not response['status']:
+            raise RuntimeError('Unable to follow the deamon events: {0}'.format(response['content']))
+        self._stream = response['content']
+        if not self._running:
+            # Stopped while connecting, stop() may have closed the previous stream.
+            self._stream.close()
+        self.healthy = True
+
+    def _follow(self):
+        while self._running:
+            try:
+                for line in self._stream:
+                    if not self._running:
+                        break
+                    if line:
+                        event = json.loads(line)
+                        self.apply_event(event)
+                        self._since = event.get('time', self._since)
+                if not self._running:
+                    break
+                raise IOError('The deamon closed the events stream')
+            except Exception as e:
+                if not self._running:
+                    break
+                self.healthy = False
+                self.last_error = '{0}: {1}'.format(type(e).__name__, e)
+                self._stream.close()
+            self._reconnect()
+
+    def _reconnect(self):
+        while not self._stopped.wait(self.retry_interval):
+            try:
+                self._connect()
+                return
+            except Exception as e:
+                self.last_error = '{0}: {1}'.format(type(e).__name__, e)
+
+    # Indexes
+
+    def _add_container(self, container):
+        container_id = container['Id']
+        self._remove_container(container_id)
+        self.containers[container_id] = container
+        for name in container.get('Names') or []:
+            self._by_name[name.lstrip('/')] = container_id
+        self._by_image.setdefault(container.get('Image'), set()).add(container_id)
+        self._by_image.setdefault(container.get('ImageID'), set()).add(container_id)
+        for key, value in (container.get('Labels') or {}).items():
+            self._by_label.setdefault((key, value), set()).add(container_id)
+            self._by_label.setdefault(key, set()).add(container_id)
+
+    def _remove_container(self, container_id):
+        container = self.containers.pop(container_id, None)
+        if container is None:
+            return
+        for name in container.get('Names') or []:
+            if self._by_name.get(name.lstrip('/')) == container_id:
+                del self._by_name[name.lstrip('/')]
+        for key in (container.get('Image'), container.get('ImageID')):
+            self._by_image.get(key, set()).discard(container_id)
+        for key, value in (container.get('Labels') or {}).items():
+            self._by_label.get((key, value), set()).discard(container_id)
+            self._by_label.get(key, set()).discard(container_id)
+
+    def _add_image(self, image):
+        self._remove_image(image['Id'])
+        self.images[image['Id']] = image
+        for tag in image.get('RepoTags') or []:
+            self._by_tag[tag] = image['Id']
+
+    def _remove_image(self, image_id):
+        image = self.images.pop(image_id, None)
+        if image is None:
+            return
+        for tag in image.get('RepoTags') or []:
+            if self._by_tag.get(tag) == image_id:
+                del self._by_tag[tag]
+
+    # Events
+
+    def apply_event(self, event):
+        """Apply a deamon event, as yielded by get_events, to the inventory."""
+        event_type = event.get('Type', 'container')
+        action = (event.get('Action') or event.get('status') or '').split(':')[0]
+        actor = event.get('Actor') or {}
+        object_id = actor.get('ID') or event.get('id')
+        attributes = actor.get('Attributes') or {}
+        response = None
+        if event_type == 'image' and action in ('tag', 'untag', 'pull', 'import', 'load'):
+            # Image events do not carry the tags, the image is inspected once, without
+            # holding the lock so the reads do not wait for the deamon.
+            response = self.manager.get_image_detail(object_id)
+        with self._lock:
+            if event_type == 'container':
+                self._apply_container_event(action, object_id, attributes, event)
+            elif event_type == 'image':
+                self._apply_image_event(action, object_id, response)
+        for callback in self._listeners:
+            callback(event)
+
+    def _apply_container_event(self, action, container_id, attributes, event):
+        container = self.containers.get(container_id)
+        if action == 'destroy':
+            self._remove_container(container_id)
+            return
+        if container is None:
+            if action != 'create':
+                return
+            labels = dict((key, value) for key, value in attributes.items() if key not in ('image', 'name'))
+            container = {
+                'Id': container_id,
+                'Names': ['/' + attributes.get('name', '')],
+                'Image': attributes.get('image', event.get('from')),
+                'Labels': labels,
+                'Created': event.get('time'),
+                'State': 'created',
+                'Status': 'Created'
+            }
+        else:
+            container = dict(container)
+        states = {
+            'start': ('running', 'Up'),
+            'restart': ('running', 'Up'),
+            'unpause': ('running', 'Up'),
+            'pause': ('paused', 'Up (Paused)'),
+            'die': ('exited', 'Exited ({0})'.format(attributes.get('exitCode', 0)))
+        }
+        if action in states:
+            container['State'], container['Status'] = states[action]
+        elif action == 'rename' and attributes.get('name'):
+            container['Names'] = ['/' + attributes['name'].lstrip('/')]
+        self._add_container(container)
+
+    def _apply_image_event(self, action, image_id, response):
+        if action == 'delete':
+            self._remove_image(image_id)
+        elif response is not None:
+            if response['status']:
+                self._add_image(self._prepare_image_json(response['content']))
+            elif action == 'untag':
+                self._remove_image(image_id)
+
+    def _prepare_image_json(self, content):
+        return {
+            'Id': content['Id'],
+            'ParentId': content.get('Parent', ''),
+            'RepoTags': content.get('RepoTags') or [],
+            'RepoDigests': content.get('RepoDigests') or [],
+            'Created': content.get('Created'),
+            'Size': content.get('Size', 0),
+            'VirtualSize': content.get('VirtualSize', content.get('Size', 0)),
+            'Labels': (content.get('Config') or {}).get('Labels') or {}
+        }
+
+    # Reads
+
+    def get_container(self, container_id):
+        """Container by id, name or id prefix, None when unknown."""
+        with self._lock:
+            container_id = self._by_name.get(container_id.lstrip('/'), container_id)
+            container = self.containers.get(container_id)
+            if container is None and len(container_id) >= 12:
+                for key, value in self.containers.items():
+                    if key.startswith(container_id):
+                        return value
+            return container
+
+    def containers_by_image(self, image):
+        """Containers created from an image name or image id."""
+        with self._lock:
+            return [self.containers[container_id] for container_id in self._by_image.get(image, ())]
+
+    def containers_by_label(self, key, value=None):
+        """Containers having the label key, with the value when it is given."""
+        with self._lock:
+            ids = self._by_label.get(key if value is None else (key, value), ())
+            return [self.containers[container_id] for container_id in ids]
+
+    def get_image(self, image):
+        """Image by id or repo:tag, None when unknown."""
+        with self._lock:
+            return self.images.get(self._by_tag.get(image, image))
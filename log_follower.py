@@ -0,0 +1,143 @@
+import collections
+import threading
+import time
+
+from utils import _parse_timestamp
+
+LogEntry = collections.namedtuple('LogEntry', ['timestamp', 'container_id', 'stream_id', 'line'])
+
+
+class LogFollower(object):
+    """
+
+    :param manager: DockerManager used to read the logs.
+    :param list container_ids: Container Ids/names to follow, duplicates are followed once.
+    :param bool std_out: Follow stdout logs(Default is True)
+    :param bool std_err: Follow stderr logs(Default is True)
+    :param int date_time: UNIX timestamp to start from(Default 0)
+    :param count: Number of existing lines to start with(Default is all)
+    :param int buffer_size: Lines buffered per container before its reader stops reading
+                            from the deamon(Default is 1000)
+    :param float reorder_window: Seconds a line waits for earlier lines of the other
+                                 containers before it is emitted(Default is 0.5)
+
+    Follow the logs of many containers and merge them in one time ordered iterator of
+    :class:`LogEntry`. Every container is read by its own thread into a bounded buffer,
+    a slow consumer blocks the readers instead of growing the buffers. close() closes
+    the log streams, which releases their connections, and waits for the readers.
+
+    .. code-block:: python
+
+        follower = LogFollower(docker, ['0bd62601d47c', 'cb8c119188c9'], count=10)
+        follower.start()
+        for entry in follower:
+            print(entry.timestamp, entry.container_id, entry.stream_id, entry.line)
+        follower.close()
+
+    """
+
+    def __init__(self, manager, container_ids, std_out=True, std_err=True, date_time=0, count='all', buffer_size=1000, reorder_window=0.5):
+        self.manager = manager
+        self.container_ids = list(collections.OrderedDict.fromkeys(container_ids))
+        self.std_out = std_out
+        self.std_err = std_err
+        self.date_time = date_time
+        self.count = count
+        self.buffer_size = buffer_size
+        self.reorder_window = reorder_window
+        self.errors = {}
+        self._buffers = dict((container_id, collections.deque()) for container_id in self.container_ids)
+        self._running = set(self.container_ids)
+        self._condition = threading.Condition()
+        self._closed = False
+        self._threads = []
+        self._streams = {}
+
+    def start(self):
+        for container_id in self.container_ids:
+            thread = threading.Thread(target=self._follow, args=(container_id,))
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def _follow(self, container_id):
+        buf = self._buffers[container_id]
+        try:
+            response = self.manager.get_container_logs(
+                container_id, self.std_out, self.std_err, self.date_time, True, self.count,
+                stream=True, split_streams=True, follow=True
+            )
+            if not response['status']:
+                self.errors[container_id] = response['content']
+                return
+            with self._condition:
+                if self._closed:
+                    response['content'].close()
+                    return
+                self._streams[container_id] = response['content']
+            for stream_id, line in response['content']:
+                timestamp, _, line = line.partition(b' ')
+                entry = LogEntry(_parse_timestamp(timestamp.decode('ascii')), container_id, stream_id, line)
+                with self._condition:
+                    while len(buf) >= self.buffer_size and not self._closed:
+                        self._condition.wait()
+                    if self._closed:
+                        return
+                    buf.append((time.time(), entry))
+                    self._condition.notify_all()
+        except Exception as e:
+            self.errors[container_id] = '{0}: {1}'.format(type(e).__name__, e)
+        finally:
+            with self._condition:
+                self._running.discard(container_id)
+                self._condition.notify_all()
+
+    def _select(self):
+        # Returns the next entry, or None with the seconds to wait(None to wait for a
+        # notification, False when every container is done).
+        heads = [buf for buf in self._buffers.values() if buf]
+        if not heads:
+            if not self._running or self._closed:
+                return None, False
+            return None, None
+        buf = min(heads, key=lambda buf: buf[0][1].timestamp)
+        arrived, entry = buf[0]
+        ready = all(self._buffers[container_id] for container_id in self._running)
+        waited = time.time() - arrived
+        if ready or waited >= self.reorder_window:
+            buf.popleft()
+            return entry, None
+        return None, self.reorder_window - waited
+
+    def __iter__(self):
+        while True:
+            with self._condition:
+                entry, wait = self._select()
+                while entry is None and wait is not False:
+                    self._condition.wait(wait)
+                    entry, wait = self._select()
+                if entry is None:
+                    return
+                self._condition.notify_all()
+            yield entry
+
+    def close(self, timeout=None):
+        with self._condition:
+            self._closed = True
+            for buf in self._buffers.values():
+                buf.clear()
+            self._condition.notify_all()
+            streams = list(self._streams.values())
+        # Wakes the readers waiting for new lines on their stream.
+        for stream in streams:
+            stream.close()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
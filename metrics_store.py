@@ -0,0 +1,221 @@
+import threading
+import time
+import warnings
+
+import numpy as np
+
+
+class ContainerMetricsStore(object):
+    """
+
+    :param int capacity: Raw samples kept per container(Default is 300, 5 minutes at one sample per second)
+    :param int downsample: Raw samples averaged into one coarse sample when they age out(Default is 10)
+    :param int coarse_capacity: Coarse samples kept per container(Default is 360, 1 hour with the defaults)
+    :param int containers: Containers preallocated, the store grows by doubling when full(Default is 256)
+
+    In-memory columnar time series store for container metrics. Every container owns one
+    row of fixed size ring buffers per column (cpu, mem, rx, tx, blkio), so the memory is
+    bounded per container. Samples leaving the raw ring are averaged into a coarse ring
+    covering a longer period. Queries run on whole NumPy arrays, not per sample. One store
+    can be fed by many sampler threads.
+
+    .. code-block:: python
+
+        store = ContainerMetricsStore()
+        for record in docker.sample_container_stats('cb8c119188c9')['content']:
+            store.add('cb8c119188c9', record, labels={'app': 'web'})
+
+        store.percentile('cpu', 95, window=300, labels={'app': 'web'})
+
+    Output
+
+    .. code-block:: json
+
+        {'cb8c119188c9': 12.5}
+
+    """
+
+    COLUMNS = ('cpu', 'mem', 'rx', 'tx', 'blkio')
+
+    def __init__(self, capacity=300, downsample=10, coarse_capacity=360, containers=256):
+        if capacity % downsample:
+            raise ValueError('capacity must be a multiple of downsample')
+        self.capacity = capacity
+        self.downsample = downsample
+        self.coarse_capacity = coarse_capacity
+        self._rows = {}
+        self._free = []
+        self._labels = {}
+        self._label_index = {}
+        self._size = 0
+        # Guards the arrays, which are replaced when the store grows, and the indexes.
+        self._lock = threading.Lock()
+        self._allocate(containers)
+
+    def _allocate(self, containers):
+        def grow(array, shape, fill):
+            new = np.full(shape, fill, dtype=array.dtype if array is not None else np.float64)
+            if array is not None:
+                new[..., :array.shape[-2], :] = array
+            return new
+
+        columns = len(self.COLUMNS)
+        old = self._size
+        self._time = grow(getattr(self, '_time', None), (containers, self.capacity), np.nan)
+        self._data = grow(getattr(self, '_data', None), (columns, containers, self.capacity), np.nan)
+        self._coarse_time = grow(getattr(self, '_coarse_time', None), (containers, self.coarse_capacity), np.nan)
+        self._coarse_data = grow(getattr(self, '_coarse_data', None), (columns, containers, self.coarse_capacity), np.nan)
+        cursor = np.zeros(containers, dtype=np.int64)
+        coarse_cursor = np.zeros(containers, dtype=np.int64)
+        if old:
+            cursor[:old] = self._cursor
+            coarse_cursor[:old] = self._coarse_cursor
+        self._cursor = cursor
+        self._coarse_cursor = coarse_cursor
+        self._free.extend(range(containers - 1, old - 1, -1))
+        self._size = containers
+
+    def _row(self, container_id, labels):
+        row = self._rows.get(container_id)
+        if row is None:
+            if not self._free:
+                self._allocate(self._size * 2)
+            row = self._free.pop()
+            self._rows[container_id] = row
+        if labels is not None and labels != self._labels.get(row):
+            self._index_labels(row, labels)
+        return row
+
+    def _index_labels(self, row, labels):
+        for key in self._labels.pop(row, {}).items():
+            self._label_index.get(key, set()).discard(row)
+            self._label_index.get(key[0], set()).discard(row)
+        self._labels[row] = dict(labels)
+        for key in self._labels[row].items():
+            self._label_index.setdefault(key, set()).add(row)
+            self._label_index.setdefault(key[0], set()).add(row)
+
+    def add(self, container_id, record, labels=None, timestamp=None):
+        """
+        :param str container_id: Container Id.
+        :param record: StatsSample, or a dict of column -> value.
+        :param dict labels: Container labels used to select containers in queries(Default is None)
+        :param float timestamp: UNIX time of the sample(Default is the record timestamp or now)
+
+        Add a sample of a container.
+        """
+        if isinstance(record, dict):
+            values = [record.get(column, np.nan) for column in self.COLUMNS]
+            timestamp = timestamp or record.get('timestamp')
+        else:
+            values = [record.cpu_percent, record.memory_usage, record.rx_rate, record.tx_rate, record.blkio_read + record.blkio_write]
+            timestamp = timestamp or record.timestamp
+        timestamp = timestamp or time.time()
+        with self._lock:
+            row = self._row(container_id, labels)
+            cursor = self._cursor[row]
+            position = cursor % self.capacity
+            if cursor >= self.capacity and position % self.downsample == 0:
+                self._downsample(row, position)
+            self._time[row, position] = timestamp
+            self._data[:, row, position] = values
+            self._cursor[row] = cursor + 1
+
+    def _downsample(self, row, position):
+        # The block starting at position holds the oldest raw samples, it is overwritten next.
+        block = slice(position, position + self.downsample)
+        coarse = self._coarse_cursor[row] % self.coarse_capacity
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            self._coarse_time[row, coarse] = np.nanmean(self._time[row, block])
+            self._coarse_data[:, row, coarse] = np.nanmean(self._data[:, row, block], axis=1)
+        self._coarse_cursor[row] += 1
+
+    def remove(self, container_id):
+        """Drop every sample of a container and release its row."""
+        with self._lock:
+            row = self._rows.pop(container_id, None)
+            if row is None:
+                return
+            self._index_labels(row, {})
+            del self._labels[row]
+            self._time[row] = np.nan
+            self._data[:, row] = np.nan
+            self._coarse_time[row] = np.nan
+            self._coarse_data[:, row] = np.nan
+            self._cursor[row] = 0
+            self._coarse_cursor[row] = 0
+            self._free.append(row)
+
+    def _select(self, labels):
+        if not labels:
+            return list(self._rows.items())
+        if not isinstance(labels, dict):
+            labels = dict((label, None) for label in ([labels] if isinstance(labels, str) else labels))
+        rows = None
+        for key, value in labels.items():
+            matched = self._label_index.get(key if value is None else (key, value), set())
+            rows = matched if rows is None else rows & matched
+        return [(container_id, row) for container_id, row in self._rows.items() if row in rows]
+
+    def _window(self, column, window, labels, now):
+        index = self.COLUMNS.index(column)
+        since = (now or time.time()) - window
+        # Indexing with the rows copies them, the reductions run without the lock.
+        with self._lock:
+            selected = self._select(labels)
+            rows = np.array([row for _, row in selected], dtype=np.int64)
+            times = self._time[rows]
+            values = self._data[index, rows]
+            coarse_times = self._coarse_time[rows]
+            coarse_values = self._coarse_data[index, rows]
+        ids = [container_id for container_id, _ in selected]
+        # Containers whose raw samples do not cover the window also use their downsampled ones.
+        partial = np.nanmin(times, axis=1, initial=np.inf) > since
+        if partial.any():
+            times = np.concatenate([times, np.where(partial[:, None], coarse_times, np.nan)], axis=1)
+            values = np.concatenate([values, coarse_values], axis=1)
+        return ids, np.where(times >= since, values, np.nan)
+
+    def _reduce(self, function, column, window, labels, now, *args):
+        ids, values = self._window(column, window, labels, now)
+        if not ids:
+            return {}
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            result = function(values, *args, axis=1)
+        return dict(zip(ids, result.tolist()))
+
+    def percentile(self, column, q, window=300, labels=None, now=None):
+        """
+        :param str column: One of cpu, mem, rx, tx, blkio.
+        :param float q: Percentile, eg: 95
+        :param float window: Seconds back from now(Default is 300)
+        :param labels: Label key, list of keys or dict of key -> value the containers must have(Default is None, all)
+        :param float now: End of the window(Default is now)
+
+        Percentile of a column per container, nan when a container has no sample in the window.
+        """
+        return self._reduce(np.nanpercentile, column, window, labels, now, q)
+
+    def mean(self, column, window=300, labels=None, now=None):
+        """Mean of a column per container, see :meth:`percentile`."""
+        return self._reduce(np.nanmean, column, window, labels, now)
+
+    def max(self, column, window=300, labels=None, now=None):
+        """Maximum of a column per container, see :meth:`percentile`."""
+        return self._reduce(np.nanmax, column, window, labels, now)
+
+    def latest(self, container_id):
+        """Last sample of a container as a dict of column -> value."""
+        with self._lock:
+            row = self._rows[container_id]
+            position = (self._cursor[row] - 1) % self.capacity
+            sample = dict(zip(self.COLUMNS, self._data[:, row, position].tolist()))
+            sample['timestamp'] = float(self._time[row, position])
+        return sample
+
+    def nbytes(self):
+        """Memory used by the sample arrays."""
+        with self._lock:
+            return self._time.nbytes + self._data.nbytes + self._coarse_time.nbytes + self._coarse_data.nbytes
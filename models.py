@@ -0,0 +1,183 @@
+import json
+
+
+class Result(object):
+    """Typed counterpart of the ``{'status': ..., 'content': ...}`` response.
+
+    ``result['status']`` and ``result['content']`` keep working, so code written for
+    the dict responses can read typed results too.
+    """
+
+    __slots__ = ('status', 'content')
+
+    def __init__(self, status, content):
+        self.status = status
+        self.content = content
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __repr__(self):
+        return 'Result(status={0!r}, content={1!r})'.format(self.status, self.content)
+
+
+class Model(object):
+    """Compact object decoded lazily from the JSON of a docker resource.
+
+    Only the JSON text (or dict) is kept until an attribute is first read, then every
+    field is decoded into its slot and the JSON is released. Subclasses list their
+    fields in ``__slots__`` and how to read them in ``_decoders``.
+    """
+
+    __slots__ = ('_raw',)
+    _decoders = {}
+
+    def __init__(self, raw):
+        self._raw = raw
+
+    def __getattr__(self, name):
+        # Only called for slots not set yet, ie: before the first decoding.
+        if name in self._decoders and self._raw is not None:
+            self._decode()
+            return getattr(self, name)
+        raise AttributeError(name)
+
+    def _decode(self):
+        data = self._raw
+        if not isinstance(data, dict):
+            data = json.loads(data)
+        for name, decoder in self._decoders.items():
+            setattr(self, name, decoder(data))
+        self._raw = None
+
+    def as_dict(self):
+        return dict((name, getattr(self, name)) for name in self._decoders)
+
+    def __repr__(self):
+        return '{0}(id={1!r})'.format(type(self).__name__, getattr(self, 'id', None))
+
+
+class Container(Model):
+    """Container of list_container."""
+
+    __slots__ = ('id', 'names', 'image', 'image_id', 'command', 'created', 'state', 'status', 'ports', 'labels', 'size_rw')
+    _decoders = {
+        'id': lambda data: data.get('Id'),
+        'names': lambda data: [name.lstrip('/') for name in data.get('Names') or []],
+        'image': lambda data: data.get('Image'),
+        'image_id': lambda data: data.get('ImageID'),
+        'command': lambda data: data.get('Command'),
+        'created': lambda data: data.get('Created'),
+        'state': lambda data: data.get('State'),
+        'status': lambda data: data.get('Status'),
+        'ports': lambda data: data.get('Ports') or [],
+        'labels': lambda data: data.get('Labels') or {},
+        'size_rw': lambda data: data.get('SizeRw')
+    }
+
+
+class Image(Model):
+    """Image of list_image."""
+
+    __slots__ = ('id', 'parent_id', 'repo_tags', 'repo_digests', 'created', 'size', 'virtual_size', 'labels')
+    _decoders = {
+        'id': lambda data: data.get('Id'),
+        'parent_id': lambda data: data.get('ParentId'),
+        'repo_tags': lambda data: data.get('RepoTags') or [],
+        'repo_digests': lambda data: data.get('RepoDigests') or [],
+        'created': lambda data: data.get('Created'),
+        'size': lambda data: data.get('Size'),
+        'virtual_size': lambda data: data.get('VirtualSize'),
+        'labels': lambda data: data.get('Labels') or {}
+    }
+
+
+class ContainerDetail(Model):
+    """Container of inspect_container."""
+
+    __slots__ = ('id', 'name', 'image', 'image_id', 'created', 'running', 'paused', 'restarting', 'exit_code',
+                 'pid', 'started_at', 'cmd', 'entrypoint', 'env', 'labels', 'ip', 'port_map', 'memory')
+    _decoders = {
+        'id': lambda data: data.get('Id'),
+        'name': lambda data: (data.get('Name') or '').lstrip('/'),
+        'image': lambda data: (data.get('Config') or {}).get('Image'),
+        'image_id': lambda data: data.get('Image'),
+        'created': lambda data: data.get('Created'),
+        'running': lambda data: (data.get('State') or {}).get('Running'),
+        'paused': lambda data: (data.get('State') or {}).get('Paused'),
+        'restarting': lambda data: (data.get('State') or {}).get('Restarting'),
+        'exit_code': lambda data: (data.get('State') or {}).get('ExitCode'),
+        'pid': lambda data: (data.get('State') or {}).get('Pid'),
+        'started_at': lambda data: (data.get('State') or {}).get('StartedAt'),
+        'cmd': lambda data: (data.get('Config') or {}).get('Cmd'),
+        'entrypoint': lambda data: (data.get('Config') or {}).get('Entrypoint'),
+        'env': lambda data: (data.get('Config') or {}).get('Env') or [],
+        'labels': lambda data: (data.get('Config') or {}).get('Labels') or {},
+        'ip': lambda data: (data.get('NetworkSettings') or {}).get('IPAddress'),
+        'port_map': lambda data: [port + ':' + bindings[0]['HostPort'] for port, bindings in
+                                  ((data.get('HostConfig') or {}).get('PortBindings') or {}).items() if bindings],
+        'memory': lambda data: (data.get('HostConfig') or {}).get('Memory')
+    }
+
+
+class Process(object):
+    """Process of list_container_process, one row of the ps output."""
+
+    __slots__ = ('uid', 'pid', 'ppid', 'cpu', 'memory', 'stime', 'tty', 'time', 'cmd')
+
+    # ps titles, for the default and the aux arguments, of every attribute.
+    TITLES = {
+        'UID': 'uid', 'USER': 'uid', 'PID': 'pid', 'PPID': 'ppid', 'C': 'cpu', '%CPU': 'cpu', '%MEM': 'memory',
+        'STIME': 'stime', 'START': 'stime', 'TTY': 'tty', 'TIME': 'time', 'CMD': 'cmd', 'COMMAND': 'cmd'
+    }
+
+    def __init__(self, titles, row):
+        for name in self.__slots__:
+            setattr(self, name, None)
+        for title, value in zip(titles, row):
+            name = self.TITLES.get(title)
+            if name is not None:
+                setattr(self, name, value)
+
+    def __repr__(self):
+        return 'Process(pid={0!r}, cmd={1!r})'.format(self.pid, self.cmd)
+
+
+class StatsSample(object):
+    """Stats sample of sample_container_stats, see :class:`StatsDecoder`, for typed and
+    untyped managers alike.
+
+    Unlike the other models it is decoded when it is read from the stream, the rates
+    are derived from the previous sample. Only the numbers are kept, in slots.
+    """
+
+    __slots__ = ('timestamp', 'cpu_percent', 'memory_usage', 'memory_limit', 'memory_percent',
+                 'blkio_read', 'blkio_write', 'rx_bytes', 'tx_bytes', 'rx_rate', 'tx_rate')
+
+    def __init__(self, timestamp, cpu_percent, memory_usage, memory_limit, memory_percent,
+                 blkio_read, blkio_write, rx_bytes, tx_bytes, rx_rate, tx_rate):
+        self.timestamp = timestamp
+        self.cpu_percent = cpu_percent
+        self.memory_usage = memory_usage
+        self.memory_limit = memory_limit
+        self.memory_percent = memory_percent
+        self.blkio_read = blkio_read
+        self.blkio_write = blkio_write
+        self.rx_bytes = rx_bytes
+        self.tx_bytes = tx_bytes
+        self.rx_rate = rx_rate
+        self.tx_rate = tx_rate
+
+    def as_dict(self):
+        return dict((name, getattr(self, name)) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return isinstance(other, StatsSample) and self.as_dict() == other.as_dict()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'StatsSample(timestamp={0!r}, cpu_percent={1!r}, memory_usage={2!r})'.format(
+            self.timestamp, self.cpu_percent, self.memory_usage)
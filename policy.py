@@ -0,0 +1,298 @@
+import collections
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from constants import DockerEndPoint, TimeoutClass
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a host whose circuit breaker is open."""
+
+
+class _CircuitBreaker(object):
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.time() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial = False
+            if self.state == self.HALF_OPEN and not self._trial:
+                # One trial request decides whether the host is back.
+                self._trial = True
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.time()
+
+
+class RequestPolicy(object):
+    """
+
+    :param dict timeouts: Read timeout in seconds of every TimeoutClass(Default is DEFAULT_TIMEOUTS)
+    :param float connect_timeout: Seconds to wait for a connection to the deamon(Default is 1)
+    :param bool adaptive: Shorten the read timeouts to a multiple of the p99 latency observed on
+                          the host for the end point, within the timeout class(Default is False)
+    :param float adaptive_multiplier: Multiple of the p99 latency used as timeout(Default is 4)
+    :param float adaptive_floor: Shortest adaptive timeout in seconds(Default is 0.5)
+    :param bool hedge: Send a second request for the hedged reads when the first one is slower
+                       than the p95 latency, the first answer wins(Default is False)
+    :param hedged_end_points: DockerEndPoint keys of the reads that may be hedged(Default is HEDGED_END_POINTS)
+    :param int retries: Retries of a failed GET, after a jittered exponential backoff(Default is 0)
+    :param float backoff: Base backoff in seconds, the n-th retry waits up to backoff * 2 ** n(Default is 0.1)
+    :param float max_backoff: Longest backoff in seconds(Default is 2)
+    :param int failure_threshold: Consecutive failures opening the circuit of a host(Default is 5)
+    :param float reset_timeout: Seconds a circuit stays open before a trial request(Default is 30)
+
+    Timeout, hedging, retry and circuit breaker policy of the requests of DockerManagers.
+    It only applies to the requests made with the default timeout, a method passing
+    its own timeout keeps it. The end points without a timeout class of their own, see
+    TIMEOUT_CLASSES, keep the timeout of their manager unless the READ or WRITE timeout
+    is given in ``timeouts``. Latencies and circuit breakers are kept per host, one
+    policy can be shared by the managers of a fleet.
+
+    .. code-block:: python
+
+        policy = RequestPolicy(adaptive=True, hedge=True, retries=2)
+        docker = DockerManager(host='docker.marlabs.com:2376', policy=policy)
+        docker.ping()                   # fails after 1 second on a dead host
+        docker.pull_image('ubuntu')     # no read timeout
+        policy.stats()
+
+    Failures are exceptions and 5xx responses. When a host fails failure_threshold
+    times in a row its requests raise CircuitOpenError until reset_timeout is over.
+    At most max_hedged hedged reads run at once, the others are sent without hedging.
+    :meth:`close` stops the threads of the hedged reads.
+    """
+
+    DEFAULT_TIMEOUTS = {
+        TimeoutClass.FAST: 1,
+        TimeoutClass.READ: 5,
+        TimeoutClass.WRITE: 30,
+        TimeoutClass.LONG: None
+    }
+
+    # Timeout class of the end points, the other GETs are READ and the other requests WRITE.
+    TIMEOUT_CLASSES = {
+        'PING': TimeoutClass.FAST,
+        'VERSION': TimeoutClass.FAST,
+        'EVENTS': TimeoutClass.LONG,
+        'CONTAINER_STATS': TimeoutClass.LONG,
+        'CONTAINER_LOGS': TimeoutClass.LONG,
+        'CONTAINER_ARCHIVE': TimeoutClass.LONG,
+        'START_EXEC': TimeoutClass.LONG,
+        'CREATE_IMAGE': TimeoutClass.LONG,
+        'PUSH_IMAGE': TimeoutClass.LONG,
+        'SAVE_IMAGE': TimeoutClass.LONG,
+        'SAVE_IMAGES': TimeoutClass.LONG,
+        'LOAD_IMAGE': TimeoutClass.LONG,
+        'BUILD_IMAGE': TimeoutClass.LONG,
+        'COMMIT_CONTAINER': TimeoutClass.LONG
+    }
+
+    HEDGED_END_POINTS = ('PING', 'INFO', 'VERSION', 'LIST_CONTAINER', 'INSPECT_CONTAINER', 'LIST_IMAGES', 'INSPECT_IMAGE')
+
+    def __init__(self, timeouts=None, connect_timeout=1, adaptive=False, adaptive_multiplier=4, adaptive_floor=0.5,
+                 hedge=False, hedged_end_points=None, retries=0, backoff=0.1, max_backoff=2,
+                 failure_threshold=5, reset_timeout=30):
+        self.timeouts = dict(self.DEFAULT_TIMEOUTS)
+        self.timeouts.update(timeouts or {})
+        self._configured_timeouts = frozenset(timeouts or ())
+        self.connect_timeout = connect_timeout
+        self.adaptive = adaptive
+        self.adaptive_multiplier = adaptive_multiplier
+        self.adaptive_floor = adaptive_floor
+        self.hedge = hedge
+        self.hedged_end_points = frozenset(self.HEDGED_END_POINTS if hedged_end_points is None else hedged_end_points)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.window = 200
+        self.min_samples = 20
+        self.max_hedged = 32
+        self._latencies = {}
+        self._breakers = {}
+        self._counters = collections.Counter()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._hedge_slots = threading.BoundedSemaphore(self.max_hedged)
+
+    # Latencies
+
+    def _record_latency(self, host, end_point, elapsed):
+        with self._lock:
+            samples = self._latencies.get((host, end_point))
+            if samples is None:
+                samples = self._latencies[(host, end_point)] = collections.deque(maxlen=self.window)
+            samples.append(elapsed)
+
+    def latency(self, host, end_point, quantile):
+        """Latency quantile, eg: 0.95, of the end point key on the host, None until
+        enough requests are observed."""
+        with self._lock:
+            samples = self._latencies.get((host, end_point))
+            if samples is None or len(samples) < self.min_samples:
+                return None
+            samples = sorted(samples)
+        return samples[min(len(samples) - 1, int(quantile * len(samples)))]
+
+    def timeout(self, host, method, end_point, default=False):
+        """(connect, read) timeout of a request made with the default timeout. An end point
+        without a timeout class of its own takes ``default``, the timeout of its manager,
+        unless the READ or WRITE timeout was given to the policy."""
+        timeout_class = self.TIMEOUT_CLASSES.get(end_point)
+        if timeout_class is None:
+            timeout_class = TimeoutClass.READ if method == 'GET' else TimeoutClass.WRITE
+            if timeout_class not in self._configured_timeouts and default is not False:
+                timeout_class = None
+        read_timeout = default if timeout_class is None else self.timeouts[timeout_class]
+        if self.adaptive and read_timeout is not None:
+            p99 = self.latency(host, end_point, 0.99)
+            if p99 is not None:
+                read_timeout = min(read_timeout, max(self.adaptive_floor, p99 * self.adaptive_multiplier))
+        return (self.connect_timeout, read_timeout)
+
+    # Circuit breakers
+
+    def _breaker(self, host):
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = _CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def circuit_state(self, host):
+        return self._breaker(host).state
+
+    # Requests
+
+    def request(self, server, method, path, timeout, **kwargs):
+        """Send a request of a DockerServer under the policy."""
+        host = server.host
+        end_point = DockerEndPoint.resolve(path)[0] or 'OTHER'
+        if timeout is False:
+            timeout = self.timeout(host, method, end_point, server.timeout)
+        breaker = self._breaker(host)
+        retries = self.retries if method in ('GET', 'HEAD') else 0
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                self._count('rejected')
+                raise CircuitOpenError('Circuit open for {0} after {1} failures'.format(host, breaker.failures))
+            start = time.time()
+            try:
+                if self._is_hedged(method, end_point, kwargs):
+                    response = self._hedged_send(server, host, method, path, end_point, timeout, **kwargs)
+                else:
+                    response = server._send(method, path, timeout, **kwargs)
+            except Exception:
+                breaker.failure()
+                if attempt >= retries:
+                    raise
+            else:
+                if response.status_code < 500:
+                    breaker.success()
+                    self._record_latency(host, end_point, time.time() - start)
+                    return response
+                breaker.failure()
+                if attempt >= retries:
+                    return response
+                response.close()
+            attempt += 1
+            self._count('retries')
+            # Full jitter, so the retries of many callers do not hit the host together.
+            time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+
+    def _is_hedged(self, method, end_point, kwargs):
+        return self.hedge and method == 'GET' and not kwargs.get('stream') and end_point in self.hedged_end_points
+
+    def _hedged_send(self, server, host, method, path, end_point, timeout, **kwargs):
+        delay = self.latency(host, end_point, 0.95)
+        if delay is None:
+            return server._send(method, path, timeout, **kwargs)
+        first = self._submit(server._send, method, path, timeout, **kwargs)
+        if first is None:
+            return server._send(method, path, timeout, **kwargs)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+        second = self._submit(server._send, method, path, timeout, **kwargs)
+        if second is None:
+            return first.result()
+        self._count('hedged')
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        self._count('hedges_won')
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _submit(self, function, *args, **kwargs):
+        # None when max_hedged requests are running already, eg: losers of slow hedges.
+        if not self._hedge_slots.acquire(False):
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_hedged)
+            future = self._executor.submit(function, *args, **kwargs)
+        future.add_done_callback(lambda _: self._hedge_slots.release())
+        return future
+
+    def close(self):
+        """Stop the threads of the hedged reads once their requests end, a later hedged
+        read starts new ones."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self):
+        """Policy counters and the circuit breaker of every host.
+
+        .. code-block:: json
+
+            {'circuits': {'docker.marlabs.com:2376': 'closed'}, 'hedged': 14, 'hedges_won': 9,
+             'rejected': 0, 'retries': 3}
+
+        """
+        with self._lock:
+            stats = dict((name, self._counters[name]) for name in ('hedged', 'hedges_won', 'retries', 'rejected'))
+            stats['circuits'] = dict((host, breaker.state) for host, breaker in self._breakers.items())
+        return stats
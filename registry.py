@@ -0,0 +1,258 @@
+import base64
+import collections
+import re
+import threading
+import time
+
+from constants import RegistryEndPoint, WebResponseStatusCode
+from transport import HttpTransport
+from utils import _run_concurrently
+
+DOCKER_HUB = 'https://registry-1.docker.io'
+
+_LINK_NEXT = re.compile(r'<([^>]+)>\s*;\s*rel="?next"?')
+_CHALLENGE_PARAM = re.compile(r'(\w+)="([^"]*)"')
+
+
+class RegistryClient(object):
+    """
+
+    :param str registry: Registry url, eg: https://registry.example.com:5000(Default is DOCKER_HUB)
+    :param str username: Registry user(Default is None, anonymous)
+    :param str password: Registry password or token(Default is None)
+    :param int pool_size: Keep-alive connections kept open to the registry(Default is 10)
+    :param float ttl: Seconds a response is reused without asking the registry(Default is 60)
+    :param float timeout: Timeout in seconds of every request(Default is 10)
+    :param verify: CA bundle path or bool to verify the registry certificate(Default is True)
+    :param int max_entries: Maximum number of cached responses(Default is 4096)
+
+    Client of the Docker Registry HTTP API v2: tag lists and manifests. Connections are
+    pooled, tag lists are followed page by page, and responses are cached: within the
+    ttl they are served from memory, after it they are revalidated with If-None-Match
+    when the registry sent an ETag. Bearer token and basic authentication are negotiated
+    from the registry challenge.
+
+    .. code-block:: python
+
+        registry = RegistryClient()
+        registry.list_tags('ubuntu')
+        registry.get_manifest('ubuntu', '14.04')
+        registry.list_tags_many(['ubuntu', 'redis', 'team/app'], concurrency=20)
+
+        local = RegistryClient('http://localhost:5000', ttl=5)
+
+    """
+
+    MANIFEST_TYPES = (
+        'application/vnd.docker.distribution.manifest.list.v2+json',
+        'application/vnd.docker.distribution.manifest.v2+json',
+        'application/vnd.oci.image.index.v1+json',
+        'application/vnd.oci.image.manifest.v1+json'
+    )
+
+    def __init__(self, registry=DOCKER_HUB, username=None, password=None, pool_size=10, ttl=60, timeout=10, verify=True, max_entries=4096):
+        self.registry = registry.rstrip('/')
+        self.username = username
+        self.password = password
+        self.ttl = ttl
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.transport = HttpTransport(self.registry, verify=verify, pool_size=pool_size)
+        self._cache = collections.OrderedDict()
+        self._tokens = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+
+    def _repository(self, repository):
+        # Official images of the Docker Hub live in the library namespace.
+        if self.registry == DOCKER_HUB and '/' not in repository:
+            return 'library/' + repository
+        return repository
+
+    # Requests
+
+    def _request(self, method, end_point, headers=None, scope=None):
+        headers = dict(headers or {})
+        token = self._tokens.get(scope)
+        if token is not None and token[1] > time.time():
+            headers['Authorization'] = token[0]
+        response = self.transport.request(method, end_point, headers=headers, timeout=self.timeout)
+        if response.status_code == 401 and self._authenticate(response, scope):
+            headers['Authorization'] = self._tokens[scope][0]
+            response = self.transport.request(method, end_point, headers=headers, timeout=self.timeout)
+        return response
+
+    def _authenticate(self, response, scope):
+        challenge = response.headers.get('www-authenticate', '')
+        scheme, _, params = challenge.partition(' ')
+        if scheme.lower() == 'basic':
+            if self.username is None:
+                return False
+            credentials = base64.b64encode('{0}:{1}'.format(self.username, self.password).encode('utf-8')).decode('ascii')
+            self._tokens[scope] = ('Basic ' + credentials, float('inf'))
+            return True
+        if scheme.lower() != 'bearer':
+            return False
+        params = dict(_CHALLENGE_PARAM.findall(params))
+        if not params.get('realm'):
+            return False
+        query = {'service': params.get('service')}
+        if params.get('scope') or scope:
+            query['scope'] = params.get('scope') or scope
+        auth = (self.username, self.password) if self.username is not None else None
+        token_response = self.transport.session.get(params['realm'], params=query, auth=auth, timeout=self.timeout)
+        if token_response.status_code not in WebResponseStatusCode.SUCCESS_LIST:
+            return False
+        try:
+            content = token_response.json()
+        except ValueError:
+            return False
+        token = content.get('token') or content.get('access_token') if isinstance(content, dict) else None
+        if not token:
+            return False
+        # Renew the token a little before it expires.
+        expires = time.time() + max(int(content.get('expires_in') or 60) - 10, 1)
+        self._tokens[scope] = ('Bearer ' + token, expires)
+        return True
+
+    def _cached_get(self, end_point, headers=None, scope=None):
+        """GET through the cache, return (status_code, content, headers)."""
+        key = (end_point, tuple(sorted((headers or {}).items())))
+        now = time.time()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+                if entry[0] > now:
+                    self.hits += 1
+                    return 200, entry[1], entry[3]
+        request_headers = dict(headers or {})
+        if entry is not None and entry[2]:
+            request_headers['If-None-Match'] = entry[2]
+        response = self._request('GET', end_point, request_headers, scope)
+        if response.status_code == 304 and entry is not None:
+            with self._lock:
+                self.revalidations += 1
+                self._store(key, (now + self.ttl, entry[1], entry[2], entry[3]))
+            return 200, entry[1], entry[3]
+        with self._lock:
+            self.misses += 1
+        if response.status_code != 200:
+            return response.status_code, response.content, response.headers
+        content = response.json()
+        response_headers = {
+            'link': response.headers.get('link'),
+            'content-type': response.headers.get('content-type'),
+            'docker-content-digest': response.headers.get('docker-content-digest')
+        }
+        with self._lock:
+            self._store(key, (now + self.ttl, content, response.headers.get('etag'), response_headers))
+        return 200, content, response_headers
+
+    def _store(self, key, entry):
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    # Tags and manifests
+
+    def list_tags(self, repository, page_size=100):
+        """
+        :param str repository: Repository, eg: ubuntu or team/app
+        :param int page_size: Tags asked per page(Default is 100)
+
+        List every tag of a repository, following the pages of the registry.
+
+        .. code-block:: json
+
+            {'content': ['12.04', '14.04', '16.04', 'latest'], 'status': True}
+
+        """
+        repository = self._repository(repository)
+        scope = 'repository:{0}:pull'.format(repository)
+        end_point = RegistryEndPoint.TAGS.format(repository) + '?n={0}'.format(page_size)
+        tags = []
+        while end_point:
+            status_code, content, headers = self._cached_get(end_point, scope=scope)
+            if status_code != 200:
+                return {'status': False, 'content': content}
+            tags.extend(content.get('tags') or [])
+            end_point = self._next_page(headers.get('link'))
+        return {'status': True, 'content': tags}
+
+    def _next_page(self, link):
+        match = _LINK_NEXT.search(link or '')
+        if match is None:
+            return None
+        url = match.group(1)
+        # The next page may be given with the registry url, end points are relative to it.
+        return url[len(self.registry):] if url.startswith(self.registry) else url
+
+    def get_manifest(self, repository, reference='latest'):
+        """
+        :param str repository: Repository, eg: ubuntu or team/app
+        :param str reference: Tag or digest(Default is latest)
+
+        Get the manifest, or manifest list, of an image.
+
+        .. code-block:: json
+
+            {'content': {'digest': 'sha256:6d3b3bb5...', 'manifest': {...},
+                         'media_type': 'application/vnd.docker.distribution.manifest.list.v2+json'},
+             'status': True}
+
+        """
+        repository = self._repository(repository)
+        scope = 'repository:{0}:pull'.format(repository)
+        status_code, content, headers = self._cached_get(
+            RegistryEndPoint.MANIFEST.format(repository, reference),
+            {'Accept': ', '.join(self.MANIFEST_TYPES)},
+            scope
+        )
+        if status_code != 200:
+            return {'status': False, 'content': content}
+        return {
+            'status': True,
+            'content': {
+                'digest': headers.get('docker-content-digest'),
+                'media_type': content.get('mediaType') or headers.get('content-type'),
+                'manifest': content
+            }
+        }
+
+    def list_tags_many(self, repositories, concurrency=10, timeout=None, page_size=100):
+        """List the tags of many repositories concurrently, see :meth:`list_tags`.
+
+        .. code-block:: json
+
+            {'content': {'redis': {'content': ['2.8', '3.0', 'latest'], 'elapsed': 0.21, 'status': True},
+                         'ubuntu': {'content': ['14.04', '16.04', 'latest'], 'elapsed': 0.19, 'status': True}},
+             'status': True}
+
+        """
+        results = _run_concurrently(lambda repository: self.list_tags(repository, page_size), repositories, concurrency, timeout)
+        return {
+            'status': all(result['status'] for result in results.values()),
+            'content': results
+        }
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'revalidations': self.revalidations,
+                'misses': self.misses,
+                'entries': len(self._cache)
+            }
+
+    def close(self):
+        self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
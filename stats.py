@@ -0,0 +1,93 @@
+import json
+
+from models import StatsSample
+from utils import _parse_timestamp
+
+
+class StatsDecoder(object):
+    """Decode docker stats JSON into compact :class:`StatsSample` records.
+
+    Every stats document is parsed once and reduced to fixed numeric fields: CPU
+    percentage, memory usage/limit (page cache excluded, as reported by docker stats),
+    block I/O bytes and network bytes with their per second rates. The previous sample
+    is kept to derive the network rates.
+
+    .. code-block:: python
+
+        decoder = StatsDecoder()
+        for line in docker.get_container_statics('cb8c119188c9')['content']:
+            record = decoder.decode(line)
+
+    """
+
+    def __init__(self):
+        self._previous = None
+
+    def decode(self, stats):
+        if not isinstance(stats, dict):
+            stats = json.loads(stats)
+        timestamp = _parse_timestamp(stats['read'])
+        memory_usage, memory_limit = self._memory(stats.get('memory_stats') or {})
+        blkio_read, blkio_write = self._blkio(stats.get('blkio_stats') or {})
+        rx_bytes = tx_bytes = 0
+        for interface in (stats.get('networks') or {}).values():
+            rx_bytes += interface.get('rx_bytes', 0)
+            tx_bytes += interface.get('tx_bytes', 0)
+        rx_rate = tx_rate = 0.0
+        previous = self._previous
+        if previous is not None and timestamp > previous.timestamp:
+            elapsed = timestamp - previous.timestamp
+            rx_rate = max(rx_bytes - previous.rx_bytes, 0) / elapsed
+            tx_rate = max(tx_bytes - previous.tx_bytes, 0) / elapsed
+        record = StatsSample(
+            timestamp,
+            self._cpu_percent(stats),
+            memory_usage,
+            memory_limit,
+            100.0 * memory_usage / memory_limit if memory_limit else 0.0,
+            blkio_read,
+            blkio_write,
+            rx_bytes,
+            tx_bytes,
+            rx_rate,
+            tx_rate
+        )
+        self._previous = record
+        return record
+
+    def _cpu_percent(self, stats):
+        cpu_stats = stats.get('cpu_stats') or {}
+        precpu_stats = stats.get('precpu_stats') or {}
+        cpu_usage = cpu_stats.get('cpu_usage') or {}
+        cpu_delta = cpu_usage.get('total_usage', 0) - (precpu_stats.get('cpu_usage') or {}).get('total_usage', 0)
+        system_delta = cpu_stats.get('system_cpu_usage', 0) - precpu_stats.get('system_cpu_usage', 0)
+        if cpu_delta <= 0 or system_delta <= 0:
+            return 0.0
+        online_cpus = cpu_stats.get('online_cpus') or len(cpu_usage.get('percpu_usage') or []) or 1
+        return 100.0 * cpu_delta / system_delta * online_cpus
+
+    def _memory(self, memory_stats):
+        usage = memory_stats.get('usage', 0)
+        detail = memory_stats.get('stats') or {}
+        # cgroup v1 reports the page cache as total_inactive_file/cache, v2 as inactive_file.
+        cache = detail.get('total_inactive_file', detail.get('inactive_file', detail.get('cache', 0)))
+        if cache < usage:
+            usage -= cache
+        return usage, memory_stats.get('limit', 0)
+
+    def _blkio(self, blkio_stats):
+        read = write = 0
+        for entry in blkio_stats.get('io_service_bytes_recursive') or []:
+            op = entry.get('op', '').lower()
+            if op == 'read':
+                read += entry.get('value', 0)
+            elif op == 'write':
+                write += entry.get('value', 0)
+        return read, write
+
+
+def _stats_record_helper(lines):
+    decoder = StatsDecoder()
+    for line in lines:
+        if line:
+            yield decoder.decode(line)
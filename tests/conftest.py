@@ -0,0 +1,54 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from fake_daemon import FakeDaemon  # noqa: E402
+
+
+def _load_package():
+    spec = importlib.util.spec_from_file_location('docker_manager', os.path.join(ROOT, '__init__.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+package = _load_package()
+
+
+@pytest.fixture
+def fake():
+    with FakeDaemon(containers=3, images=3, log_bytes=4096, stats_samples=5) as daemon:
+        yield daemon
+
+
+@pytest.fixture
+def failing_fake():
+    with FakeDaemon(containers=3, images=3, failure_rate=1) as daemon:
+        yield daemon
+
+
+@pytest.fixture
+def docker(fake):
+    with package.DockerManager(host=fake.host) as manager:
+        yield manager
+
+
+@pytest.fixture
+def typed_docker(fake):
+    with package.DockerManager(host=fake.host, typed=True) as manager:
+        yield manager
+
+
+def held_chunks(chunks, release, timeout=10):
+    """Chunks of a fake daemon route, the last one sent once ``release`` is set."""
+    chunks = list(chunks)
+    for chunk in chunks[:-1]:
+        yield chunk
+    release.wait(timeout)
+    yield chunks[-1]
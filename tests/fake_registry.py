@@ -0,0 +1,126 @@
+"""Stand-in Docker Registry HTTP API v2 for the tests: paginated tag lists, manifests,
+ETags and token or basic authentication."""
+import base64
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        registry = self.server.registry
+        url = urlparse(self.path)
+        query = dict((key, values[0]) for key, values in parse_qs(url.query).items())
+        with registry.lock:
+            registry.requests.append(self.path)
+        if url.path == '/token':
+            return self._token(registry, query)
+        if not registry.authorized(self.headers.get('Authorization')):
+            return self._send(401, {'errors': [{'code': 'UNAUTHORIZED'}]}, {'WWW-Authenticate': registry.challenge()})
+        parts = url.path.split('/')
+        if url.path.endswith('/tags/list'):
+            return self._tags(registry, '/'.join(parts[2:-2]), query)
+        if '/manifests/' in url.path:
+            body = {'schemaVersion': 2, 'mediaType': 'application/vnd.docker.distribution.manifest.v2+json'}
+            return self._send(200, body, {'Docker-Content-Digest': 'sha256:' + 'ab' * 32,
+                                          'Content-Type': 'application/vnd.docker.distribution.manifest.v2+json'})
+        self._send(404, {'errors': [{'code': 'NAME_UNKNOWN'}]})
+
+    def _token(self, registry, query):
+        registry.token_requests.append(query)
+        if registry.auth == 'bearer-no-token':
+            return self._send(200, {'expires_in': 300})
+        self._send(200, {'token': registry.token, 'expires_in': 300})
+
+    def _tags(self, registry, repository, query):
+        tags = registry.repositories.get(repository)
+        if tags is None:
+            return self._send(404, {'errors': [{'code': 'NAME_UNKNOWN'}]})
+        size = int(query.get('n', 100))
+        start = tags.index(query['last']) + 1 if 'last' in query else 0
+        page = tags[start:start + size]
+        headers = {}
+        if start + size < len(tags):
+            headers['Link'] = '<{0}/v2/{1}/tags/list?n={2}&last={3}>; rel="next"'.format(registry.url, repository, size, page[-1])
+        body = json.dumps({'name': repository, 'tags': page}).encode('utf-8')
+        etag = '"{0}"'.format(hashlib.sha256(body).hexdigest())
+        headers['ETag'] = etag
+        if self.headers.get('If-None-Match') == etag:
+            return self._send(304, b'', headers)
+        self._send(200, body, headers)
+
+    def _send(self, status, body, headers=None):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        headers = dict(headers or {})
+        headers.setdefault('Content-Type', 'application/json')
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeRegistry(object):
+    """
+    :param dict repositories: repository -> list of tags
+    :param str auth: None, 'bearer', 'basic', 'bearer-no-realm' or 'bearer-no-token'
+    """
+
+    def __init__(self, repositories, auth=None, username='user', password='secret'):
+        self.repositories = repositories
+        self.auth = auth
+        self.username = username
+        self.password = password
+        self.token = 'fake-token'
+        self.requests = []
+        self.token_requests = []
+        self.lock = threading.Lock()
+        self.server = None
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{0}'.format(self.server.server_address[1])
+
+    def challenge(self):
+        if self.auth == 'basic':
+            return 'Basic realm="fake"'
+        if self.auth == 'bearer-no-realm':
+            return 'Bearer service="fake"'
+        return 'Bearer realm="{0}/token",service="fake"'.format(self.url)
+
+    def authorized(self, authorization):
+        if self.auth is None:
+            return True
+        if self.auth == 'basic':
+            credentials = base64.b64encode('{0}:{1}'.format(self.username, self.password).encode('utf-8')).decode('ascii')
+            return authorization == 'Basic ' + credentials
+        return authorization == 'Bearer ' + self.token
+
+    def start(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.daemon_threads = True
+        self.server.registry = self
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
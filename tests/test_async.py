@@ -0,0 +1,88 @@
+import asyncio
+import os
+import threading
+
+from conftest import package
+from fake_daemon import FakeDaemon
+from models import StatsSample
+
+CONTAINER_IDS = ['{0:064x}'.format(index) for index in range(3)]
+
+
+def _run(fake, coroutine_function, **kwargs):
+    async def run():
+        async with package.AsyncDockerManager(fake.host, **kwargs) as docker:
+            return await coroutine_function(docker)
+    return asyncio.run(run())
+
+
+def test_concurrent_requests_share_the_pool(fake):
+    async def calls(docker):
+        results = await asyncio.gather(*[docker.list_container(all=True) for _ in range(40)])
+        return results, docker.pool_stats()
+
+    results, stats = _run(fake, calls, pool_size=4)
+    assert all([container['Id'] for container in result['content']] == CONTAINER_IDS for result in results)
+    assert stats['requests'] == 40
+    assert stats['connections_opened'] <= 4
+    assert stats['in_flight'] == 0
+
+
+def test_unix_socket(tmp_path):
+    with FakeDaemon(unix_socket=os.path.join(str(tmp_path), 'docker.sock'), containers=3, images=3) as fake:
+        async def calls(docker):
+            return [await docker.ping(), await docker.get_info(), await docker.get_info()], docker.pool_stats()
+
+        results, stats = _run(fake, calls)
+    assert all(result['status'] for result in results)
+    assert stats['connections_opened'] == 1
+
+
+def test_errors_and_inspect_summary(fake):
+    fake.routes[('GET', 'INSPECT_IMAGE')] = lambda h, args, query: h._send(404, {'message': 'No such image'})
+
+    async def calls(docker):
+        return await docker.get_image_detail('missing'), await docker.inspect_container(CONTAINER_IDS[1], raw_json=True)
+
+    missing, summary = _run(fake, calls)
+    assert missing['status'] is False
+    assert b'No such image' in missing['content']
+    assert summary['content']['Name'] == 'container-1'
+
+
+def test_coalesced_gets_send_one_request(fake):
+    calls = []
+    release = threading.Event()
+
+    def info(h, args, query):
+        calls.append(query)
+        release.wait(5)
+        h._send(200, {'Containers': 3})
+    fake.routes[('GET', 'INFO')] = info
+
+    async def gets(docker):
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.2, release.set)
+        results = await asyncio.gather(*[docker.get_info() for _ in range(10)])
+        results[0]['content']['Containers'] = 0
+        return results
+
+    results = _run(fake, gets, coalesce=True)
+    assert len(calls) == 1
+    assert [result['content']['Containers'] for result in results[1:]] == [3] * 9
+
+
+def test_streamed_logs_and_stats(fake):
+    async def calls(docker):
+        logs = await docker.get_container_logs(CONTAINER_IDS[1], stream=True)
+        lines = [line async for line in logs['content']]
+        joined = await docker.get_container_logs(CONTAINER_IDS[1])
+        samples = await docker.sample_container_stats(CONTAINER_IDS[1])
+        return lines, joined['content'], [sample async for sample in samples['content']]
+
+    lines, joined, samples = _run(fake, calls)
+    assert b'\n'.join(lines) == joined
+    assert len(lines) > 1
+    assert len(samples) == 5
+    assert all(isinstance(sample, StatsSample) for sample in samples)
+    assert samples[1].rx_rate == 1000.0
@@ -0,0 +1,94 @@
+import os
+
+from conftest import package
+
+
+def _write(root, files):
+    for name, content in files.items():
+        path = os.path.join(str(root), name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
+
+
+def _context(tmp_path, **kwargs):
+    _write(tmp_path, {
+        'Dockerfile': 'FROM app:latest\n',
+        '.dockerignore': '# build output\nnode_modules\n*.log\n!keep.log\nservices/**/tmp\n',
+        'app.py': 'print(1)\n',
+        'debug.log': 'noise\n',
+        'keep.log': 'kept\n',
+        'node_modules/left/index.js': 'x\n',
+        'services/api/tmp/cache': 'x\n',
+        'services/api/main.py': 'print(2)\n'
+    })
+    return package.BuildContext(str(tmp_path), **kwargs)
+
+
+def test_dockerignore_selects_the_members(tmp_path):
+    context = _context(tmp_path)
+    assert [arcname for _, arcname in context.members] == [
+        '.dockerignore', 'Dockerfile', 'app.py', 'keep.log', 'services', 'services/api', 'services/api/main.py'
+    ]
+
+
+def test_dockerfile_is_sent_even_when_ignored(tmp_path):
+    _write(tmp_path, {'build/Dockerfile': 'FROM app:latest\n', 'build/script.sh': 'true\n', '.dockerignore': 'build\n'})
+    context = package.BuildContext(str(tmp_path), 'build/Dockerfile')
+    assert [arcname for _, arcname in context.members] == ['.dockerignore', 'build/Dockerfile']
+
+
+def test_digest_ignores_modification_times(tmp_path):
+    digest = _context(tmp_path).digest()
+    os.utime(os.path.join(str(tmp_path), 'app.py'), (0, 0))
+    assert package.BuildContext(str(tmp_path)).digest() == digest
+    assert package.BuildContext(str(tmp_path)).digest({'VERSION': '2'}) != digest
+
+
+def test_digest_follows_the_content(tmp_path):
+    digest = _context(tmp_path).digest()
+    _write(tmp_path, {'debug.log': 'other noise\n'})
+    assert package.BuildContext(str(tmp_path)).digest() == digest
+    _write(tmp_path, {'app.py': 'print(3)\n'})
+    assert package.BuildContext(str(tmp_path)).digest() != digest
+
+
+def test_unchanged_files_are_not_hashed_again(tmp_path):
+    digests = {}
+    digest = _context(tmp_path, digests=digests).digest()
+    path = os.path.join(str(tmp_path), 'app.py')
+    known = digests[path]
+    digests[path] = (known[0], b'stale')
+    # A file with the same size, mtime and inode is trusted, a changed one is hashed again.
+    assert package.BuildContext(str(tmp_path), digests=digests).digest() != digest
+    os.utime(path, ns=(0, 0))
+    assert package.BuildContext(str(tmp_path), digests=digests).digest() == digest
+
+
+def test_build_is_skipped_when_the_tagged_image_has_the_context_digest(fake, docker, tmp_path):
+    _context(tmp_path)
+    built = {}
+    builds = []
+
+    def build(h, args, query):
+        builds.append(query)
+        h._send_chunked([b'{"aux":{"ID":"sha256:' + b'1' * 64 + b'"}}\r\n'])
+
+    def inspect(h, args, query):
+        if built:
+            h._send(200, {'Id': 'sha256:' + '1' * 64, 'Config': {'Labels': built}})
+        else:
+            h._send(404, {'message': 'No such image: team/app:dev'})
+
+    fake.routes[('POST', 'BUILD_IMAGE')] = build
+    fake.routes[('GET', 'INSPECT_IMAGE')] = inspect
+    first = docker.build_image(str(tmp_path), 'team/app:dev')['content']
+    assert first['cached'] is False
+    built[docker.CONTEXT_DIGEST_LABEL] = first['digest']
+    second = docker.build_image(str(tmp_path), 'team/app:dev')['content']
+    assert second['cached'] is True
+    assert second['digest'] == first['digest']
+    assert len(builds) == 1
+    # Other build arguments make another digest.
+    assert docker.build_image(str(tmp_path), 'team/app:dev', build_args={'VERSION': '2'})['content']['cached'] is False
+    assert len(builds) == 2
@@ -0,0 +1,54 @@
+import threading
+
+from conftest import held_chunks, package
+
+CONTAINER_ID = '{0:064x}'.format(1)
+
+
+def test_cached_response_is_not_shared(fake):
+    with package.DockerManager(host=fake.host, cache=True) as docker:
+        first = docker.inspect_container(CONTAINER_ID)
+        first['content']['State']['Running'] = 'MUTATED'
+        second = docker.inspect_container(CONTAINER_ID)
+        assert docker.cache.stats()['hits'] == 1
+        assert second['content']['State']['Running'] is True
+        second['content']['State']['Running'] = 'MUTATED'
+        assert docker.inspect_container(CONTAINER_ID)['content']['State']['Running'] is True
+
+
+def test_mutation_invalidates_cache(fake):
+    with package.DockerManager(host=fake.host, cache=True) as docker:
+        docker.inspect_container(CONTAINER_ID)
+        docker.restart_container(CONTAINER_ID)
+        docker.inspect_container(CONTAINER_ID)
+        assert docker.cache.stats()['hits'] == 0
+
+
+def test_streamed_mutation_invalidates_cache_at_its_end(fake, tmp_path):
+    release = threading.Event()
+    output = [b'{"stream":"Loading layer"}\r\n', b'{"stream":"Loaded image: app:1\\n"}\r\n']
+    fake.routes[('POST', 'LOAD_IMAGE')] = lambda h, args, query: h._send_chunked(held_chunks(output, release))
+    archive = tmp_path / 'images.tar'
+    archive.write_bytes(fake._image_tar)
+    try:
+        with package.DockerManager(host=fake.host, cache=True) as docker:
+            invalidated = threading.Event()
+            invalidate_end_point = docker.cache.invalidate_end_point
+            docker.cache.invalidate_end_point = lambda end_point: (invalidate_end_point(end_point), invalidated.set())
+            result = {}
+            load = threading.Thread(target=lambda: result.update(docker.load_image(str(archive))))
+            load.start()
+            # Read while the load is running, after its response started: the image
+            # before the load is cached.
+            assert invalidated.wait(10)
+            docker.get_image_detail('app:1')
+            docker.get_image_detail('app:1')
+            assert docker.cache.stats()['hits'] == 1
+            release.set()
+            load.join(10)
+            assert result['status'] is True
+            hits = docker.cache.stats()['hits']
+            docker.get_image_detail('app:1')
+            assert docker.cache.stats()['hits'] == hits
+    finally:
+        release.set()
@@ -0,0 +1,44 @@
+import asyncio
+
+from conftest import package
+
+IMAGE_ID = 'sha256:{0:064x}'.format(1)
+
+
+def _record(fake, key, queries, reply):
+    def route(h, args, query):
+        queries.append(query)
+        reply(h)
+    fake.routes[('DELETE', key)] = route
+
+
+def test_remove_container_sends_the_flags_as_query(fake, docker):
+    queries = []
+    _record(fake, 'REMOVE_CONTAINER', queries, lambda h: h._send_empty())
+    assert docker.remove_container('{0:064x}'.format(1), force=True, volume=True)['status'] is True
+    assert sorted(queries[0].split('&')) == ['force=True', 'v=True']
+
+
+def test_delete_image_sends_the_flags_as_query(fake, docker):
+    queries = []
+    _record(fake, 'REMOVE_IMAGE', queries, lambda h: h._send(200, [{'Deleted': IMAGE_ID}]))
+    assert docker.delete_image(IMAGE_ID, force_delete=True, no_prune=True)['status'] is True
+    assert sorted(queries[0].split('&')) == ['force=True', 'noprune=True']
+
+
+def test_async_delete_sends_the_flags_as_query(fake):
+    queries = []
+    _record(fake, 'REMOVE_CONTAINER', queries, lambda h: h._send_empty())
+    _record(fake, 'REMOVE_IMAGE', queries, lambda h: h._send(200, [{'Deleted': IMAGE_ID}]))
+
+    async def run():
+        manager = package.AsyncDockerManager(fake.host)
+        try:
+            await manager.remove_container('{0:064x}'.format(1), force=True)
+            await manager.delete_image(IMAGE_ID, no_prune=True)
+        finally:
+            await manager.close()
+
+    asyncio.run(run())
+    assert sorted(queries[0].split('&')) == ['force=True', 'v=False']
+    assert sorted(queries[1].split('&')) == ['force=False', 'noprune=True']
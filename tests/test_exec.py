@@ -0,0 +1,72 @@
+import json
+import struct
+import threading
+
+from conftest import held_chunks
+from constants import StreamType
+
+CONTAINER_ID = '{0:064x}'.format(1)
+
+
+def _frame(stream_id, payload):
+    return struct.pack('>BxxxL', stream_id, len(payload)) + payload
+
+
+def _post_bodies(docker):
+    bodies = []
+    post = docker._post
+
+    def recording_post(end_point, data=None, *args, **kwargs):
+        bodies.append(data)
+        return post(end_point, data, *args, **kwargs)
+    docker._post = recording_post
+    return bodies
+
+
+def test_create_exec_keeps_quoted_arguments(docker):
+    bodies = _post_bodies(docker)
+    assert docker.create_exec(CONTAINER_ID, 'sh -c "echo a b"')['status'] is True
+    assert docker.create_exec(CONTAINER_ID, ['cat', '/etc/hosts'])['status'] is True
+    assert json.loads(bodies[0])['Cmd'] == ['sh', '-c', 'echo a b']
+    assert json.loads(bodies[1])['Cmd'] == ['cat', '/etc/hosts']
+
+
+def test_exec_run_splits_stdout_and_stderr(fake, docker):
+    # Frames split across chunks, one byte at a time for the header of the second one.
+    output = _frame(1, b'line 1\nline') + _frame(2, b' oops\n') + _frame(1, b' 2\n')
+    fake.routes[('POST', 'START_EXEC')] = lambda h, args, query: h._send_chunked([output[:5], output[5:20], output[20:21], output[21:]])
+    result = docker.exec_run(CONTAINER_ID, ['app', '--check'])
+    assert result == {'status': True, 'content': {'exit_code': 0, 'stdout': b'line 1\nline 2\n', 'stderr': b' oops\n'}}
+
+
+def test_start_exec_streams_the_lines(fake, docker):
+    output = _frame(1, b'a\nb') + _frame(2, b'err\n') + _frame(1, b'\nc\n')
+    fake.routes[('POST', 'START_EXEC')] = lambda h, args, query: h._send_chunked([output[:7], output[7:]])
+    lines = docker.start_exec('e1', stream=True, split_streams=True)['content']
+    # Lines of every stream are split apart, without their line break.
+    assert list(lines) == [(StreamType.STDOUT, b'a'), (StreamType.STDERR, b'err'),
+                           (StreamType.STDOUT, b'b'), (StreamType.STDOUT, b'c')]
+    assert docker.start_exec('e1')['content'] == b'a\nberr\n\nc\n'
+
+
+def test_closing_the_stream_releases_the_connection(fake, docker):
+    release = threading.Event()
+    chunks = [_frame(1, b'tick\n')] * 3 + [_frame(1, b'done\n')]
+    fake.routes[('POST', 'START_EXEC')] = lambda h, args, query: h._send_chunked(held_chunks(chunks, release))
+    lines = docker.start_exec('e1', stream=True)['content']
+    assert next(lines) == b'tick'
+    reader = threading.Thread(target=lambda: list(lines))
+    reader.start()
+    lines.close()
+    reader.join(5)
+    release.set()
+    assert not reader.is_alive()
+    assert lines.closed
+    assert docker.pool_stats()['in_flight'] == 0
+
+
+def test_exec_containers(docker):
+    result = docker.exec_containers([CONTAINER_ID, '{0:064x}'.format(2)], 'pg_isready -q', concurrency=2)
+    assert result['status'] is True
+    assert sorted(result['content']) == [CONTAINER_ID, '{0:064x}'.format(2)]
+    assert all(r['content']['stdout'] == b'/var/run/postgresql:5432 - accepting connections\n' for r in result['content'].values())
@@ -0,0 +1,30 @@
+from conftest import package
+
+MB = 1000000
+
+
+def _pulled(index, size, shared_size):
+    return {'Id': 'sha256:{0:064x}'.format(index), 'ParentId': '', 'RepoTags': ['pulled:{0}'.format(index)],
+            'Size': size, 'SharedSize': shared_size}
+
+
+def test_reclaimable_of_a_pulled_image_leaves_out_the_shared_layers(fake, docker):
+    queries = []
+
+    def list_images(h, args, query):
+        queries.append(query)
+        h._send(200, [_pulled(1, 100 * MB, 80 * MB), _pulled(2, 90 * MB, 80 * MB), _pulled(3, 50 * MB, -1)])
+
+    fake.routes[('GET', 'LIST_IMAGES')] = list_images
+    graph = package.ImageGraph(docker).seed()
+    assert 'shared-size=True' in queries[0]
+    assert graph.reclaimable('pulled:1', remove_containers=True) == 20 * MB
+    assert graph.reclaimable(['pulled:1', 'pulled:2'], remove_containers=True) == 30 * MB
+    # Without a shared size the whole image is counted.
+    assert graph.reclaimable('pulled:3', remove_containers=True) == 50 * MB
+
+
+def test_reclaimable_of_a_built_image_is_its_layers_on_top_of_the_parent(docker):
+    graph = package.ImageGraph(docker).seed()
+    assert graph.reclaimable('app:2', remove_containers=True) == 1 * MB
+    assert graph.reclaimable(['app:1', 'app:2'], remove_containers=True) == 2 * MB
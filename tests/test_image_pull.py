@@ -0,0 +1,36 @@
+import json
+import threading
+
+from conftest import held_chunks
+
+LAYERS = ['a3ed95caeb02', 'b49b96595fb4']
+
+
+def _progress_chunks(steps):
+    events = [{'status': 'Pulling from library/app', 'id': 'latest'}]
+    for step in range(1, steps + 1):
+        for layer in LAYERS:
+            events.append({'status': 'Downloading', 'id': layer, 'progressDetail': {'current': step, 'total': steps}})
+    for layer in LAYERS:
+        events.append({'status': 'Pull complete', 'id': layer, 'progressDetail': {}})
+    events.append({'status': 'Status: Downloaded newer image for app:latest'})
+    return [json.dumps(event).encode('utf-8') + b'\r\n' for event in events]
+
+
+def test_pull_keeps_the_latest_progress_of_every_layer(fake, docker):
+    release = threading.Event()
+    fake.routes[('POST', 'CREATE_IMAGE')] = lambda h, args, query: h._send_chunked(held_chunks(_progress_chunks(1000), release))
+    pull = docker.pull_image('app')['content']
+    live = []
+    follower = threading.Thread(target=lambda: live.extend(pull))
+    follower.start()
+    with pull._condition:
+        assert pull._condition.wait_for(lambda: len(pull.layers) == 3 and pull.layers[LAYERS[1]]['status'] == 'Pull complete', 10)
+        assert len(pull.events) == 3
+    release.set()
+    assert pull.wait(10) == {'status': True, 'content': 'Status: Downloaded newer image for app:latest'}
+    follower.join(10)
+    statuses = [event['status'] for event in pull]
+    assert statuses == ['Pulling from library/app', 'Pull complete', 'Pull complete', 'Status: Downloaded newer image for app:latest']
+    assert live[-3:] == list(pull)[-3:]
+    assert pull.layers[LAYERS[0]] == {'status': 'Pull complete', 'current': 1000, 'total': 1000}
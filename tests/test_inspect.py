@@ -0,0 +1,18 @@
+import pytest
+
+CONTAINER_IDS = ['{0:064x}'.format(index) for index in range(3)]
+
+
+def test_inspect_containers_builds_the_summaries(docker):
+    response = docker.inspect_containers(CONTAINER_IDS[:2], fields=['Cont_Id', 'Name', 'port_map'])
+    assert response['status'] is True
+    assert response['content'][CONTAINER_IDS[1]]['content'] == {
+        'Cont_Id': CONTAINER_IDS[1], 'Name': 'container-1', 'port_map': ['8080/tcp:30001']
+    }
+
+
+def test_unknown_fields_raise_before_any_request(docker):
+    with pytest.raises(ValueError) as error:
+        docker.inspect_containers(fields=['Name', 'Nmae'])
+    assert 'Nmae' in str(error.value)
+    assert docker.pool_stats()['requests'] == 0
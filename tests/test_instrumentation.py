@@ -0,0 +1,108 @@
+import io
+
+from conftest import package
+
+CONTAINER_ID = '{0:064x}'.format(1)
+
+
+def _record(snapshot, method, end_point):
+    return [record for record in snapshot if record['method'] == method and record['end_point'] == end_point][0]
+
+
+def test_snapshot_counts_requests_statuses_and_bytes(fake):
+    metrics = package.Instrumentation(buckets=(0.5, 60))
+    fake.routes[('GET', 'INSPECT_CONTAINER')] = lambda h, args, query: (
+        h._send(404, {'message': 'No such container'}) if args[0] == 'missing' else h._send(200, {'Id': args[0]}))
+    with package.DockerManager(host=fake.host, instrumentation=metrics) as docker:
+        docker.inspect_container(CONTAINER_ID)
+        docker.inspect_container(CONTAINER_ID)
+        docker.inspect_container('missing')
+        snapshot = metrics.snapshot()
+    record = _record(snapshot, 'GET', 'INSPECT_CONTAINER')
+    assert record['host'] == fake.host
+    assert record['count'] == 3
+    assert record['statuses'] == {200: 2, 404: 1}
+    assert record['errors'] == 0
+    assert record['in_flight'] == 0
+    # The buckets are cumulative, the last one counts every request.
+    assert record['buckets'] == {0.5: 3, 60: 3, 'inf': 3}
+    assert record['bytes_in'] == 2 * len(b'{"Id": "%s"}' % CONTAINER_ID.encode()) + len(b'{"message": "No such container"}')
+    assert record['bytes_out'] == 0
+
+
+def test_chunked_uploads_count_the_bytes_sent(fake, tmp_path):
+    metrics = package.Instrumentation()
+    (tmp_path / 'conf.yml').write_bytes(b'port: 8080\n' * 1000)
+    with package.DockerManager(host=fake.host, instrumentation=metrics) as docker:
+        docker.load_image(io.BytesIO(fake._image_tar), chunk_size=4096)
+        response = docker.put_archive(CONTAINER_ID, '/etc', [str(tmp_path / 'conf.yml')])
+        docker.create_exec(CONTAINER_ID, 'true')
+        snapshot = metrics.snapshot()
+    assert _record(snapshot, 'POST', 'LOAD_IMAGE')['bytes_out'] == len(fake._image_tar)
+    assert _record(snapshot, 'PUT', 'CONTAINER_ARCHIVE')['bytes_out'] == response['content']['bytes'] > 11000
+    assert _record(snapshot, 'POST', 'CREATE_EXEC')['bytes_out'] > 0
+
+
+def test_failed_requests_count_as_errors():
+    metrics = package.Instrumentation()
+    failures = []
+    metrics.on_response(lambda record: failures.append(record) if record['error'] is not None else None)
+    with package.DockerManager(host='127.0.0.1:1', instrumentation=metrics) as docker:
+        try:
+            docker.ping()
+        except Exception:
+            pass
+    record = metrics.snapshot()[0]
+    assert record['errors'] == 1
+    assert record['statuses'] == {}
+    assert failures[0]['status'] is None
+
+
+def test_hooks_see_every_request(fake):
+    metrics = package.Instrumentation()
+    requests = []
+    responses = []
+    metrics.on_request(requests.append)
+    metrics.on_response(responses.append)
+    with package.DockerManager(host=fake.host, instrumentation=metrics) as docker:
+        docker.get_info()
+    assert requests[0]['end_point'] == 'INFO'
+    assert responses[0]['status'] == 200
+    assert responses[0]['bytes_in'] > 0
+    metrics.reset()
+    assert metrics.snapshot()[0]['count'] == 0
+
+
+def test_prometheus_text_format(fake):
+    metrics = package.Instrumentation(buckets=(0.5, 60))
+    with package.DockerManager(host=fake.host, instrumentation=metrics) as docker:
+        docker.get_info()
+        docker.get_info()
+    text = metrics.prometheus(prefix='dm')
+    assert text.endswith('\n')
+    lines = text.splitlines()
+    labels = 'host="{0}",method="GET",end_point="INFO"'.format(fake.host)
+    for name, kind in [('request_duration_seconds', 'histogram'), ('responses_total', 'counter'),
+                       ('request_errors_total', 'counter'), ('received_bytes_total', 'counter'),
+                       ('sent_bytes_total', 'counter'), ('requests_in_flight', 'gauge')]:
+        assert '# TYPE dm_{0} {1}'.format(name, kind) in lines
+        assert any(line.startswith('# HELP dm_{0} '.format(name)) for line in lines)
+    assert 'dm_request_duration_seconds_bucket{{{0},le="0.5"}} 2'.format(labels) in lines
+    assert 'dm_request_duration_seconds_bucket{{{0},le="60.0"}} 2'.format(labels) in lines
+    assert 'dm_request_duration_seconds_bucket{{{0},le="+Inf"}} 2'.format(labels) in lines
+    assert 'dm_request_duration_seconds_count{{{0}}} 2'.format(labels) in lines
+    assert 'dm_responses_total{{{0},status="200"}} 2'.format(labels) in lines
+    assert 'dm_request_errors_total{{{0}}} 0'.format(labels) in lines
+    assert 'dm_requests_in_flight{{{0}}} 0'.format(labels) in lines
+    # Every sample line is a metric name, its labels and a value.
+    for line in lines:
+        if not line.startswith('#'):
+            name, _, value = line.rpartition(' ')
+            assert name.startswith('dm_') and name.endswith('}')
+            float(value)
+
+
+def test_prometheus_escapes_label_values():
+    metrics = package.Instrumentation()
+    metrics._get_metrics(('node "1"\\', 'GET', 'INFO')).count = 1
+    assert 'host="node \\"1\\"\\\\"' in metrics.prometheus()
@@ -0,0 +1,87 @@
+import json
+import threading
+import time
+
+from conftest import held_chunks, package
+
+CONTAINER_ID = '{0:064x}'.format(1)
+
+
+def _event(action, container_id=CONTAINER_ID, event_time=1455008494):
+    return json.dumps({'Type': 'container', 'Action': action, 'time': event_time,
+                       'Actor': {'ID': container_id, 'Attributes': {'name': 'container-1'}}}).encode('utf-8') + b'\n'
+
+
+def _wait(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_stop_closes_the_events_stream(fake, docker):
+    release = threading.Event()
+    fake.routes[('GET', 'EVENTS')] = lambda h, args, query: h._send_chunked(held_chunks([_event('pause'), b''], release))
+    try:
+        inventory = package.Inventory(docker).start()
+        assert _wait(lambda: inventory.get_container(CONTAINER_ID)['State'] == 'paused')
+        thread = inventory._thread
+        start = time.time()
+        inventory.stop(timeout=5)
+        assert not thread.is_alive()
+        assert time.time() - start < 2
+        assert inventory._stream.closed
+        assert docker.pool_stats()['in_flight'] == 0
+    finally:
+        release.set()
+
+
+def test_follow_reconnects_from_the_last_event(fake, docker):
+    release = threading.Event()
+    queries = []
+
+    def events(h, args, query):
+        queries.append(query)
+        if len(queries) == 1:
+            # The deamon goes away after one event.
+            return h._send_chunked([_event('pause', event_time=1455008500)])
+        h._send_chunked(held_chunks([_event('unpause', event_time=1455008600), b''], release))
+
+    fake.routes[('GET', 'EVENTS')] = events
+    try:
+        inventory = package.Inventory(docker, retry_interval=0.05).start()
+        assert _wait(lambda: len(queries) == 2 and inventory.get_container(CONTAINER_ID)['State'] == 'running')
+        assert 'since=1455008500' in queries[1]
+        assert inventory.healthy is True
+        assert 'closed the events stream' in inventory.last_error
+        inventory.stop(timeout=5)
+        assert inventory.healthy is False
+    finally:
+        release.set()
+
+
+def test_image_event_does_not_block_reads(fake, docker):
+    release = threading.Event()
+    inspect = fake.routes[('GET', 'INSPECT_IMAGE')]
+
+    def slow_inspect(h, args, query):
+        release.wait(10)
+        inspect(h, args, query)
+
+    inventory = package.Inventory(docker).seed()
+    fake.routes[('GET', 'INSPECT_IMAGE')] = slow_inspect
+    try:
+        event = {'Type': 'image', 'Action': 'tag', 'Actor': {'ID': 'sha256:{0:064x}'.format(1)}}
+        applying = threading.Thread(target=inventory.apply_event, args=(event,))
+        applying.start()
+        time.sleep(0.1)
+        start = time.time()
+        assert inventory.get_container('container-1')['Id'] == CONTAINER_ID
+        assert time.time() - start < 0.5
+        release.set()
+        applying.join(5)
+        assert inventory.get_image('app:1')['Id'] == 'sha256:{0:064x}'.format(1)
+    finally:
+        release.set()
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from conftest import package
+from utils import _json_array_helper
+
+CONTAINER_IDS = ['{0:064x}'.format(index) for index in range(3)]
+
+
+def _split(data, size):
+    return [data[index:index + size] for index in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 64])
+def test_elements_split_across_chunks(size):
+    elements = [1234, -5.5e3, 'a, ]"b', {'a': [1, {'b': None}]}, True, False, None, [], 'é']
+    data = json.dumps(elements).encode('utf-8')
+    assert list(_json_array_helper(_split(data, size))) == elements
+
+
+def test_number_continued_in_the_next_chunk():
+    assert list(_json_array_helper([b'[12', b'34]'])) == [1234]
+    assert list(_json_array_helper([b'[1', b'2,', b'3', b']'])) == [12, 3]
+    assert list(_json_array_helper([b'[tr', b'ue]'])) == [True]
+    assert list(_json_array_helper([b'[-1.', b'5e', b'3]'])) == [-1500.0]
+
+
+@pytest.mark.parametrize('chunks', [[b'[{"a":1},'], [b'[1,2'], [b'[1', b'2'], [b'[{"a":'], [b'']])
+def test_truncated_array_raises(chunks):
+    with pytest.raises(ValueError):
+        list(_json_array_helper(chunks))
+
+
+@pytest.mark.parametrize('chunks', [[b'{"message": "page not found"}'], [b'[1x]']])
+def test_invalid_array_raises(chunks):
+    with pytest.raises(ValueError):
+        list(_json_array_helper(chunks))
+
+
+def test_fields_and_raw():
+    data = [b'[{"Id": "a", "Size": 1, "Labels": {}}, ', b'{"Id": "b", "Size": 2}]']
+    assert list(_json_array_helper(data, fields=['Id'])) == [{'Id': 'a'}, {'Id': 'b'}]
+    assert list(_json_array_helper(data, raw=True)) == ['{"Id": "a", "Size": 1, "Labels": {}}', '{"Id": "b", "Size": 2}']
+
+
+def test_list_container_stream(docker):
+    response = docker.list_container(all=True, stream=True, fields=['Id', 'State'])
+    assert response['status'] is True
+    containers = list(response['content'])
+    assert [container['Id'] for container in containers] == CONTAINER_IDS
+    assert all(set(container) == {'Id', 'State'} for container in containers)
+    assert containers == [{'Id': c['Id'], 'State': c['State']} for c in docker.list_container(all=True)['content']]
+
+
+def test_list_image_stream(docker):
+    response = docker.list_image({'all': True}, stream=True, fields=['Id'])
+    assert [image['Id'] for image in response['content']] == ['sha256:{0:064x}'.format(index) for index in range(3)]
+
+
+def test_truncated_list_raises(fake, docker):
+    fake.routes[('GET', 'LIST_CONTAINER')] = lambda h, args, query: h._send(200, b'[{"Id": "a"}, {"Id"')
+    response = docker.list_container(stream=True)
+    with pytest.raises(ValueError):
+        list(response['content'])
@@ -0,0 +1,35 @@
+import threading
+import time
+
+from conftest import held_chunks
+
+CONTAINER_IDS = ['{0:064x}'.format(index) for index in range(2)]
+
+
+def test_close_releases_the_followed_streams(fake, docker):
+    release = threading.Event()
+    fake.routes[('GET', 'CONTAINER_LOGS')] = lambda h, args, query: h._send_chunked(
+        held_chunks([fake._logs, b''], release), 'application/vnd.docker.raw-stream')
+    try:
+        follower = docker.follow_container_logs(CONTAINER_IDS + CONTAINER_IDS[:1], reorder_window=0.05)['content']
+        assert follower.container_ids == CONTAINER_IDS
+        entries = iter(follower)
+        assert next(entries).container_id in CONTAINER_IDS
+        start = time.time()
+        follower.close(timeout=5)
+        assert time.time() - start < 2
+        assert not any(thread.is_alive() for thread in follower._threads)
+        assert all(stream.closed for stream in follower._streams.values())
+        assert list(entries) == []
+        assert docker.pool_stats()['in_flight'] == 0
+    finally:
+        release.set()
+
+
+def test_follow_ends_with_the_logs(fake, docker):
+    follower = docker.follow_container_logs(CONTAINER_IDS, reorder_window=0.05)['content']
+    entries = list(follower)
+    lines = fake._logs.count(b'\n')
+    assert len(entries) == 2 * lines
+    assert [entry.timestamp for entry in entries] == sorted(entry.timestamp for entry in entries)
+    follower.close()
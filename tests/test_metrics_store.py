@@ -0,0 +1,40 @@
+import threading
+
+import numpy as np
+import pytest
+
+from metrics_store import ContainerMetricsStore
+
+
+def test_concurrent_samplers_while_the_store_grows():
+    store = ContainerMetricsStore(capacity=100, downsample=10, containers=1)
+    barrier = threading.Barrier(8)
+
+    def sampler(worker):
+        barrier.wait()
+        for sample in range(50):
+            for container in range(4):
+                store.add('c-{0}-{1}'.format(worker, container), {'cpu': worker * 100 + sample}, timestamp=1 + sample)
+
+    threads = [threading.Thread(target=sampler, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(store._rows) == 32
+    for container_id, row in store._rows.items():
+        worker = int(container_id.split('-')[1])
+        assert np.count_nonzero(~np.isnan(store._time[row])) == 50
+        assert store.latest(container_id)['cpu'] == worker * 100 + 49
+
+
+def test_window_merges_downsampled_samples_per_container():
+    store = ContainerMetricsStore(capacity=10, downsample=5, coarse_capacity=10)
+    for t in range(1, 11):
+        store.add('covered', {'cpu': 0.0}, timestamp=t)
+    for t in range(1, 21):
+        store.add('aged', {'cpu': float(t)}, timestamp=t)
+    means = store.mean('cpu', window=21, now=21)
+    assert means['covered'] == 0.0
+    # Raw samples 11..20 and the coarse means of 1..5 and 6..10.
+    assert means['aged'] == pytest.approx((sum(range(11, 21)) + 3 + 8) / 12.0)
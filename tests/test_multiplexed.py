@@ -0,0 +1,69 @@
+import random
+import struct
+
+import pytest
+
+from constants import StreamType
+from utils import MultiplexedStreamDecoder, _multiplexed_buffer_helper, _multiplexed_stream_helper
+
+CONTAINER_ID = '{0:064x}'.format(1)
+
+
+def _frame(stream_id, payload):
+    return struct.pack('>BxxxL', stream_id, len(payload)) + payload
+
+
+FRAMES = [(1, b'first line\nsecond '), (2, b'error: '), (1, b'line\n'), (2, b'disk full\n'), (1, b''),
+          (1, b'x' * 70000 + b'\n'), (1, b'no newline at the end')]
+DATA = b''.join(_frame(stream_id, payload) for stream_id, payload in FRAMES)
+# Lines are yielded when they complete, stdout and stderr are reassembled apart.
+LINES = [(1, b'first line'), (1, b'second line'), (2, b'error: disk full'), (1, b'x' * 70000), (1, b'no newline at the end')]
+
+
+def _split(data, sizes):
+    chunks = []
+    offset = 0
+    while offset < len(data):
+        size = next(sizes)
+        chunks.append(data[offset:offset + size])
+        offset += size
+    return chunks
+
+
+@pytest.mark.parametrize('size', [1, 3, 7, 8, 9, 4096])
+def test_frames_split_at_any_offset(size):
+    decoder = MultiplexedStreamDecoder()
+    frames = []
+    for index in range(0, len(DATA), size):
+        frames.extend(decoder.feed(DATA[index:index + size]))
+    assert frames == FRAMES
+
+
+def test_random_splits_keep_the_lines_of_every_stream():
+    generator = random.Random(42)
+    for _ in range(20):
+        chunks = _split(DATA, iter(lambda: generator.randint(1, 200), None))
+        assert list(_multiplexed_stream_helper(chunks, split_streams=True)) == LINES
+    assert list(_multiplexed_stream_helper([DATA])) == [line for _, line in LINES]
+
+
+def test_incomplete_frame_is_kept_until_it_completes():
+    decoder = MultiplexedStreamDecoder()
+    assert decoder.feed(DATA[:5]) == []
+    assert decoder.feed(DATA[5:12]) == []
+    assert decoder.feed(DATA[12:8 + len(FRAMES[0][1])]) == [FRAMES[0]]
+    assert decoder.flush() == []
+
+
+def test_buffer_helper_yields_the_payloads():
+    assert list(_multiplexed_buffer_helper(DATA)) == [payload for _, payload in FRAMES]
+
+
+def test_container_logs_across_chunk_splits(fake, docker):
+    chunks = _split(DATA, iter([5, 1, 2, 17, 8, 9, 30000, 40000] + [100] * 1000))
+    fake.routes[('GET', 'CONTAINER_LOGS')] = lambda h, args, query: h._send_chunked(chunks, 'application/vnd.docker.raw-stream')
+    assert docker.get_container_logs(CONTAINER_ID)['content'] == b''.join(payload for _, payload in FRAMES)
+    assert docker.get_container_logs(CONTAINER_ID, split_streams=True)['content'] == LINES
+    streamed = docker.get_container_logs(CONTAINER_ID, stream=True, split_streams=True)['content']
+    assert [(stream_id, line) for stream_id, line in streamed if stream_id == StreamType.STDERR] == [(2, b'error: disk full')]
+    assert streamed.closed
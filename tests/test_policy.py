@@ -0,0 +1,180 @@
+import threading
+import time
+
+import pytest
+
+from conftest import package
+from constants import TimeoutClass
+
+INFO = {'Containers': 3, 'Images': 3}
+
+
+def _counting(fake, key, replies, method='GET'):
+    """Answer the route with the (status, body) replies in turn, the last one repeated."""
+    calls = []
+    lock = threading.Lock()
+
+    def route(h, args, query):
+        with lock:
+            calls.append(time.time())
+            status, body = replies[min(len(calls), len(replies)) - 1]
+        if callable(body):
+            body = body()
+        h._send(status, body)
+    fake.routes[(method, key)] = route
+    return calls
+
+
+def test_circuit_opens_rejects_then_closes_after_a_trial(fake):
+    policy = package.RequestPolicy(failure_threshold=2, reset_timeout=0.2)
+    calls = _counting(fake, 'INFO', [(500, {'message': 'down'})])
+    with package.DockerManager(host=fake.host, policy=policy) as docker:
+        assert docker.get_info()['status'] is False
+        assert policy.circuit_state(fake.host) == 'closed'
+        assert docker.get_info()['status'] is False
+        assert policy.circuit_state(fake.host) == 'open'
+        with pytest.raises(package.CircuitOpenError):
+            docker.get_info()
+        assert len(calls) == 2
+        assert policy.stats()['rejected'] == 1
+        time.sleep(0.25)
+        # The trial request fails, the circuit opens again.
+        assert docker.get_info()['status'] is False
+        assert policy.circuit_state(fake.host) == 'open'
+        time.sleep(0.25)
+        _counting(fake, 'INFO', [(200, INFO)])
+        assert docker.get_info()['content'] == INFO
+        assert policy.circuit_state(fake.host) == 'closed'
+
+
+def test_half_open_circuit_lets_one_trial_through():
+    policy = package.RequestPolicy(failure_threshold=1, reset_timeout=0.1)
+    breaker = policy._breaker('node1:2376')
+    breaker.failure()
+    assert breaker.allow() is False
+    time.sleep(0.15)
+    assert breaker.allow() is True
+    assert policy.circuit_state('node1:2376') == 'half_open'
+    assert breaker.allow() is False
+    breaker.success()
+    assert policy.circuit_state('node1:2376') == 'closed'
+    assert breaker.allow() is True
+
+
+def test_get_is_retried_on_5xx(fake):
+    policy = package.RequestPolicy(retries=2, backoff=0.001)
+    calls = _counting(fake, 'INFO', [(503, {'message': 'busy'}), (500, {'message': 'busy'}), (200, INFO)])
+    with package.DockerManager(host=fake.host, policy=policy) as docker:
+        assert docker.get_info()['content'] == INFO
+    assert len(calls) == 3
+    assert policy.stats()['retries'] == 2
+    assert policy.circuit_state(fake.host) == 'closed'
+
+
+def test_post_is_not_retried(fake):
+    policy = package.RequestPolicy(retries=2, backoff=0.001)
+    calls = _counting(fake, 'CONTAINER_OPERATION', [(500, {'message': 'busy'}), (204, b'')], method='POST')
+    with package.DockerManager(host=fake.host, policy=policy) as docker:
+        assert docker.start_container('{0:064x}'.format(1))['status'] is False
+    assert len(calls) == 1
+    assert policy.stats()['retries'] == 0
+
+
+def test_hedge_is_sent_after_the_p95_latency(fake):
+    policy = package.RequestPolicy(hedge=True)
+    policy.min_samples = 5
+    with package.DockerManager(host=fake.host, policy=policy) as docker:
+        for _ in range(5):
+            docker.get_info()
+        p95 = policy.latency(fake.host, 'INFO', 0.95)
+        assert p95 is not None
+        slow = threading.Event()
+        calls = _counting(fake, 'INFO', [(200, lambda: slow.wait(2) and INFO), (200, INFO)])
+        start = time.time()
+        assert docker.get_info()['content'] == INFO
+        elapsed = time.time() - start
+        slow.set()
+        assert elapsed < 1
+        assert len(calls) == 2
+        assert calls[1] - calls[0] >= p95 * 0.5
+        assert policy.stats()['hedged'] == 1
+        assert policy.stats()['hedges_won'] == 1
+
+
+def test_fast_reads_are_not_hedged(fake):
+    policy = package.RequestPolicy(hedge=True)
+    policy.min_samples = 5
+    calls = _counting(fake, 'INFO', [(200, INFO)])
+    with package.DockerManager(host=fake.host, policy=policy) as docker:
+        for _ in range(10):
+            docker.get_info()
+    assert len(calls) == 10
+    assert policy.stats()['hedged'] == 0
+
+
+def test_adaptive_timeout_is_clamped_between_the_floor_and_the_class_timeout():
+    policy = package.RequestPolicy(adaptive=True, adaptive_multiplier=4, adaptive_floor=0.5)
+    policy.min_samples = 5
+    assert policy.timeout('node1', 'GET', 'INFO') == (1, 5)
+    for _ in range(5):
+        policy._record_latency('node1', 'INFO', 0.001)
+        policy._record_latency('node1', 'LIST_CONTAINER', 0.3)
+        policy._record_latency('node1', 'INSPECT_IMAGE', 10)
+        policy._record_latency('node1', 'CONTAINER_LOGS', 10)
+    assert policy.timeout('node1', 'GET', 'INFO') == (1, 0.5)
+    assert policy.timeout('node1', 'GET', 'LIST_CONTAINER') == (1, pytest.approx(1.2))
+    assert policy.timeout('node1', 'GET', 'INSPECT_IMAGE') == (1, 5)
+    # No read timeout stays without one.
+    assert policy.timeout('node1', 'GET', 'CONTAINER_LOGS') == (1, None)
+
+
+def test_end_points_without_a_class_keep_the_manager_timeout(fake):
+    policy = package.RequestPolicy()
+    assert policy.timeout('node1', 'GET', 'INFO', 7) == (1, 7)
+    assert policy.timeout('node1', 'POST', 'CONTAINER_OPERATION', 7) == (1, 7)
+    assert policy.timeout('node1', 'GET', 'PING', 7) == (1, 1)
+    assert policy.timeout('node1', 'GET', 'EVENTS', 7) == (1, None)
+    configured = package.RequestPolicy(timeouts={TimeoutClass.READ: 3})
+    assert configured.timeout('node1', 'GET', 'INFO', 7) == (1, 3)
+    assert configured.timeout('node1', 'POST', 'CONTAINER_OPERATION', 7) == (1, 7)
+    with package.DockerManager(host=fake.host, timeout=7, policy=policy) as docker:
+        timeouts = []
+        send = docker._send
+        docker._send = lambda method, end_point, timeout, **kwargs: (timeouts.append(timeout), send(method, end_point, timeout, **kwargs))[1]
+        docker.get_info()
+    assert timeouts[0] == (1, 7)
+
+
+def test_manager_closes_the_policy_it_creates(fake):
+    with package.DockerManager(host=fake.host, policy=True) as docker:
+        policy = docker.policy
+        assert isinstance(policy, package.RequestPolicy)
+        policy.hedge = True
+        policy.min_samples = 1
+        docker.get_info()
+        docker.get_info()
+        assert policy._executor is not None
+    assert policy._executor is None
+
+
+def test_hedges_are_bounded(fake):
+    policy = package.RequestPolicy(hedge=True)
+    policy.min_samples = 1
+    policy._hedge_slots = threading.BoundedSemaphore(1)
+    release = threading.Event()
+    with package.DockerManager(host=fake.host, policy=policy) as docker:
+        docker.get_info()
+        calls = _counting(fake, 'INFO', [(200, lambda: release.wait(2) and INFO), (200, INFO)])
+        results = []
+        thread = threading.Thread(target=lambda: results.append(docker.get_info()))
+        thread.start()
+        while not calls:
+            time.sleep(0.01)
+        time.sleep(0.1)
+        # The only slot is taken by the slow read, its hedge is not sent.
+        assert len(calls) == 1
+        release.set()
+        thread.join(5)
+        assert results[0]['content'] == INFO
+        assert policy.stats()['hedged'] == 0
+        policy.close()
@@ -0,0 +1,88 @@
+from conftest import package
+from fake_registry import FakeRegistry
+
+TAGS = ['{0}.0'.format(index) for index in range(250)]
+
+
+def test_manager_close_closes_the_registry_clients(docker):
+    with FakeRegistry({'team/app': TAGS}) as registry:
+        host = registry.url[len('http://'):]
+        docker._registries[registry.url] = package.RegistryClient(registry.url)
+        docker._split_registry = lambda image_name: (registry.url, image_name.split('/', 1)[1])
+        assert docker.get_image_tags(host + '/team/app')['content'] == TAGS
+        client = docker._registries[registry.url]
+        closed = []
+        close = client.close
+        client.close = lambda: (closed.append(True), close())
+        docker.close()
+        assert closed == [True]
+        assert docker._registries == {}
+
+
+def test_bearer_challenge_without_realm_fails_the_listing():
+    with FakeRegistry({'team/app': TAGS}, auth='bearer-no-realm') as registry:
+        client = package.RegistryClient(registry.url)
+        assert client.list_tags('team/app')['status'] is False
+        client.close()
+
+
+def test_token_response_without_token_fails_the_listing():
+    with FakeRegistry({'team/app': TAGS}, auth='bearer-no-token') as registry:
+        client = package.RegistryClient(registry.url)
+        assert client.list_tags('team/app')['status'] is False
+        assert len(registry.token_requests) == 1
+        client.close()
+
+
+def test_list_tags_follows_the_pages():
+    with FakeRegistry({'team/app': TAGS}) as registry:
+        with package.RegistryClient(registry.url) as client:
+            assert client.list_tags('team/app', page_size=100) == {'status': True, 'content': TAGS}
+            assert len(registry.requests) == 3
+            assert client.stats()['misses'] == 3
+
+
+def test_list_tags_is_served_from_cache():
+    with FakeRegistry({'team/app': TAGS}) as registry:
+        with package.RegistryClient(registry.url, ttl=60) as client:
+            client.list_tags('team/app')
+            assert client.list_tags('team/app')['content'] == TAGS
+            assert client.stats()['hits'] == 3
+            assert len(registry.requests) == 3
+
+
+def test_expired_tags_are_revalidated_with_their_etag():
+    with FakeRegistry({'team/app': TAGS}) as registry:
+        with package.RegistryClient(registry.url, ttl=0) as client:
+            client.list_tags('team/app')
+            client.list_tags('team/app')
+            assert client.list_tags('team/app')['content'] == TAGS
+            # The registry answers 304 Not Modified to every page.
+            assert client.stats()['revalidations'] == 6
+            assert client.stats()['misses'] == 3
+            assert len(registry.requests) == 9
+
+
+def test_bearer_token_is_fetched_once_per_scope():
+    with FakeRegistry({'team/app': TAGS, 'team/db': ['1.0']}, auth='bearer') as registry:
+        with package.RegistryClient(registry.url, username='user', password='secret') as client:
+            assert client.list_tags('team/app')['content'] == TAGS
+            assert client.list_tags('team/app')['content'] == TAGS
+            assert client.list_tags('team/db')['content'] == ['1.0']
+            assert [query['scope'] for query in registry.token_requests] == ['repository:team/app:pull', 'repository:team/db:pull']
+
+
+def test_basic_authentication():
+    with FakeRegistry({'team/app': TAGS}, auth='basic') as registry:
+        with package.RegistryClient(registry.url) as client:
+            assert client.list_tags('team/app')['status'] is False
+        with package.RegistryClient(registry.url, username='user', password='secret') as client:
+            assert client.list_tags('team/app')['content'] == TAGS
+
+
+def test_get_manifest():
+    with FakeRegistry({'team/app': TAGS}) as registry:
+        with package.RegistryClient(registry.url) as client:
+            manifest = client.get_manifest('team/app', '1.0')['content']
+            assert manifest['digest'] == 'sha256:' + 'ab' * 32
+            assert manifest['media_type'] == 'application/vnd.docker.distribution.manifest.v2+json'
@@ -0,0 +1,55 @@
+import threading
+
+from conftest import FakeDaemon, package
+from utils import SingleFlight
+
+
+def test_coalesced_callers_get_their_own_copy():
+    with FakeDaemon(containers=1, latency=0.2) as fake:
+        with package.DockerManager(host=fake.host, coalesce=True) as docker:
+            barrier = threading.Barrier(5)
+            results = []
+
+            def call():
+                barrier.wait()
+                results.append(docker.get_info())
+
+            threads = [threading.Thread(target=call) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(10)
+            assert docker.pool_stats()['requests'] == 1
+            assert len(set(id(result['content']) for result in results)) == 5
+            results[0]['content']['NCPU'] = 'MUTATED'
+            assert [result['content']['NCPU'] for result in results[1:]] == [4] * 4
+
+
+def test_waiters_get_the_leader_exception():
+    single_flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    errors = []
+
+    def leader_call():
+        started.set()
+        release.wait(10)
+        raise ValueError('boom')
+
+    def run(func):
+        try:
+            single_flight.do('key', func)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=run, args=(leader_call,))
+    leader.start()
+    started.wait(10)
+    waiter = threading.Thread(target=run, args=(lambda: None,))
+    waiter.start()
+    while single_flight._calls['key'].waiters == 0:
+        pass
+    release.set()
+    leader.join(10)
+    waiter.join(10)
+    assert len(errors) == 2
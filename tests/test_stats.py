@@ -0,0 +1,80 @@
+import pytest
+
+from metrics_store import ContainerMetricsStore
+from models import StatsSample
+from stats import StatsDecoder
+
+CONTAINER_ID = '{0:064x}'.format(1)
+
+
+def _stats(second, total_usage, system_usage, rx_bytes, memory_stats=None, **extra):
+    stats = {
+        'read': '2016-02-09T09:01:{0:02d}.5Z'.format(second),
+        'cpu_stats': {'cpu_usage': {'total_usage': total_usage, 'percpu_usage': [1, 1]}, 'system_cpu_usage': system_usage},
+        'precpu_stats': {'cpu_usage': {'total_usage': 1000}, 'system_cpu_usage': 100000},
+        'memory_stats': memory_stats or {'usage': 1000, 'limit': 4000, 'stats': {'cache': 200}},
+        'blkio_stats': {'io_service_bytes_recursive': [{'op': 'Read', 'value': 10}, {'op': 'read', 'value': 5},
+                                                       {'op': 'Write', 'value': 7}, {'op': 'Total', 'value': 22}]},
+        'networks': {'eth0': {'rx_bytes': rx_bytes, 'tx_bytes': rx_bytes // 2}, 'eth1': {'rx_bytes': 100, 'tx_bytes': 0}}
+    }
+    stats.update(extra)
+    return stats
+
+
+def test_decoder_derives_the_metrics():
+    decoder = StatsDecoder()
+    first = decoder.decode(_stats(0, 1000 + 500, 100000 + 10000, 1000))
+    # Without online_cpus the number of per cpu usages counts the cpus.
+    assert first.cpu_percent == pytest.approx(100.0 * 500 / 10000 * 2)
+    assert first.memory_usage == 800
+    assert first.memory_limit == 4000
+    assert first.memory_percent == pytest.approx(20.0)
+    assert (first.blkio_read, first.blkio_write) == (15, 7)
+    assert (first.rx_bytes, first.tx_bytes) == (1100, 500)
+    assert (first.rx_rate, first.tx_rate) == (0.0, 0.0)
+    second = decoder.decode(_stats(2, 1000 + 500, 100000 + 10000, 5000))
+    assert second.timestamp - first.timestamp == pytest.approx(2)
+    assert second.rx_rate == pytest.approx(2000.0)
+    assert second.tx_rate == pytest.approx(1000.0)
+
+
+def test_decoder_edge_cases():
+    decoder = StatsDecoder()
+    # First sample of a container: no previous cpu usage, the percentage is 0.
+    sample = decoder.decode(_stats(0, 1000, 100000, 0, cpu_stats={'cpu_usage': {'total_usage': 0}}))
+    assert sample.cpu_percent == 0.0
+    # cgroup v2 page cache, and a counter reset after a restart gives no negative rate.
+    sample = decoder.decode(_stats(1, 1000, 100000, 0, memory_stats={'usage': 1000, 'limit': 0, 'stats': {'inactive_file': 300}}))
+    assert sample.memory_usage == 700
+    assert sample.memory_percent == 0.0
+    assert sample.rx_rate == 0.0
+
+
+def test_untyped_and_typed_samples_are_the_same_type(fake, docker, typed_docker):
+    samples = list(docker.sample_container_stats(CONTAINER_ID)['content'])
+    assert len(samples) == 5
+    assert all(isinstance(sample, StatsSample) for sample in samples)
+    # 50ms of cpu time per second of system time on 4 cpus.
+    assert samples[1].cpu_percent == pytest.approx(20.0)
+    assert samples[1].memory_usage == 104857600 - 10485760
+    assert samples[1].rx_rate == pytest.approx(1000.0)
+    typed = typed_docker.sample_container_stats(CONTAINER_ID)
+    assert list(typed.content) == samples
+    single = typed_docker.sample_container_stats(CONTAINER_ID, stream=False).content
+    assert isinstance(single, StatsSample)
+    assert single == docker.sample_container_stats(CONTAINER_ID, stream=False)['content']
+
+
+def test_sample_feeds_the_metrics_store(docker):
+    store = ContainerMetricsStore()
+    for sample in docker.sample_container_stats(CONTAINER_ID)['content']:
+        store.add(CONTAINER_ID, sample)
+    latest = store.latest(CONTAINER_ID)
+    assert latest['cpu'] == pytest.approx(20.0)
+    assert latest['blkio'] == 4096 + 8192
+
+
+def test_sample_is_compact():
+    sample = StatsDecoder().decode(_stats(0, 1500, 110000, 1000))
+    assert not hasattr(sample, '__dict__')
+    assert sample.as_dict()['memory_usage'] == 800
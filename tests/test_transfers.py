@@ -0,0 +1,91 @@
+import io
+import tarfile
+
+import pytest
+
+CONTAINER_ID = '{0:064x}'.format(1)
+STATS_KEYS = ['bytes', 'elapsed', 'files', 'throughput']
+
+
+def test_save_and_load_image(fake, docker, tmp_path):
+    destination = io.BytesIO()
+    saved = docker.save_image('app:1', destination, chunk_size=4096)
+    assert saved['status'] is True
+    assert sorted(saved['content']) == STATS_KEYS
+    assert destination.getvalue() == fake._image_tar
+    archive = tmp_path / 'images.tar'
+    archive.write_bytes(destination.getvalue())
+    loaded = docker.load_image(str(archive), chunk_size=4096)
+    assert loaded['status'] is True
+    assert loaded['content']['bytes'] == len(fake._image_tar)
+    assert loaded['content']['messages'] == [{'stream': 'Loaded image: app:latest\n'}]
+
+
+class _FullDisk(io.RawIOBase):
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        raise OSError(28, 'No space left on device')
+
+
+def _streams(docker):
+    streams = []
+    get = docker._get
+
+    def recording_get(*args, **kwargs):
+        response = get(*args, **kwargs)
+        streams.append(response['content'])
+        return response
+    docker._get = recording_get
+    return streams
+
+
+def test_failed_save_closes_the_response(docker):
+    streams = _streams(docker)
+    with pytest.raises(OSError):
+        docker.save_image('app:1', _FullDisk(), chunk_size=4096)
+    assert streams[0].closed
+    assert docker.pool_stats()['in_flight'] == 0
+    assert docker.get_info()['status'] is True
+
+
+def test_get_archive_stats_match_save_image(fake, docker, tmp_path):
+    destination = io.BytesIO()
+    copied = docker.get_archive(CONTAINER_ID, '/etc/app', destination, chunk_size=1000)
+    assert sorted(copied['content']) == STATS_KEYS
+    assert destination.getvalue() == fake._archive
+    extracted = docker.get_archive(CONTAINER_ID, '/etc/app', str(tmp_path))
+    assert extracted['content']['files'] == 2
+    assert (tmp_path / 'static' / 'app.js').read_bytes() == b'x' * 65536
+
+
+def test_put_archive_streams_a_tar(docker, tmp_path):
+    (tmp_path / 'conf').mkdir()
+    (tmp_path / 'conf' / 'app.yml').write_bytes(b'port: 8080\n')
+    response = docker.put_archive(CONTAINER_ID, '/etc', [str(tmp_path / 'conf')])
+    assert response['status'] is True
+    assert response['content']['files'] == 2
+    assert sorted(response['content']) == STATS_KEYS
+
+
+def test_tar_stream_is_a_valid_archive(tmp_path):
+    from archive import TarStream
+    (tmp_path / 'a.txt').write_bytes(b'a' * 70000)
+    data = b''.join(TarStream([str(tmp_path / 'a.txt')], chunk_size=4096))
+    with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+        assert tar.getnames() == ['a.txt']
+        assert tar.extractfile('a.txt').read() == b'a' * 70000
+
+
+def test_failed_get_archive_closes_the_response(docker, tmp_path):
+    streams = _streams(docker)
+    with pytest.raises(OSError):
+        docker.get_archive(CONTAINER_ID, '/etc/app', _FullDisk(), chunk_size=1000)
+    # Extracting below a regular file fails too.
+    (tmp_path / 'file').write_bytes(b'')
+    with pytest.raises(OSError):
+        docker.get_archive(CONTAINER_ID, '/etc/app', str(tmp_path / 'file'))
+    assert [stream.closed for stream in streams] == [True, True]
+    assert docker.pool_stats()['in_flight'] == 0
@@ -0,0 +1,30 @@
+import os
+
+import pytest
+
+from conftest import package
+from fake_daemon import FakeDaemon
+
+
+def _unix_daemon(tmp_path):
+    return FakeDaemon(unix_socket=os.path.join(str(tmp_path), 'docker.sock'), containers=3, images=3)
+
+
+@pytest.mark.parametrize('daemon', [lambda tmp_path: FakeDaemon(containers=3, images=3), _unix_daemon])
+def test_requests_reuse_the_pooled_connection(daemon, tmp_path):
+    with daemon(tmp_path) as fake:
+        with package.DockerManager(host=fake.host) as docker:
+            for _ in range(20):
+                assert docker.get_info()['status'] is True
+            stats = docker.pool_stats()
+    assert stats['requests'] == 20
+    assert stats['connections_opened'] == 1
+    assert stats['connections_reused'] == 19
+    assert stats['in_flight'] == 0
+
+
+def test_pool_serves_requests_after_a_stream_is_closed(fake, docker):
+    response = docker.get_events(decode=False)
+    response['content'].close()
+    assert docker.get_info()['status'] is True
+    assert docker.pool_stats()['in_flight'] == 0
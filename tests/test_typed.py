@@ -0,0 +1,62 @@
+import pytest
+
+from conftest import package
+
+CONTAINER_IDS = ['{0:064x}'.format(index) for index in range(3)]
+
+
+@pytest.mark.parametrize('method', [
+    'start_containers', 'stop_containers', 'restart_containers', 'pause_containers', 'unpause_containers', 'remove_containers'
+])
+def test_bulk_operation_selects_containers_with_filters(typed_docker, method):
+    response = getattr(typed_docker, method)(filters={'status': ['running']})
+    assert response['status'] is True
+    assert sorted(response['content']) == CONTAINER_IDS
+
+
+def test_inspect_containers(typed_docker):
+    response = typed_docker.inspect_containers(fields=['Name', 'State_running'])
+    assert response['status'] is True
+    assert sorted(response['content']) == CONTAINER_IDS
+    assert response['content'][CONTAINER_IDS[0]]['content']['State_running'] is True
+
+
+def test_inventory_seed(typed_docker):
+    inventory = package.Inventory(typed_docker).seed()
+    assert sorted(inventory.containers) == CONTAINER_IDS
+    assert inventory.get_container('container-1')['Id'] == CONTAINER_IDS[1]
+    assert inventory.get_image('app:2')['Id'] == 'sha256:{0:064x}'.format(2)
+
+
+def test_list_container_is_typed(typed_docker):
+    response = typed_docker.list_container(all=True)
+    assert response.status is True
+    assert [container.id for container in response.content] == CONTAINER_IDS
+
+
+@pytest.mark.parametrize('call', [
+    lambda docker: docker.list_container(all=True, stream=True, fields=['Id']),
+    lambda docker: docker.list_image(stream=True, fields=['Id'])
+])
+def test_typed_list_rejects_fields(typed_docker, call):
+    with pytest.raises(ValueError):
+        call(typed_docker)
+    assert typed_docker.pool_stats()['requests'] == 0
+
+
+def test_fleet_reports_failed_typed_hosts(failing_fake):
+    with package.DockerFleet([failing_fake.host], typed=True) as fleet:
+        response = fleet.run('list_container', all=True)
+        assert response['status'] is False
+        assert response['content'][failing_fake.host]['status'] is False
+        merged = fleet.merged('list_container', all=True)
+        assert merged['status'] is False
+        assert merged['content'] == []
+        assert failing_fake.host in merged['errors']
+
+
+def test_fleet_unwraps_typed_results(fake):
+    with package.DockerFleet([fake.host], typed=True) as fleet:
+        response = fleet.run('list_container', all=True)
+        assert response['status'] is True
+        assert [container.id for container in response['content'][fake.host]['content']] == CONTAINER_IDS
@@ -0,0 +1,221 @@
+import socket
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool
+
+
+class HttpTransport(object):
+    """Persistent, pooled HTTP(S) transport used by :class:`DockerServer`.
+
+    :param str base_url: Scheme and host every end point is appended to.
+    :param tuple cert: Client certificate and key pair(Default is None).
+    :param verify: CA bundle path or bool to verify the server certificate(Default is False).
+    :param int pool_size: Keep-alive connections kept open per host(Default is 10).
+    :param bool pool_block: Wait for a free connection instead of opening a throwaway one
+                            when the pool is exhausted(Default is False).
+
+    One ``requests.Session`` is kept for the lifetime of the transport, so TCP
+    connections (and TLS sessions) are reused across calls instead of being
+    opened for every request.
+    """
+
+    def __init__(self, base_url, cert=None, verify=False, pool_size=10, pool_block=False):
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.session = requests.Session()
+        self.session.cert = cert
+        self.session.verify = verify
+        self.adapter = self._build_adapter(pool_size, pool_block)
+        self.session.mount(self.base_url, self.adapter)
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._in_flight = 0
+
+    def _build_adapter(self, pool_size, pool_block):
+        return HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=pool_block)
+
+    def _pools(self):
+        pools = self.adapter.poolmanager.pools
+        return [pools[key] for key in pools.keys()]
+
+    def request(self, method, end_point, timeout=None, **kwargs):
+        with self._lock:
+            self._requests += 1
+            self._in_flight += 1
+        try:
+            return self.session.request(method, self.base_url + end_point, timeout=timeout, **kwargs)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def stats(self):
+        """Connection pool statistics.
+
+        .. code-block:: json
+
+            {'connections_opened': 1, 'connections_reused': 41, 'idle': 1, 'in_flight': 0,
+             'pool_size': 10, 'requests': 42}
+
+        """
+        opened = 0
+        idle = 0
+        for pool in self._pools():
+            opened += pool.num_connections
+            if pool.pool is not None:
+                idle += len([conn for conn in list(pool.pool.queue) if conn is not None])
+        with self._lock:
+            total = self._requests
+            in_flight = self._in_flight
+        return {
+            'requests': total,
+            'connections_opened': opened,
+            'connections_reused': max(total - opened, 0),
+            'in_flight': in_flight,
+            'idle': idle,
+            'pool_size': self.pool_size
+        }
+
+    def close(self):
+        self.session.close()
+
+
+class ResponseStream(object):
+    """Iterator over the body of a streamed response.
+
+    :param items: Chunks or lines of the body, eg: ``response.iter_lines()``.
+    :param response: The streamed ``requests`` response.
+    :param on_close: Called once, after the response is closed(Default is None).
+
+    The response is closed when the body is exhausted, when reading it fails or when
+    ``close()`` is called. ``close()`` may be called from another thread: a reader
+    waiting for the next chunk of an endless stream, eg: events or followed logs, is
+    woken up and stops as if the body had ended.
+    """
+
+    def __init__(self, items, response, on_close=None):
+        self._items = iter(items)
+        self.response = response
+        self._on_close = on_close
+        self._lock = threading.Lock()
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.closed:
+            raise StopIteration
+        try:
+            return next(self._items)
+        except StopIteration:
+            self._finish(interrupt=False)
+            raise
+        except Exception:
+            if self.closed:
+                # Closed by another thread while this one was reading.
+                raise StopIteration
+            self._finish(interrupt=False)
+            raise
+
+    next = __next__
+
+    def close(self):
+        self._finish(interrupt=True)
+
+    def _finish(self, interrupt):
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+        # The connection is detached from the response once it is back in the pool.
+        connection = getattr(self.response.raw, '_connection', None)
+        sock = getattr(connection, 'sock', None)
+        if interrupt and sock is not None:
+            # Closing the response waits for a blocked read to return, a shutdown wakes it.
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self.response.close()
+        if self._on_close is not None:
+            self._on_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class UnixHTTPConnection(HTTPConnection):
+
+    def __init__(self, socket_path, timeout=60):
+        super(UnixHTTPConnection, self).__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+class UnixHTTPConnectionPool(HTTPConnectionPool):
+
+    def __init__(self, socket_path, timeout=60, maxsize=10, block=False):
+        super(UnixHTTPConnectionPool, self).__init__('localhost', timeout=timeout, maxsize=maxsize, block=block)
+        self.socket_path = socket_path
+
+    def _new_conn(self):
+        self.num_connections += 1
+        return UnixHTTPConnection(self.socket_path, self.timeout.connect_timeout)
+
+
+class UnixHTTPAdapter(HTTPAdapter):
+    """Requests adapter sending every request over a single unix socket."""
+
+    def __init__(self, socket_path, pool_size=10, pool_block=False):
+        self.socket_path = socket_path
+        self.pool = UnixHTTPConnectionPool(socket_path, maxsize=pool_size, block=pool_block)
+        super(UnixHTTPAdapter, self).__init__(pool_connections=1, pool_maxsize=pool_size, pool_block=pool_block)
+
+    def get_connection(self, url, proxies=None):
+        return self.pool
+
+    def get_connection_with_tls_context(self, request, verify, proxies=None, cert=None):
+        return self.pool
+
+    def request_url(self, request, proxies):
+        return request.path_url
+
+    def close(self):
+        self.pool.close()
+        super(UnixHTTPAdapter, self).close()
+
+
+class UnixSocketTransport(HttpTransport):
+    """Pooled, keep-alive HTTP transport over a unix domain socket.
+
+    :param str socket_path: Path of the docker socket, eg: /var/run/docker.sock
+    :param int pool_size: Keep-alive connections kept open on the socket(Default is 10).
+    :param bool pool_block: Wait for a free connection when the pool is exhausted(Default is False).
+
+    The daemon is reached without the TCP/TLS stack, the requests are sent to
+    ``http+unix://localhost`` which the mounted adapter routes to the socket.
+    """
+
+    BASE_URL = 'http+unix://localhost'
+
+    def __init__(self, socket_path, pool_size=10, pool_block=False):
+        self.socket_path = socket_path
+        super(UnixSocketTransport, self).__init__(self.BASE_URL, pool_size=pool_size, pool_block=pool_block)
+
+    def _build_adapter(self, pool_size, pool_block):
+        return UnixHTTPAdapter(self.socket_path, pool_size, pool_block)
+
+    def _pools(self):
+        return [self.adapter.pool]
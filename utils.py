@@ -1,4 +1,18 @@
+import asyncio
+import calendar
+import codecs
+import copy
+import json
+import mmap
+import os
+import re
 import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from models import Result
+
 
 class BaseEnum(object):
     def as_dict(self):
@@ -14,13 +28,334 @@ class BaseEnum(object):
         return self.__dict__.get(key, '')
 
 
+class MultiplexedStreamDecoder(object):
+    """Incremental decoder of the docker multiplexed stream format.
+
+    Every frame is an 8 bytes header (stream id, 3 padding bytes, big endian payload
+    length) followed by the payload. Chunks can be fed as they arrive from the socket,
+    frames split across chunk boundaries are kept until they are complete, and the
+    buffer is walked with a memoryview so the payloads are copied only once.
+
+    .. code-block:: python
+
+        decoder = MultiplexedStreamDecoder()
+        for chunk in response.iter_content(65536):
+            for stream_id, line in decoder.feed_lines(chunk):
+                print(stream_id, line)
+        decoder.flush()
+
+    """
+
+    HEADER = struct.Struct('>BxxxL')
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._pending = {}
+
+    def feed(self, chunk):
+        """Return the (stream_id, payload) of every frame completed by the chunk."""
+        buf = self._buffer
+        buf += chunk
+        size = len(buf)
+        walker = 0
+        frames = []
+        view = memoryview(buf)
+        try:
+            while size - walker >= 8:
+                stream_id, length = self.HEADER.unpack_from(buf, walker)
+                end = walker + 8 + length
+                if end > size:
+                    break
+                frames.append((stream_id, view[walker + 8:end].tobytes()))
+                walker = end
+        finally:
+            view.release()
+        if walker:
+            del buf[:walker]
+        return frames
+
+    def feed_lines(self, chunk):
+        """Return the (stream_id, line) of every line completed by the chunk, stdout and
+        stderr lines are reassembled separately."""
+        lines = []
+        for stream_id, payload in self.feed(chunk):
+            pending = self._pending.pop(stream_id, None)
+            if pending:
+                payload = pending + payload
+            parts = payload.split(b'\n')
+            if parts[-1]:
+                self._pending[stream_id] = parts[-1]
+            for line in parts[:-1]:
+                lines.append((stream_id, line))
+        return lines
+
+    def flush(self):
+        """Return the unterminated lines left at the end of the stream."""
+        lines = [(stream_id, line) for stream_id, line in sorted(self._pending.items())]
+        self._pending = {}
+        return lines
+
+
 def _multiplexed_buffer_helper(buf):
-    walker = 0
-    while True:
-        if len(buf[walker:]) < 8:
-            break
-        _, length = struct.unpack_from('>BxxxL', buf[walker:])
-        start = walker + 8
-        end = start + length
-        walker = end
-        yield buf[start:end]
\ No newline at end of file
+    for _, payload in MultiplexedStreamDecoder().feed(buf):
+        yield payload
+
+
+def _multiplexed_stream_helper(chunks, split_streams=False):
+    decoder = MultiplexedStreamDecoder()
+    for chunk in chunks:
+        for stream_id, line in decoder.feed_lines(chunk):
+            yield (stream_id, line) if split_streams else line
+    for stream_id, line in decoder.flush():
+        yield (stream_id, line) if split_streams else line
+
+
+_JSON_SEPARATOR = re.compile(r'[\s,]*')
+_JSON_DELIMITERS = ', \t\r\n]'
+
+
+def _json_array_helper(chunks, fields=None, raw=False):
+    """Parse a JSON array incrementally from byte chunks and yield its elements one by one.
+
+    Only the element being parsed is kept in memory. With ``fields`` every object is
+    reduced to those keys, with ``raw`` the JSON text of every element is yielded
+    instead of the decoded element. A ValueError is raised when the chunks end before
+    the closing bracket of the array.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    fields = set(fields) if fields else None
+    buf = ''
+    pos = 0
+    started = False
+    chunks = iter(chunks)
+    final = False
+    while not final:
+        chunk = next(chunks, None)
+        final = chunk is None
+        buf = buf[pos:] + text_decoder.decode(b'' if final else chunk, final)
+        pos = 0
+        while True:
+            pos = _JSON_SEPARATOR.match(buf, pos).end()
+            if pos >= len(buf):
+                break
+            if not started:
+                if buf[pos] != '[':
+                    raise ValueError('Expected a JSON array, got: {0!r}'.format(buf[pos:pos + 32]))
+                started = True
+                pos += 1
+                continue
+            if buf[pos] == ']':
+                return
+            try:
+                element, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                # The element is not complete yet, wait for the next chunk.
+                break
+            if end == len(buf) or buf[end] not in _JSON_DELIMITERS:
+                # A number may go on in the next chunk, eg: 12 then 34 or 5. then 5e3.
+                if not final:
+                    break
+                if end < len(buf):
+                    raise ValueError('Invalid JSON array: {0!r}'.format(buf[pos:pos + 32]))
+            if raw:
+                yield buf[pos:end]
+            elif fields is not None and isinstance(element, dict):
+                yield dict((key, value) for key, value in element.items() if key in fields)
+            else:
+                yield element
+            pos = end
+    raise ValueError('Truncated JSON array: {0!r}'.format(buf[pos:pos + 32]))
+
+
+def _file_chunks_helper(source, chunk_size):
+    """Yield the content of a file path or file-like object in chunks.
+
+    A path is memory-mapped, the chunks are sliced from the page cache and only one
+    chunk at a time is copied in memory.
+    """
+    if hasattr(source, 'read'):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    with open(source, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for offset in range(0, len(mapped), chunk_size):
+                yield mapped[offset:offset + chunk_size]
+
+
+def _rechunk_helper(chunks, chunk_size):
+    """Regroup a stream of chunks, eg: read from the deamon, into chunk_size chunks."""
+    pending = bytearray()
+    for chunk in chunks:
+        pending += chunk
+        while len(pending) >= chunk_size:
+            yield bytes(pending[:chunk_size])
+            del pending[:chunk_size]
+    if pending:
+        yield bytes(pending)
+
+
+def _json_lines_helper(lines):
+    """Decode a stream of JSON messages, eg: the progress of a pull, load or build."""
+    for line in lines:
+        if line:
+            yield json.loads(line)
+
+
+def _parse_timestamp(value):
+    """Convert a docker RFC 3339 timestamp, eg: 2016-02-09T14:31:34.283155198+05:30, to UNIX seconds."""
+    value = value.strip()
+    offset = 0
+    if value.endswith('Z'):
+        value = value[:-1]
+    elif len(value) > 6 and value[-6] in '+-' and value[-3] == ':':
+        sign = 1 if value[-6] == '+' else -1
+        offset = sign * (int(value[-5:-3]) * 3600 + int(value[-2:]) * 60)
+        value = value[:-6]
+    base, _, fraction = value.partition('.')
+    seconds = calendar.timegm(time.strptime(base, '%Y-%m-%dT%H:%M:%S'))
+    return seconds - offset + (float('0.' + fraction) if fraction else 0.0)
+
+
+def _timed_call(func, item, started):
+    started[item] = time.time()
+    try:
+        response = func(item)
+    except Exception as e:
+        response = {'status': False, 'content': '{0}: {1}'.format(type(e).__name__, e)}
+    if isinstance(response, Result):
+        response = {'status': response.status, 'content': response.content}
+    elif not isinstance(response, dict):
+        response = {'status': True, 'content': response}
+    else:
+        response = dict(response)
+    response['elapsed'] = time.time() - started[item]
+    return response
+
+
+def _run_concurrently(func, items, concurrency=10, timeout=None):
+    """Call ``func(item)`` for every item on at most ``concurrency`` threads.
+
+    Returns a dict of item -> response, in the order of ``items``. Every response
+    gets the ``elapsed`` seconds of its call, exceptions become ``{'status': False}``
+    responses and a call running longer than ``timeout`` seconds is reported as timed
+    out without waiting for it.
+    """
+    items = list(items)
+    results = {}
+    started = {}
+    executor = ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(items) or 1)))
+    futures = dict((executor.submit(_timed_call, func, item, started), item) for item in items)
+    pending = set(futures)
+    try:
+        while pending:
+            poll = None
+            if timeout is not None:
+                now = time.time()
+                deadlines = [started[futures[future]] + timeout for future in pending if futures[future] in started]
+                poll = max(min(deadlines) - now, 0) if deadlines else timeout
+            done, pending = wait(pending, timeout=poll, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[futures[future]] = future.result()
+            if timeout is None:
+                continue
+            now = time.time()
+            for future in list(pending):
+                item = futures[future]
+                if item in started and now - started[item] >= timeout:
+                    future.cancel()
+                    pending.discard(future)
+                    results[item] = {
+                        'status': False,
+                        'content': 'Timed out after {0} seconds'.format(timeout),
+                        'elapsed': now - started[item]
+                    }
+    finally:
+        executor.shutdown(wait=False)
+    return dict((item, results[item]) for item in items)
+
+
+class _Call(object):
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight(object):
+    """Coalesce concurrent calls sharing a key into one call.
+
+    The first caller of a key runs the call, the callers arriving while it is in flight
+    wait for it and get a deep copy of its result (or the same exception), so a caller
+    changing its result does not change the others'. Nothing is kept once the call
+    returns, so no result is served staler than the call itself.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+        result = None
+        try:
+            result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            try:
+                # No waiter joins once the key is removed. They copy a copy, the caller
+                # of the leader may already be changing its result.
+                if call.waiters and call.error is None:
+                    call.result = copy.deepcopy(result)
+            finally:
+                call.event.set()
+        return result
+
+
+class AsyncSingleFlight(object):
+    """Asyncio counterpart of :class:`SingleFlight`."""
+
+    def __init__(self):
+        self._calls = {}
+
+    async def do(self, key, func):
+        call = self._calls.get(key)
+        if call is not None:
+            call[1] += 1
+            return copy.deepcopy(await asyncio.shield(call[0]))
+        future = asyncio.get_event_loop().create_future()
+        call = self._calls[key] = [future, 0]
+        try:
+            result = await func()
+        except BaseException as e:
+            future.set_exception(e)
+            # Retrieve it so an unawaited future does not log "exception never retrieved".
+            future.exception()
+            raise
+        else:
+            future.set_result(copy.deepcopy(result) if call[1] else result)
+        finally:
+            del self._calls[key]
+        return result